@@ -3,16 +3,19 @@ pragma solidity ^0.8.22;
 
 import {WeekStart, IYearnBoostedStaker} from "utils/WeekStart.sol";
 import {IERC20, SafeERC20} from "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import {Initializable} from "@openzeppelin/contracts/proxy/utils/Initializable.sol";
 
 
-contract SingleTokenRewardDistributor is WeekStart {
+contract SingleTokenRewardDistributor is Initializable, WeekStart {
     using SafeERC20 for IERC20;
 
     uint constant public PRECISION = 1e27;
-    IYearnBoostedStaker public immutable staker;
-    IERC20 public immutable rewardToken;
-    uint public immutable START_WEEK;
-    uint immutable MAX_STAKE_GROWTH_WEEKS;
+    // Deployment config. Set once in `initialize`. Everything read on the claim path
+    // shares the first storage slot with `START_TIME` and the initializer flags.
+    IYearnBoostedStaker public staker;
+    uint16 public START_WEEK;
+    uint8 MAX_STAKE_GROWTH_WEEKS;
+    IERC20 public rewardToken;
 
     struct AccountInfo {
         address recipient; // Who rewards will be sent to. Cheaper to store here than in dedicated mapping.
@@ -29,19 +32,24 @@ contract SingleTokenRewardDistributor is WeekStart {
     event ClaimerApproved(address indexed account, address indexed, bool approved);
     event RewardPushed(uint indexed fromWeek, uint indexed toWeek, uint amount);
 
+    constructor() {
+        // Implementation is only used as a clone target.
+        _disableInitializers();
+    }
+
     /**
         @param _staker the staking contract to use for weight calculations.
         @param _rewardToken address of reward token to be used.
     */
-    constructor(
+    function initialize(
         IYearnBoostedStaker _staker,
         IERC20 _rewardToken
-    )
-        WeekStart(_staker) {
+    ) external initializer {
+        _setWeekStart(_staker);
         staker = _staker;
         rewardToken = _rewardToken;
-        START_WEEK = staker.getWeek();
-        MAX_STAKE_GROWTH_WEEKS = staker.MAX_STAKE_GROWTH_WEEKS();
+        START_WEEK = uint16(_staker.getWeek());
+        MAX_STAKE_GROWTH_WEEKS = uint8(_staker.MAX_STAKE_GROWTH_WEEKS());
     }
 
     /**
@@ -3,14 +3,18 @@ pragma solidity ^0.8.22;
 
 import {IERC20, SafeERC20} from "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
 import {IERC20Metadata} from "@openzeppelin/contracts/token/ERC20/extensions/IERC20Metadata.sol";
+import {Initializable} from "@openzeppelin/contracts/proxy/utils/Initializable.sol";
 
-contract YearnBoostedStaker {
+contract YearnBoostedStaker is Initializable {
     using SafeERC20 for IERC20;
 
-    uint public immutable MAX_STAKE_GROWTH_WEEKS;
-    uint8 public immutable MAX_WEEK_BIT;
-    uint public immutable START_TIME;
-    IERC20 public immutable stakeToken;
+    // Deployment config. Set once in `initialize` and packed into a single slot
+    // alongside the initializer flags, so hot paths pay for one cold SLOAD.
+    IERC20 public stakeToken;
+    uint8 public MAX_STAKE_GROWTH_WEEKS;
+    uint8 public MAX_WEEK_BIT;
+    uint8 public decimals;
+    uint48 public START_TIME;
 
     // Account weight tracking state vars.
     mapping(address account => AccountData data) public accountData;
@@ -27,7 +31,6 @@ contract YearnBoostedStaker {
 
     // Generic token interface.
     uint public totalSupply;
-    uint8 public immutable decimals;
 
     // Permissioned roles
     address public owner;
@@ -69,6 +72,11 @@ contract YearnBoostedStaker {
     event OwnershipTransferred(address indexed newOwner);
     event WeightedStakerSet(address indexed staker, bool approved);
 
+    constructor() {
+        // Implementation is only used as a clone target.
+        _disableInitializers();
+    }
+
     /**
         @param _token The token to be staked.
         @param _max_stake_growth_weeks The number of weeks a stake will grow for.
@@ -78,7 +86,7 @@ contract YearnBoostedStaker {
                             Passing a value of 0 will start at block.timestamp.
         @param _owner       Owner is able to grant access to stake with max boost.
     */
-    constructor(address _token, uint _max_stake_growth_weeks, uint _start_time, address _owner) {
+    function initialize(address _token, uint _max_stake_growth_weeks, uint _start_time, address _owner) external initializer {
         owner = _owner;
         emit OwnershipTransferred(_owner);
         stakeToken = IERC20(_token);
@@ -88,14 +96,14 @@ contract YearnBoostedStaker {
             _max_stake_growth_weeks <= 7,
             "Invalid weeks"
         );
-        MAX_STAKE_GROWTH_WEEKS = _max_stake_growth_weeks;
-        MAX_WEEK_BIT = uint8(1 << MAX_STAKE_GROWTH_WEEKS);
+        MAX_STAKE_GROWTH_WEEKS = uint8(_max_stake_growth_weeks);
+        MAX_WEEK_BIT = uint8(1 << _max_stake_growth_weeks);
         if (_start_time == 0){
-            START_TIME = block.timestamp;
+            START_TIME = uint48(block.timestamp);
         }
         else {
             require(_start_time <= block.timestamp, "!Past");
-            START_TIME = _start_time;
+            START_TIME = uint48(_start_time);
         }
     }
 
@@ -435,6 +443,39 @@ contract YearnBoostedStaker {
         return weight;
     }
 
+    /**
+        @notice Project an account's weight curve, assuming no further actions are taken.
+        @dev Walks forward from the account's last checkpoint in a single pass.
+        @param _account Account to project.
+        @param _nWeeks Number of weeks to project, starting with the current week.
+        @return weights Account weight at week `getWeek() + i` for each index `i`.
+    */
+    function projectAccountWeights(address _account, uint _nWeeks) external view returns (uint[] memory weights) {
+        weights = new uint[](_nWeeks);
+        uint systemWeek = getWeek();
+
+        AccountData memory acctData = accountData[_account];
+        uint week = acctData.lastUpdateWeek;
+        uint weight = accountWeeklyWeights[_account][week];
+        uint pending = uint(acctData.pendingStake);
+        uint8 bitmap = acctData.updateWeeksBitmap;
+
+        for (uint i; i < _nWeeks;) {
+            if (week < systemWeek + i && pending > 0) {
+                unchecked{week++;}
+                weight += pending;
+                bitmap = bitmap << 1;
+                if (bitmap & MAX_WEEK_BIT == MAX_WEEK_BIT){
+                    pending -= accountWeeklyToRealize[_account][week].weight;
+                }
+                continue;
+            }
+            // Either we've reached the target week, or weight is no longer changing.
+            weights[i] = weight;
+            unchecked{i++;}
+        }
+    }
+
     /**
         @notice Get the current total system weight
         @dev Also updates local storage values for total weights. Using
@@ -517,6 +558,33 @@ contract YearnBoostedStaker {
         return weight;
     }
 
+    /**
+        @notice Project the global weight curve, assuming no further actions are taken.
+        @dev Walks forward from the last global checkpoint in a single pass.
+        @param _nWeeks Number of weeks to project, starting with the current week.
+        @return weights Global weight at week `getWeek() + i` for each index `i`.
+    */
+    function projectGlobalWeights(uint _nWeeks) external view returns (uint[] memory weights) {
+        weights = new uint[](_nWeeks);
+        uint systemWeek = getWeek();
+
+        // Read these together since they are packed in the same slot.
+        uint week = globalLastUpdateWeek;
+        uint rate = globalGrowthRate;
+        uint weight = globalWeeklyWeights[week];
+
+        for (uint i; i < _nWeeks;) {
+            if (week < systemWeek + i && rate > 0) {
+                unchecked{week++;}
+                weight += rate;
+                rate -= globalWeeklyToRealize[week].weight;
+                continue;
+            }
+            weights[i] = weight;
+            unchecked{i++;}
+        }
+    }
+
     /**
         @notice Returns the balance of underlying staked tokens for an account
         @param _account Account to query balance.
@@ -1,36 +1,34 @@
 // SPDX-License-Identifier: GNU AGPLv3
 pragma solidity ^0.8.22;
 
+import {Clones} from "@openzeppelin/contracts/proxy/Clones.sol";
 import {YearnBoostedStaker} from "../YearnBoostedStaker.sol";
 
 
-/// @title Deploys Rewards Distributor Contract
+/// @title Deploys YBS Contract
 contract YBSFactory{
 
-    string public constant VERSION = "1.0.0";
+    string public constant VERSION = "2.0.0";
+    address public immutable implementation;
+
+    constructor() {
+        implementation = address(new YearnBoostedStaker());
+    }
 
     /**
         @notice Deploy new YBS contract.
-        @dev We use CREATE2 to generate deterministic deployments based on msg.sender.
+        @dev We deploy EIP-1167 clones of a single implementation. The CREATE2 salt is
+             derived from msg.sender and the init args, so deployments stay deterministic
+             per sender and a sender may still deploy once for each set of args.
     */
     function deploy(
         address _token,
         uint _max_stake_growth_weeks,
         uint _start_time,
         address _owner
-    ) external returns (address distributor) {
-        uint256 salt = uint256(uint160(address(msg.sender)));
-        bytes memory bytecode = type(YearnBoostedStaker).creationCode;
-        bytes memory bytecodeWithArgs = abi.encodePacked(
-            bytecode,
-            abi.encode(_token, _max_stake_growth_weeks, _start_time, _owner)
-        );
-        address deployedAddress;
-        assembly {
-            deployedAddress := create2(0, add(bytecodeWithArgs, 0x20), mload(bytecodeWithArgs), salt)
-        }
-        require(deployedAddress != address(0), "Failed to deploy contract");
-
-        return deployedAddress;
+    ) external returns (address ybs) {
+        bytes32 salt = keccak256(abi.encode(msg.sender, _token, _max_stake_growth_weeks, _start_time, _owner));
+        ybs = Clones.cloneDeterministic(implementation, salt);
+        YearnBoostedStaker(ybs).initialize(_token, _max_stake_growth_weeks, _start_time, _owner);
     }
-}
\ No newline at end of file
+}
@@ -1,35 +1,34 @@
 // SPDX-License-Identifier: GNU AGPLv3
 pragma solidity ^0.8.22;
 
+import {Clones} from "@openzeppelin/contracts/proxy/Clones.sol";
 import {IERC20, SingleTokenRewardDistributor, IYearnBoostedStaker} from "../SingleTokenRewardDistributor.sol";
 
 
 /// @title Deploys Rewards Distributor Contract
 contract YBSRewardFactory{
 
-    string public constant VERSION = "1.0.0";
+    string public constant VERSION = "2.0.0";
+    address public immutable implementation;
+
+    constructor() {
+        implementation = address(new SingleTokenRewardDistributor());
+    }
 
     /**
         @notice Deploy new YBS Reward contract.
-        @dev We use CREATE2 to generate deterministic deployments based on msg.sender.
+        @dev We deploy EIP-1167 clones of a single implementation. The CREATE2 salt is
+             derived from msg.sender and the init args.
     */
     function deploy(
         address _ybs,
         address _reward_token
     ) external returns (address distributor) {
-
-        uint256 salt = uint256(uint160(address(msg.sender)));
-        bytes memory bytecode = type(SingleTokenRewardDistributor).creationCode;
-        bytes memory bytecodeWithArgs = abi.encodePacked(
-            bytecode,
-            abi.encode(_ybs, _reward_token)
+        bytes32 salt = keccak256(abi.encode(msg.sender, _ybs, _reward_token));
+        distributor = Clones.cloneDeterministic(implementation, salt);
+        SingleTokenRewardDistributor(distributor).initialize(
+            IYearnBoostedStaker(_ybs),
+            IERC20(_reward_token)
         );
-        address deployedAddress;
-        assembly {
-            deployedAddress := create2(0, add(bytecodeWithArgs, 0x20), mload(bytecodeWithArgs), salt)
-        }
-        require(deployedAddress != address(0), "Failed to deploy contract");
-
-        return deployedAddress;
     }
-}
\ No newline at end of file
+}
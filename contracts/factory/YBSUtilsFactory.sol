@@ -1,30 +1,34 @@
 // SPDX-License-Identifier: GNU AGPLv3
 pragma solidity ^0.8.22;
 
+import {Clones} from "@openzeppelin/contracts/proxy/Clones.sol";
 import {IERC20, YBSUtilities, IRewardDistributor, IYearnBoostedStaker} from "../utils/YBSUtilities.sol";
 
 
-/// @title Deploys Rewards Distributor Contract
+/// @title Deploys YBS Utilities Contract
 contract YBSUtilsFactory{
 
-    string public constant VERSION = "1.0.0";
+    string public constant VERSION = "2.0.0";
+    address public immutable implementation;
 
+    constructor() {
+        implementation = address(new YBSUtilities());
+    }
+
+    /**
+        @notice Deploy new YBS Utilities contract.
+        @dev We deploy EIP-1167 clones of a single implementation. The CREATE2 salt is
+             derived from msg.sender and the init args.
+    */
     function deploy(
         address _ybs,
         address _rewardsDistributor
     ) external returns (address utils) {
-        uint256 salt = uint256(uint160(address(msg.sender)));
-        bytes memory bytecode = type(YBSUtilities).creationCode;
-        bytes memory bytecodeWithArgs = abi.encodePacked(
-            bytecode,
-            abi.encode(_ybs, _rewardsDistributor)
+        bytes32 salt = keccak256(abi.encode(msg.sender, _ybs, _rewardsDistributor));
+        utils = Clones.cloneDeterministic(implementation, salt);
+        YBSUtilities(utils).initialize(
+            IYearnBoostedStaker(_ybs),
+            IRewardDistributor(_rewardsDistributor)
         );
-        address deployedAddress;
-        assembly {
-            deployedAddress := create2(0, add(bytecodeWithArgs, 0x20), mload(bytecodeWithArgs), salt)
-        }
-        require(deployedAddress != address(0), "Failed to deploy contract");
-
-        return deployedAddress;
     }
-}
\ No newline at end of file
+}
@@ -0,0 +1,16 @@
+// SPDX-License-Identifier: GNU AGPLv3
+pragma solidity ^0.8.22;
+
+interface IYBSRegistry {
+    struct Deployment {
+        address yearnBoostedStaker;
+        address rewardDistributor;
+        address utilities;
+    }
+
+    function owner() external view returns (address);
+    function numTokens() external view returns (uint);
+    function tokens(uint index) external view returns (address);
+    function deployments(address token) external view returns (Deployment memory);
+    function isApprovedDeployer(address _deployer) external view returns (bool);
+}
@@ -65,6 +65,9 @@ interface IYearnBoostedStaker {
     function getGlobalWeight() external view returns (uint);
     function getGlobalWeightAt(uint week) external view returns (uint);
 
+    function projectAccountWeights(address _account, uint _nWeeks) external view returns (uint[] memory weights);
+    function projectGlobalWeights(uint _nWeeks) external view returns (uint[] memory weights);
+
     function getAccountWeightRatio(address _account) external view returns (uint);
     function getAccountWeightRatioAt(address _account, uint _week) external view returns (uint);
 
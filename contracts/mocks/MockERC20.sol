@@ -0,0 +1,22 @@
+// SPDX-License-Identifier: GNU AGPLv3
+pragma solidity ^0.8.22;
+
+import {ERC20} from "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+
+/// @title Mock ERC20
+/// @notice Freely mintable token used by the local (non-fork) test fixtures.
+contract MockERC20 is ERC20 {
+    uint8 immutable _decimals;
+
+    constructor(string memory _name, string memory _symbol, uint8 decimals_) ERC20(_name, _symbol) {
+        _decimals = decimals_;
+    }
+
+    function decimals() public view override returns (uint8) {
+        return _decimals;
+    }
+
+    function mint(address _to, uint _amount) external {
+        _mint(_to, _amount);
+    }
+}
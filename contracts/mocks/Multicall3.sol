@@ -0,0 +1,29 @@
+// SPDX-License-Identifier: GNU AGPLv3
+pragma solidity ^0.8.22;
+
+/// @title Multicall3 stand-in
+/// @notice `aggregate3` of Multicall3 (0xcA11bde05977b3631167028862bE2a173976CA11),
+///         for local test chains where it isn't deployed.
+contract Multicall3 {
+    struct Call3 {
+        address target;
+        bool allowFailure;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    function aggregate3(Call3[] calldata calls) external payable returns (Result[] memory returnData) {
+        uint length = calls.length;
+        returnData = new Result[](length);
+        for (uint i; i < length; ++i) {
+            Call3 calldata call = calls[i];
+            Result memory result = returnData[i];
+            (result.success, result.returnData) = call.target.call(call.callData);
+            require(call.allowFailure || result.success, "Multicall3: call failed");
+        }
+    }
+}
@@ -5,12 +5,14 @@ import {IYearnBoostedStaker} from "../interfaces/IYearnBoostedStaker.sol";
 /**
     @title Week Start
     @dev Provides a unified `START_TIME` and `getWeek` aligned with the staker.
+         `START_TIME` is packed into the first storage slot of inheriting contracts,
+         after the `Initializable` flags.
  */
 contract WeekStart {
-    uint256 public immutable START_TIME;
+    uint48 public START_TIME;
 
-    constructor(IYearnBoostedStaker staker) {
-        START_TIME = staker.START_TIME();
+    function _setWeekStart(IYearnBoostedStaker staker) internal {
+        START_TIME = uint48(staker.START_TIME());
     }
 
     function getWeek() public view returns (uint256 week) {
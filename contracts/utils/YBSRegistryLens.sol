@@ -0,0 +1,70 @@
+// SPDX-License-Identifier: GNU AGPLv3
+pragma solidity ^0.8.22;
+
+import {IYBSRegistry} from "../interfaces/IYBSRegistry.sol";
+import {IYearnBoostedStaker} from "../interfaces/IYearnBoostedStaker.sol";
+import {IRewardDistributor} from "../interfaces/IRewardDistributor.sol";
+
+/// @title YBS Registry Lens
+/// @notice Read-only helper to enumerate registry deployments along with their current stats.
+contract YBSRegistryLens {
+    IYBSRegistry public immutable REGISTRY;
+
+    struct DeploymentStats {
+        address token;
+        address yearnBoostedStaker;
+        address rewardDistributor;
+        address utilities;
+        uint totalSupply;
+        uint globalWeight;
+        uint globalGrowthRate;
+        uint weeklyRewardAmount;        // Rewards deposited to the current week.
+        uint lastWeekRewardAmount;      // Rewards deposited to the prior week.
+    }
+
+    constructor(IYBSRegistry _registry) {
+        REGISTRY = _registry;
+    }
+
+    /**
+        @notice Get deployment addresses and stats for a page of registry tokens.
+        @param _offset Index in `REGISTRY.tokens` to start from.
+        @param _limit Max number of deployments to return.
+        @return stats One entry per deployment, in registry order. Empty if `_offset` is out of range.
+    */
+    function getDeployments(uint _offset, uint _limit) external view returns (DeploymentStats[] memory stats) {
+        uint numTokens = REGISTRY.numTokens();
+        if (_offset >= numTokens) return stats;
+        uint end = _offset + _limit;
+        if (end > numTokens) end = numTokens;
+
+        stats = new DeploymentStats[](end - _offset);
+        for (uint i; i < stats.length; ++i) {
+            stats[i] = getDeployment(REGISTRY.tokens(_offset + i));
+        }
+    }
+
+    /**
+        @notice Get deployment addresses and stats for a single registry token.
+        @param _token Token value used to identify deployment.
+    */
+    function getDeployment(address _token) public view returns (DeploymentStats memory stats) {
+        IYBSRegistry.Deployment memory deployment = REGISTRY.deployments(_token);
+        stats.token = _token;
+        stats.yearnBoostedStaker = deployment.yearnBoostedStaker;
+        stats.rewardDistributor = deployment.rewardDistributor;
+        stats.utilities = deployment.utilities;
+        if (deployment.yearnBoostedStaker == address(0)) return stats;
+
+        IYearnBoostedStaker ybs = IYearnBoostedStaker(deployment.yearnBoostedStaker);
+        stats.totalSupply = ybs.totalSupply();
+        stats.globalWeight = ybs.getGlobalWeight();
+        stats.globalGrowthRate = ybs.globalGrowthRate();
+
+        if (deployment.rewardDistributor == address(0)) return stats;
+        IRewardDistributor distributor = IRewardDistributor(deployment.rewardDistributor);
+        uint week = ybs.getWeek();
+        stats.weeklyRewardAmount = distributor.weeklyRewardAmount(week);
+        if (week > 0) stats.lastWeekRewardAmount = distributor.weeklyRewardAmount(week - 1);
+    }
+}
@@ -5,29 +5,36 @@ import {IERC20} from "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import {IYearnBoostedStaker} from "../interfaces/IYearnBoostedStaker.sol";
 import {IRewardDistributor} from "../interfaces/IRewardDistributor.sol";
 import {IERC20Metadata} from "@openzeppelin/contracts/token/ERC20/extensions/IERC20Metadata.sol";
+import {Initializable} from "@openzeppelin/contracts/proxy/utils/Initializable.sol";
 
-contract YBSUtilities {
+contract YBSUtilities is Initializable {
     uint constant PRECISION = 1e18;
-    uint immutable STAKE_TOKEN_DECIMALS;
-    uint immutable REWARD_TOKEN_DECIMALS;
     uint constant WEEKS_PER_YEAR = 52;
-    uint public immutable MAX_STAKE_GROWTH_WEEKS;
-    IERC20 public immutable TOKEN;
-    IYearnBoostedStaker public immutable YBS;
-    IRewardDistributor public immutable REWARDS_DISTRIBUTOR;
+    // Deployment config. Set once in `initialize`.
+    IYearnBoostedStaker public YBS;
+    uint8 STAKE_TOKEN_DECIMALS;
+    uint8 REWARD_TOKEN_DECIMALS;
+    uint8 public MAX_STAKE_GROWTH_WEEKS;
+    IRewardDistributor public REWARDS_DISTRIBUTOR;
+    IERC20 public TOKEN;
 
-    constructor(
+    constructor() {
+        // Implementation is only used as a clone target.
+        _disableInitializers();
+    }
+
+    function initialize(
         IYearnBoostedStaker _ybs,
         IRewardDistributor _rewardsDistributor
-    ) {
+    ) external initializer {
         YBS = _ybs;
         REWARDS_DISTRIBUTOR = _rewardsDistributor;
-        TOKEN = YBS.stakeToken();
-        STAKE_TOKEN_DECIMALS = YBS.decimals();
+        TOKEN = _ybs.stakeToken();
+        STAKE_TOKEN_DECIMALS = _ybs.decimals();
         REWARD_TOKEN_DECIMALS = IERC20Metadata(
             _rewardsDistributor.rewardToken()
         ).decimals();
-        MAX_STAKE_GROWTH_WEEKS = YBS.MAX_STAKE_GROWTH_WEEKS();
+        MAX_STAKE_GROWTH_WEEKS = uint8(_ybs.MAX_STAKE_GROWTH_WEEKS());
     }
 
     // Boost multiplier based on last week's finalization
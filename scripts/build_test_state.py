@@ -0,0 +1,18 @@
+"""
+    Build the local test chain state dump ahead of a test session:
+
+        ape run build_test_state --network ethereum:local:foundry
+"""
+import sys
+from pathlib import Path
+
+from ape import accounts, project
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tests"))
+from utils import state  # noqa: E402
+
+
+def main():
+    manifest = state.setup_local_chain(project, accounts.test_accounts)
+    path = state.dump_local_chain(project, manifest)
+    print(f"Wrote {path}")
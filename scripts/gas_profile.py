@@ -0,0 +1,75 @@
+"""
+    Attribute a transaction's gas to functions and storage variables.
+
+        python scripts/gas_profile.py <tx hash> [--rpc http://127.0.0.1:8545] [--folded stake.folded]
+
+    The node must support `debug_traceTransaction` with memory enabled (anvil does).
+    Sources are recompiled with the project's solc settings to get source maps and
+    storage layouts, so the traced contracts must match the working tree. The folded
+    output can be rendered with e.g. `inferno-flamegraph < stake.folded > stake.svg`
+    or opened directly in speedscope.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from ybs.rpc import RPC  # noqa: E402
+from ybs.trace import load_solc_output, trace_transaction  # noqa: E402
+
+OUTPUT_SELECTION = {
+    "*": {
+        "*": ["evm.deployedBytecode.object", "evm.deployedBytecode.sourceMap",
+              "evm.deployedBytecode.immutableReferences", "storageLayout"],
+        "": ["ast"],
+    }
+}
+
+
+def compile_sources():
+    """Compile the project through ape-solidity's standard-json input, adding the outputs we need."""
+    import solcx
+    from ape import compilers, project
+
+    sources = [p for p in project.contracts_folder.rglob("*.sol")]
+    inputs = compilers.solidity.get_standard_input_json(sources)
+    outputs = []
+    for version, input_json in inputs.items():
+        input_json["settings"]["outputSelection"] = OUTPUT_SELECTION
+        outputs.append(solcx.compile_standard(
+            input_json, solc_version=version, base_path=project.contracts_folder,
+            allow_paths=[project.contracts_folder],
+        ))
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tx_hash")
+    parser.add_argument("--rpc", default=os.getenv("CHAIN_PROVIDER", "http://127.0.0.1:8545"))
+    parser.add_argument("--folded", help="Write the collapsed-stack profile to this path.")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    contracts = [c for output in compile_sources() for c in load_solc_output(output)]
+    profile = trace_transaction(RPC(args.rpc), args.tx_hash, contracts)
+
+    print(f"⛽️ {args.tx_hash} used {profile.gas_used:,} gas\n")
+    print("Self gas by function")
+    for function, gas in profile.functions.most_common(args.top):
+        print(f"  {gas:>10,}  {gas / profile.gas_used:6.1%}  {function}")
+    print("\nStorage by variable")
+    for (contract, variable, op), gas in profile.storage.most_common(args.top):
+        count = profile.storage_counts[(contract, variable, op)]
+        print(f"  {gas:>10,}  {count:>5}x  {op:<6} {contract}.{variable}")
+
+    if args.folded:
+        Path(args.folded).write_text(profile.folded() + "\n")
+        print(f"\nWrote {args.folded}")
+
+
+if __name__ == "__main__":
+    main()
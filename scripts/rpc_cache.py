@@ -0,0 +1,208 @@
+"""
+    Record/replay JSON-RPC cache for mainnet-fork tests.
+
+    Sits between the forked node and its upstream provider. In `record` mode (default)
+    requests are forwarded upstream and deterministic responses are stored in a sqlite
+    file keyed by method and params, which include the block number. Once a run has
+    been recorded, `replay` mode serves the same run without network access, and
+    misses are returned as JSON-RPC errors.
+
+        python scripts/rpc_cache.py --upstream $MAINNET_RPC_URL [--replay]
+
+    Point the fork at the proxy; ape-config.yaml pins the fork block, so every request
+    carries the same block number from run to run:
+
+        foundry:
+          fork:
+            ethereum:
+              mainnet:
+                upstream_provider: node
+                block_number: 19_500_000    # as pinned there
+        node:
+          ethereum:
+            mainnet:
+              uri: http://127.0.0.1:8645
+
+    Requests for a block tag like "latest" or "pending" have no fixed answer, so they
+    are forwarded but never stored, and replay treats them as misses. Delete the cache
+    file to re-record.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+DEFAULT_PATH = Path(__file__).resolve().parents[1] / ".rpc-cache" / "mainnet.sqlite"
+
+# Methods whose result only depends on their params once the block is fixed, with
+# the position of their block param (None if they have none). `eth_blockNumber`
+# moves with time, so it is always forwarded.
+CACHED_METHODS = {
+    "eth_chainId": None,
+    "net_version": None,
+    "eth_getBlockByNumber": 0,
+    "eth_getBlockByHash": None,
+    "eth_getStorageAt": 2,
+    "eth_getCode": 1,
+    "eth_getBalance": 1,
+    "eth_getTransactionCount": 1,
+    "eth_getTransactionByHash": None,
+    "eth_getTransactionReceipt": None,
+    "eth_call": 1,
+}
+
+
+def cacheable(method, params):
+    """Whether `method` is cached and, if it takes a block, `params` name one by number or hash."""
+    if method not in CACHED_METHODS:
+        return False
+    position = CACHED_METHODS[method]
+    if position is None:
+        return True
+    # A missing block param means "latest".
+    block = params[position] if len(params) > position else None
+    if isinstance(block, dict):  # EIP-1898
+        block = block.get("blockHash") or block.get("blockNumber")
+    return isinstance(block, str) and block.startswith("0x")
+
+
+class RPCCache:
+    def __init__(self, path, upstream=None, replay=False):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, method TEXT, params TEXT, response TEXT)"
+        )
+        self.lock = threading.Lock()
+        self.upstream = upstream
+        self.replay = replay
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(method, params):
+        blob = json.dumps([method, params], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            row = self.db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, key, method, params, response):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, method, json.dumps(params), json.dumps(response)),
+            )
+            self.db.commit()
+
+    def forward(self, payload):
+        request = urllib.request.Request(
+            self.upstream,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return json.loads(response.read())
+
+    def handle(self, payload):
+        """
+            Answer a single request or a batch. Cache hits are served locally and only
+            the misses are forwarded, as one batch.
+        """
+        batch = isinstance(payload, list)
+        requests = payload if batch else [payload]
+        responses = [None] * len(requests)
+        pending = []
+        for i, request in enumerate(requests):
+            method, params = request.get("method"), request.get("params", [])
+            cached = self.get(self.key(method, params)) if cacheable(method, params) else None
+            if cached is not None:
+                self.hits += 1
+                responses[i] = {"jsonrpc": "2.0", "id": request.get("id"), **cached}
+            elif self.replay:
+                self.misses += 1
+                responses[i] = _error(request, f"rpc cache miss: {method} {json.dumps(params)}")
+            else:
+                self.misses += 1
+                pending.append(i)
+
+        if pending:
+            try:
+                upstream = self.forward([requests[i] for i in pending])
+            except (OSError, ValueError) as exc:
+                upstream = {"error": {"message": f"request failed: {exc}"}}
+            # A batch can be answered with a single error object (rate limits, no batching).
+            if isinstance(upstream, list):
+                by_id = {r.get("id"): r for r in upstream if isinstance(r, dict)}
+                failure = "upstream sent no response for this id"
+            else:
+                by_id = {}
+                error = upstream.get("error") if isinstance(upstream, dict) else None
+                failure = f"upstream error: {error.get('message') if isinstance(error, dict) else upstream}"
+            for i in pending:
+                request = requests[i]
+                response = by_id.get(request.get("id"))
+                if response is None:
+                    responses[i] = _error(request, failure)
+                    continue
+                method, params = request.get("method"), request.get("params", [])
+                if cacheable(method, params) and "result" in response and response["result"] is not None:
+                    self.put(self.key(method, params), method, params, {"result": response["result"]})
+                responses[i] = response
+
+        return responses if batch else responses[0]
+
+
+def _error(request, message):
+    return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": -32000, "message": message}}
+
+
+def make_handler(cache):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            response = json.dumps(cache.handle(json.loads(body))).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--upstream", default=os.getenv("YBS_RPC_UPSTREAM"))
+    parser.add_argument("--cache", default=os.getenv("YBS_RPC_CACHE", DEFAULT_PATH))
+    parser.add_argument("--port", type=int, default=8645)
+    parser.add_argument("--replay", action="store_true", help="Serve from the cache only; never touch the network.")
+    args = parser.parse_args()
+    if not args.replay and not args.upstream:
+        parser.error("--upstream (or YBS_RPC_UPSTREAM) is required when recording")
+
+    cache = RPCCache(args.cache, args.upstream, args.replay)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(cache))
+    mode = "replaying" if args.replay else f"recording from {args.upstream}"
+    print(f"rpc cache on http://127.0.0.1:{args.port}, {mode} ({args.cache})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"{cache.hits} hits, {cache.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
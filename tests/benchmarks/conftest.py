@@ -0,0 +1,176 @@
+"""
+    Gas benchmarks. Skipped unless YBS_BENCHMARK is set, since they mine a few thousand
+    blocks per run:
+
+        YBS_BENCHMARK=1 ape test tests/benchmarks         # measure and diff against the baseline
+        YBS_BENCHMARK=update ape test tests/benchmarks    # also rewrite the baseline
+
+    Results are written to `results.json` next to this file. Any case costing more than
+    YBS_BENCHMARK_TOLERANCE (default 0) gas over `baseline.json` fails the session, so a
+    regression has to be accepted by committing an updated baseline. So does a case
+    missing from the baseline, or a missing baseline: new cases are recorded with
+    "update" and committed along with the change that adds them.
+
+    Cases recorded with `features` are also written to `samples.json` and calibrate
+    `ybs.gas`. The summary shows the committed `gas_model.json`'s error against this
+    run's receipts next to that of a fresh fit; "update" rewrites `gas_model.json`, and
+    without it a missing model fails the session like a missing baseline.
+
+    `test_clone_overhead` also deploys the contracts as of YBS_PRE_CLONE_REF (default:
+    the last commit before deployments became EIP-1167 clones), so the summary shows
+    what the switch costs on deployment and on the hot paths.
+"""
+import io
+import json
+import os
+import subprocess
+import tarfile
+from pathlib import Path
+
+import pytest
+from ape import Project, chain
+from ybs.gas import GasModel, format_report
+
+BENCHMARK = os.getenv("YBS_BENCHMARK", "")
+TOLERANCE = int(os.getenv("YBS_BENCHMARK_TOLERANCE", "0"))
+BENCHMARK_DIR = Path(__file__).resolve().parent
+RESULTS_PATH = BENCHMARK_DIR / "results.json"
+BASELINE_PATH = BENCHMARK_DIR / "baseline.json"
+SAMPLES_PATH = BENCHMARK_DIR / "samples.json"
+GAS_MODEL_PATH = BENCHMARK_DIR / "gas_model.json"
+ROOT = BENCHMARK_DIR.parents[1]
+PRE_CLONE_REF = os.getenv("YBS_PRE_CLONE_REF", "790920d")
+
+results = {}
+samples = []
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: gas benchmark, only run when YBS_BENCHMARK is set")
+
+
+def pytest_collection_modifyitems(config, items):
+    skip = pytest.mark.skip(reason="set YBS_BENCHMARK=1 to run gas benchmarks")
+    for item in items:
+        if BENCHMARK_DIR in Path(item.fspath).parents:
+            item.add_marker("benchmark")
+            if not BENCHMARK:
+                item.add_marker(skip)
+
+
+def diff_results(baseline, current):
+    """
+        Return (key, before, after) for every case whose gas changed or is new.
+        `before` is None for new cases.
+    """
+    return [
+        (key, baseline.get(key), gas)
+        for key, gas in sorted(current.items())
+        if baseline.get(key) != gas
+    ]
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not results:
+        return
+    RESULTS_PATH.write_text(json.dumps(dict(sorted(results.items())), indent=2) + "\n")
+    if samples:
+        SAMPLES_PATH.write_text(json.dumps(samples, indent=1) + "\n")
+        if BENCHMARK == "update":
+            GasModel.fit(samples).save(GAS_MODEL_PATH)
+        elif not GAS_MODEL_PATH.exists():
+            session.exitstatus = 1
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    failures = [
+        (key, before, after) for key, before, after in diff_results(baseline, results)
+        if before is None or after - before > TOLERANCE
+    ]
+    if BENCHMARK == "update":
+        BASELINE_PATH.write_text(json.dumps({**baseline, **dict(sorted(results.items()))}, indent=2) + "\n")
+    elif failures:
+        session.exitstatus = 1
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not results:
+        return
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    terminalreporter.section("⛽️ gas benchmarks")
+    changes = diff_results(baseline, results)
+    if not baseline:
+        terminalreporter.write_line(f"no baseline at {BASELINE_PATH}, run with YBS_BENCHMARK=update and commit it")
+    for key, before, after in changes:
+        if before is None:
+            terminalreporter.write_line(f"{key:<60} {after:>10,} (not in baseline)")
+        else:
+            terminalreporter.write_line(f"{key:<60} {before:>10,} -> {after:>10,} ({after - before:+,})")
+    terminalreporter.write_line(f"{len(results)} cases, {len(changes)} changed, results in {RESULTS_PATH}")
+    clones = [
+        (key.replace("build=pre_clone", "build=*"), gas, results.get(key.replace("pre_clone", "clone")))
+        for key, gas in sorted(results.items()) if "build=pre_clone" in key
+    ]
+    if clones:
+        terminalreporter.section(f"clones against {PRE_CLONE_REF}")
+        for key, before, after in clones:
+            if after is not None:
+                terminalreporter.write_line(f"{key:<60} {before:>10,} -> {after:>10,} ({after - before:+,})")
+    if samples:
+        terminalreporter.section("gas model")
+        if GAS_MODEL_PATH.exists():
+            terminalreporter.write_line(f"{GAS_MODEL_PATH} against this run:")
+            terminalreporter.write_line(format_report(GasModel.load(GAS_MODEL_PATH).report(samples)))
+        else:
+            terminalreporter.write_line(f"no model at {GAS_MODEL_PATH}, run with YBS_BENCHMARK=update and commit it")
+        terminalreporter.write_line("refitted to this run:")
+        terminalreporter.write_line(format_report(GasModel.fit(samples).report(samples)))
+
+
+@pytest.fixture
+def gas():
+    """
+        Record a receipt's gas under `name` and any parameters, e.g.
+        `gas(tx, "unstake", max=4, shape="full")` -> "unstake[max=4,shape=full]".
+        `features` (from `ybs.gas`, read before the transaction) also keeps it as a
+        calibration sample for `name`.
+    """
+    def record(tx, name, features=None, **params):
+        key = name + ("[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]" if params else "")
+        results[key] = tx.gas_used
+        if features is not None:
+            samples.append({"case": key, "op": name, "features": features, "gas": tx.gas_used})
+        return tx.gas_used
+    return record
+
+
+
+@pytest.fixture(scope="session")
+def pre_clone_project(tmp_path_factory):
+    """The contracts as of PRE_CLONE_REF, compiled as a project of their own."""
+    path = tmp_path_factory.mktemp("pre_clone")
+    archive = subprocess.run(
+        ["git", "archive", PRE_CLONE_REF, "contracts", "ape-config.yaml"], cwd=ROOT, capture_output=True, check=True
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(path)
+    return Project(path)
+
+
+@pytest.fixture
+def deploy_pre_clone_ybs(project, pre_clone_project, gov):
+    """`deploy_ybs`, through a registry and factories built from PRE_CLONE_REF."""
+    factories = [
+        gov.deploy(pre_clone_project.YBSFactory),
+        gov.deploy(pre_clone_project.YBSRewardFactory),
+        gov.deploy(pre_clone_project.YBSUtilsFactory),
+    ]
+    registry = gov.deploy(pre_clone_project.YBSRegistry, gov, *factories, [])
+
+    def deploy(max_weeks):
+        token = gov.deploy(project.MockERC20, "Benchmark", "BENCH", 18)
+        reward_token = gov.deploy(project.MockERC20, "Benchmark Reward", "BREWARD", 18)
+        tx = registry.createNewDeployment(token, max_weeks, chain.pending_timestamp, reward_token, sender=gov)
+        deployment = registry.deployments(token)
+        staker = pre_clone_project.YearnBoostedStaker.at(deployment.yearnBoostedStaker)
+        rewards = pre_clone_project.SingleTokenRewardDistributor.at(deployment.rewardDistributor)
+        return token, reward_token, staker, rewards, tx
+    return deploy
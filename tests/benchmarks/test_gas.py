@@ -0,0 +1,231 @@
+import pytest
+from ape import chain
+from utils.constants import WEEK, MAX_INT, ApprovalStatus
+from utils.batch import ProviderRPC, rpc
+from ybs.access_list import AccessListBuilder, to_access_list
+from ybs.gas import claim_features, staker_features
+
+MAX_WEEKS = range(1, 8)
+IDLE_WEEKS = [1, 2, 4, 8, 13, 26, 52]
+CLAIM_WEEKS = [1, 4, 13, 52, 104]
+ACCESS_LIST_MAX_WEEKS = [1, 4, 7]
+ACCESS_LIST_CASES = ["none", "derived"]
+AMOUNT = 1_000 * 10 ** 18
+
+# Unstake shapes, as one flag per week for whether a stake is made that week. The
+# unstake happens in the last week. "realized" waits out the growth period so the
+# bitmap is empty, "spread" sets every pending bit and "mixed" has both.
+UNSTAKE_SHAPES = {
+    "single": lambda m: [True],
+    "spread": lambda m: [True] * m,
+    "realized": lambda m: [True] + [False] * m,
+    "mixed": lambda m: [True] + [False] * m + [True] * m,
+}
+
+
+def advance(weeks=1):
+    chain.pending_timestamp += weeks * WEEK
+    chain.mine()
+
+
+def fund(token, staker, account, gov, amount=AMOUNT * 100):
+    token.mint(account, amount, sender=gov)
+    token.approve(staker, MAX_INT, sender=account)
+
+
+def _account_data(staker, account):
+    data = staker.accountData(account)
+    return data.realizedStake, data.pendingStake, data.lastUpdateWeek, data.updateWeeksBitmap
+
+
+def _global_last_update_week(staker):
+    week = staker.globalLastUpdateWeek()
+    return week if staker.getGlobalWeightAt(week) else None
+
+
+def staker_state(staker, account):
+    """`ybs.gas` features of `account`'s next stake, unstake or checkpoint."""
+    return staker_features(
+        staker.getWeek(), staker.MAX_STAKE_GROWTH_WEEKS(), _account_data(staker, account), _global_last_update_week(staker)
+    )
+
+
+def claim_state(staker, rewards, account, start_week=0, end_week=None):
+    """`ybs.gas` features of `account`'s next claim, clamped as the contract does."""
+    current = rewards.getWeek()
+    end_week = current - 1 if end_week is None else end_week
+    start_week = max(rewards.accountInfo(account).lastClaimWeek or rewards.START_WEEK(), start_week)
+    weeks = range(start_week, end_week + 1)
+    return claim_features(
+        start_week, end_week, staker.MAX_STAKE_GROWTH_WEEKS(), _account_data(staker, account),
+        _global_last_update_week(staker), [rewards.weeklyRewardAmount(w) for w in weeks],
+    )
+
+
+def send(method, *args, sender, access_list=None):
+    """Send through `eth_sendTransaction`, so the node gets `accessList` exactly as given."""
+    tx = {"from": sender.address, "to": method.contract.address, "data": method.encode_input(*args).hex()}
+    if not tx["data"].startswith("0x"):
+        tx["data"] = "0x" + tx["data"]
+    if access_list is not None:
+        tx["accessList"] = access_list
+    return chain.provider.get_receipt(rpc("eth_sendTransaction", tx))
+
+
+@pytest.mark.parametrize("max_weeks", MAX_WEEKS)
+def test_create_new_deployment(deploy_ybs, gas, max_weeks):
+    *_, tx = deploy_ybs(max_weeks)
+    gas(tx, "createNewDeployment", max=max_weeks)
+
+
+@pytest.mark.parametrize("build", ["pre_clone", "clone"])
+def test_clone_overhead(request, gas, gov, user, user2, build):
+    """The same deployment and calls, with full contracts and with clones."""
+    deploy = request.getfixturevalue("deploy_pre_clone_ybs" if build == "pre_clone" else "deploy_ybs")
+    token, reward_token, staker, rewards, tx = deploy(4)
+    gas(tx, "createNewDeployment", build=build)
+    fund(token, staker, user, gov)
+    fund(token, staker, user2, gov)
+    reward_token.mint(gov, AMOUNT, sender=gov)
+    reward_token.approve(rewards, MAX_INT, sender=gov)
+
+    gas(staker.stake(AMOUNT, sender=user), "stake", build=build)
+    staker.stake(AMOUNT, sender=user2)
+    advance()
+    rewards.depositReward(AMOUNT, sender=gov)
+    advance()
+    gas(staker.unstake(AMOUNT // 2, user, sender=user), "unstake", build=build)
+    gas(rewards.claim(sender=user), "claim", build=build)
+
+
+@pytest.mark.parametrize("max_weeks", MAX_WEEKS)
+def test_stake(deploy_ybs, gas, gov, user, user2, accounts, max_weeks):
+    token, _, staker, _, _ = deploy_ybs(max_weeks)
+    fund(token, staker, user, gov)
+    fund(token, staker, user2, gov)
+
+    for case in ("first", "same_week", "next_week"):
+        if case == "next_week":
+            advance()
+        features = staker_state(staker, user)
+        gas(staker.stake(AMOUNT, sender=user), "stake", features, max=max_weeks, case=case)
+
+    staker.setApprovedCaller(user2, ApprovalStatus.STAKE_ONLY, sender=user)
+    gas(staker.stakeFor(user, AMOUNT, sender=user2), "stakeFor", max=max_weeks)
+
+    staker.setWeightedStaker(user2, True, sender=accounts[staker.owner()])
+    gas(staker.stakeAsMaxWeighted(user, AMOUNT, sender=user2), "stakeAsMaxWeighted", max=max_weeks)
+
+
+@pytest.mark.parametrize("portion", ["partial", "full"])
+@pytest.mark.parametrize("shape", UNSTAKE_SHAPES)
+@pytest.mark.parametrize("max_weeks", MAX_WEEKS)
+def test_unstake(deploy_ybs, gas, gov, user, max_weeks, shape, portion):
+    token, _, staker, _, _ = deploy_ybs(max_weeks)
+    fund(token, staker, user, gov)
+
+    for i, stake in enumerate(UNSTAKE_SHAPES[shape](max_weeks)):
+        if i > 0:
+            advance()
+        if stake:
+            staker.stake(AMOUNT, sender=user)
+
+    balance = staker.balanceOf(user)
+    amount = balance if portion == "full" else balance * 2 // 3
+    features = staker_state(staker, user)
+    tx = staker.unstake(amount, user, sender=user)
+    gas(tx, "unstake", features, max=max_weeks, shape=shape, portion=portion)
+
+
+@pytest.mark.parametrize("idle", IDLE_WEEKS)
+@pytest.mark.parametrize("max_weeks", MAX_WEEKS)
+def test_checkpoint_account(deploy_ybs, gas, gov, user, max_weeks, idle):
+    token, _, staker, _, _ = deploy_ybs(max_weeks)
+    fund(token, staker, user, gov)
+    staker.stake(AMOUNT, sender=user)
+    advance(idle)
+    features = staker_state(staker, user)
+    gas(staker.checkpointAccount(user, sender=user), "checkpointAccount", features, max=max_weeks, idle=idle)
+
+
+@pytest.mark.parametrize("idle", IDLE_WEEKS)
+@pytest.mark.parametrize("max_weeks", MAX_WEEKS)
+def test_checkpoint_global(deploy_ybs, gas, gov, user, max_weeks, idle):
+    token, _, staker, _, _ = deploy_ybs(max_weeks)
+    fund(token, staker, user, gov)
+    staker.stake(AMOUNT, sender=user)
+    advance(idle)
+    features = staker_state(staker, user)
+    gas(staker.checkpointGlobal(sender=user), "checkpointGlobal", features, max=max_weeks, idle=idle)
+
+
+@pytest.mark.parametrize("weeks", CLAIM_WEEKS)
+@pytest.mark.parametrize("max_weeks", MAX_WEEKS)
+def test_claim(deploy_ybs, gas, gov, user, user2, max_weeks, weeks):
+    token, reward_token, staker, rewards, _ = deploy_ybs(max_weeks)
+    fund(token, staker, user, gov)
+    fund(token, staker, user2, gov)
+    reward_token.mint(gov, AMOUNT * weeks, sender=gov)
+    reward_token.approve(rewards, MAX_INT, sender=gov)
+
+    # Stakes are excluded from rewards in the week they are made.
+    staker.stake(AMOUNT, sender=user)
+    staker.stake(AMOUNT, sender=user2)
+    advance()
+    for _ in range(weeks):
+        rewards.depositReward(AMOUNT, sender=gov)
+        advance()
+
+    features = claim_state(staker, rewards, user)
+    gas(rewards.claim(sender=user), "claim", features, max=max_weeks, weeks=weeks)
+
+
+@pytest.mark.parametrize("access_list", ACCESS_LIST_CASES)
+@pytest.mark.parametrize("function", ["stake", "unstake", "checkpointAccount"])
+@pytest.mark.parametrize("idle", IDLE_WEEKS)
+@pytest.mark.parametrize("max_weeks", ACCESS_LIST_MAX_WEEKS)
+def test_idle_access_list(deploy_ybs, gas, gov, user, max_weeks, idle, function, access_list):
+    token, _, staker, _, _ = deploy_ybs(max_weeks)
+    fund(token, staker, user, gov)
+    staker.stake(AMOUNT, sender=user)
+    advance(idle)
+
+    builder = AccessListBuilder(ProviderRPC())
+    if function == "stake":
+        method, args = staker.stake, (AMOUNT,)
+        touched = builder.stake(staker.address, user.address, AMOUNT)
+    elif function == "unstake":
+        method, args = staker.unstake, (AMOUNT // 2, user)
+        touched = builder.unstake(staker.address, user.address, AMOUNT // 2, user.address)
+    else:
+        method, args = staker.checkpointAccount, (user,)
+        touched = builder.checkpoint_account(staker.address, user.address)
+    listed = to_access_list(touched, sender=user.address, to=staker.address) if access_list == "derived" else None
+    features = staker_state(staker, user) if listed is None else None
+    tx = send(method, *args, sender=user, access_list=listed)
+    gas(tx, function, features, max=max_weeks, idle=idle, access_list=access_list)
+
+
+@pytest.mark.parametrize("access_list", ACCESS_LIST_CASES)
+@pytest.mark.parametrize("weeks", CLAIM_WEEKS)
+@pytest.mark.parametrize("max_weeks", ACCESS_LIST_MAX_WEEKS)
+def test_claim_with_range_access_list(deploy_ybs, gas, gov, user, user2, max_weeks, weeks, access_list):
+    token, reward_token, staker, rewards, _ = deploy_ybs(max_weeks)
+    fund(token, staker, user, gov)
+    fund(token, staker, user2, gov)
+    reward_token.mint(gov, AMOUNT * weeks, sender=gov)
+    reward_token.approve(rewards, MAX_INT, sender=gov)
+
+    staker.stake(AMOUNT, sender=user)
+    staker.stake(AMOUNT, sender=user2)
+    advance()
+    for _ in range(weeks):
+        rewards.depositReward(AMOUNT, sender=gov)
+        advance()
+
+    start, end = rewards.getSuggestedClaimRange(user)
+    touched = AccessListBuilder(ProviderRPC()).claim_with_range(rewards.address, user.address, start, end)
+    listed = to_access_list(touched, sender=user.address, to=rewards.address) if access_list == "derived" else None
+    features = claim_state(staker, rewards, user, start, end) if listed is None else None
+    tx = send(rewards.claimWithRange, start, end, sender=user, access_list=listed)
+    gas(tx, "claimWithRange", features, max=max_weeks, weeks=weeks, access_list=access_list)
@@ -4,6 +4,8 @@ from ape import chain, Contract
 from ape.types import ContractLog
 import time
 import os
+import sys
+from pathlib import Path
 from web3 import Web3, HTTPProvider
 from hexbytes import HexBytes
 import json
@@ -12,16 +14,58 @@ from utils.constants import (
     YEARN_FEE_RECEIVER, 
     MAX_INT, 
     ApprovalStatus, 
-    ZERO_ADDRESS
+    ZERO_ADDRESS,
+    WEEK,
+    PRISMA_CORE,
+    YEARN_GOV,
+    MAX_GROWTH_WEEKS,
 )
+from utils import state
+
+# Off-chain tooling in ybs/ is tested against the contracts from here.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# With pytest-xdist (`ape compile && ape test -n auto --dist worksteal`) each worker
+# launches its own node on a distinct port, so workers never share chain state or snapshots.
+XDIST_WORKER = os.getenv("PYTEST_XDIST_WORKER")
+if XDIST_WORKER:
+    worker_port = int(os.getenv("YBS_BASE_PORT", "8545")) + 1 + int(XDIST_WORKER.lstrip("gw"))
+    os.environ["CHAIN_PROVIDER"] = f"http://127.0.0.1:{worker_port}"
 
 # we default to local node
 w3 = Web3(HTTPProvider(os.getenv("CHAIN_PROVIDER", "http://127.0.0.1:8545")))
 
+
+def pytest_configure(config):
+    if XDIST_WORKER:
+        # Must happen before ape connects, which is after configuration.
+        ape.config.get_config("foundry").host = os.environ["CHAIN_PROVIDER"]
+
+# By default fixtures read tokens, whales and start time from mainnet fork state.
+# Set YBS_TEST_MODE=local to use mintable mock tokens instead, so the suite
+# runs offline against a plain local node:
+#   YBS_TEST_MODE=local ape test --network ethereum:local:foundry
+# Local setup is loaded from a cached state dump when one matches (see utils/state.py).
+LOCAL_MODE = os.getenv("YBS_TEST_MODE", "fork") == "local"
+
+
+@pytest.fixture(scope="session")
+def local_chain(project, accounts):
+    """
+        Manifest of the addresses set up by `state.setup_local_chain`, or None on a fork.
+        Every session fixture that touches the chain depends on this, so the state dump
+        is loaded before anything else is deployed.
+    """
+    if LOCAL_MODE:
+        yield state.local_chain(project, accounts)
+    else:
+        yield None
+
+
 # Accounts
 @pytest.fixture(scope="session")
-def gov(accounts):
-    gov = accounts['0xFEB4acf3df3cDEA7399794D0869ef76A6EfAff52']
+def gov(accounts, local_chain):
+    gov = accounts[YEARN_GOV]
     gov.balance += 10 ** 18
     # accounts[0].transfer(gov, 10**18)
     yield gov
@@ -58,15 +102,32 @@ def rando(accounts):
     yield accounts[9]
 
 @pytest.fixture(scope="session")
-def yprisma():
-    yield Contract('0xe3668873D944E4A949DA05fc8bDE419eFF543882')
+def start_time(local_chain):
+    if LOCAL_MODE:
+        yield local_chain['start_time']
+    else:
+        yield Contract(PRISMA_CORE).startTime()
+
+@pytest.fixture(scope="session")
+def yprisma(project, local_chain):
+    if LOCAL_MODE:
+        yield project.MockERC20.at(local_chain['yprisma'])
+    else:
+        yield Contract('0xe3668873D944E4A949DA05fc8bDE419eFF543882')
 
 @pytest.fixture(scope="session")
-def prisma():
-    yield Contract('0xdA47862a83dac0c112BA89c6abC2159b95afd71C')
+def prisma(project, local_chain):
+    if LOCAL_MODE:
+        yield project.MockERC20.at(local_chain['prisma'])
+    else:
+        yield Contract('0xdA47862a83dac0c112BA89c6abC2159b95afd71C')
 
 @pytest.fixture(scope="session")
-def yprisma_whale(accounts, fee_receiver, user, yprisma, user2, user3, rando, gov):
+def yprisma_whale(accounts, fee_receiver, user, yprisma, user2, user3, rando, gov, local_chain):
+    if LOCAL_MODE:
+        # Balances were minted during local setup.
+        yield accounts[local_chain['yprisma_whale']]
+        return
     whale = accounts['0x69833361991ed76f9e8DBBcdf9ea1520fEbFb4a7']
     whale.balance += 10 ** 18
     yprisma.transfer(user, 100_000 * 10 ** 18, sender=whale)
@@ -79,25 +140,40 @@ def yprisma_whale(accounts, fee_receiver, user, yprisma, user2, user3, rando, go
 
 
 @pytest.fixture(scope="session")
-def mkusd():
-    yield Contract('0x4591DBfF62656E7859Afe5e45f6f47D3669fBB28')
+def mkusd(project, local_chain):
+    if LOCAL_MODE:
+        yield project.MockERC20.at(local_chain['mkusd'])
+    else:
+        yield Contract('0x4591DBfF62656E7859Afe5e45f6f47D3669fBB28')
 
 @pytest.fixture(scope="session")
-def yvmkusd():
-    yield Contract('0x04AeBe2e4301CdF5E9c57B01eBdfe4Ac4B48DD13')
+def yvmkusd(project, local_chain):
+    if LOCAL_MODE:
+        yield project.MockERC20.at(local_chain['yvmkusd'])
+    else:
+        yield Contract('0x04AeBe2e4301CdF5E9c57B01eBdfe4Ac4B48DD13')
 
 @pytest.fixture(scope="session")
-def dai_whale(accounts):
+def dai_whale(accounts, dai, local_chain):
+    if LOCAL_MODE:
+        yield accounts[local_chain['dai_whale']]
+        return
     whale = accounts['0x40ec5B33f54e0E8A33A975908C5BA1c14e5BbbDf']
     whale.balance += 10 ** 18
     yield whale
 
 @pytest.fixture(scope="session")
-def dai():
-    yield Contract('0x6B175474E89094C44Da98b954EedeAC495271d0F')
+def dai(project, local_chain):
+    if LOCAL_MODE:
+        yield project.MockERC20.at(local_chain['dai'])
+    else:
+        yield Contract('0x6B175474E89094C44Da98b954EedeAC495271d0F')
 
 @pytest.fixture(scope="session")
-def yvmkusd_whale(accounts, yvmkusd, fee_receiver, mkusd):
+def yvmkusd_whale(accounts, yvmkusd, fee_receiver, mkusd, local_chain):
+    if LOCAL_MODE:
+        yield accounts[local_chain['yvmkusd_whale']]
+        return
     whale = accounts['0x93A62dA5a14C80f265DAbC077fCEE437B1a0Efde']
     sp = accounts['0xed8B26D99834540C5013701bB3715faFD39993Ba']
     sp.balance += 10 ** 18
@@ -108,18 +184,15 @@ def yvmkusd_whale(accounts, yvmkusd, fee_receiver, mkusd):
     yield whale
 
 @pytest.fixture(scope="session")
-def staker(project, yprisma, user, gov, yvmkusd, registry):
-    MAX_GROWTH_WEEKS = 4
-    PRISMA_CORE = '0x5d17eA085F2FF5da3e6979D5d26F1dBaB664ccf8'
-    start_time = Contract(PRISMA_CORE).startTime()
-    tx = registry.createNewDeployment(
-        yprisma,  # token
-        MAX_GROWTH_WEEKS,   # max stake growth weeks
-        start_time,         # start time
-        yvmkusd,
-        sender=gov
-    )
-    registry.deployments(yprisma)
+def staker(project, yprisma, user, gov, yvmkusd, registry, start_time):
+    if not LOCAL_MODE:  # Local setup already created the deployment.
+        tx = registry.createNewDeployment(
+            yprisma,  # token
+            MAX_GROWTH_WEEKS,   # max stake growth weeks
+            start_time,         # start time
+            yvmkusd,
+            sender=gov
+        )
     deployments = registry.deployments(yprisma)
     yield project.YearnBoostedStaker.at(deployments.yearnBoostedStaker)
     # start_time = Contract('0x5d17eA085F2FF5da3e6979D5d26F1dBaB664ccf8').startTime()
@@ -135,6 +208,8 @@ def staker(project, yprisma, user, gov, yvmkusd, registry):
 
 @pytest.fixture(scope="session")
 def prisma_vault():
+    if LOCAL_MODE:
+        pytest.skip("Prisma vault is only available on a mainnet fork")
     yield Contract('0x06bDF212C290473dCACea9793890C5024c7Eb02c')
 
 @pytest.fixture(scope="session")
@@ -174,7 +249,11 @@ def fee_receiver(rewards, accounts, gov_token, stable_token):
     fr_account.balance += 20 ** 18
     gov_token.approve(rewards, 2**256-1, sender=fr_account)
     stable_token.approve(rewards, 2**256-1, sender=fr_account)
-    yield Contract(fee_receiver)
+    if LOCAL_MODE:
+        # There is no contract code behind the fee receiver locally.
+        yield fr_account
+    else:
+        yield Contract(fee_receiver)
 
 @pytest.fixture(scope="session")
 def fee_receiver_acc(rewards, accounts, gov_token, stable_token):
@@ -185,19 +264,49 @@ def fee_receiver_acc(rewards, accounts, gov_token, stable_token):
     stable_token.approve(rewards, 2**256-1, sender=fr_account)
     yield fr_account
 
+@pytest.fixture(scope="session")
+def base_state(
+    registry, staker, rewards, utils, yprisma, prisma, mkusd, yvmkusd, dai, 
+    user, user2, user3, rando, gov, ylockers, fee_receiver, fee_receiver_acc,
+    yprisma_whale, yvmkusd_whale, dai_whale, accounts
+):
+    """
+        Every session fixture that writes chain state must be set up here, before the
+        snapshot is taken. A session fixture first created inside a test would be
+        reverted on-chain while staying cached in pytest.
+    """
+    for u in [user, user2, user3, gov]:
+        yprisma.approve(staker, 2**256-1, sender=u)
+    owner = accounts[staker.owner()]
+    owner.balance += 10**18
+    yield
+
+
+# Every fixture that touches the chain depends on at least one of ape's.
+CHAIN_FIXTURES = {"accounts", "chain", "project", "networks"}
+
+
+@pytest.fixture(autouse=True)
+def isolation(request):
+    """
+        Revert to the post-deployment state around every test that uses chain
+        fixtures, so tests don't inherit each other's stakes, time travel or
+        checkpoint backlog. Pure-Python tests skip the deployment altogether.
+    """
+    if not CHAIN_FIXTURES & set(request.fixturenames):
+        yield
+        return
+    request.getfixturevalue("base_state")
+    snapshot = chain.snapshot()
+    yield
+    chain.restore(snapshot)
+
+
 @pytest.fixture(scope="function")
 def stake_and_deposit_rewards(yvmkusd_whale, user, accounts, staker, gov, user3, user2, yprisma, yvmkusd, rewards, fee_receiver, yprisma_whale):
     fr_account = accounts[fee_receiver.address]
-    fr_account.balance += 20 ** 18
-    yprisma.approve(staker, 2**256-1, sender=user)
-    yprisma.approve(staker, 2**256-1, sender=user2)
-    yprisma.approve(staker, 2**256-1, sender=gov)
-    yprisma.approve(staker, 2**256-1, sender=user3)
-    yprisma.approve(rewards, 2**256-1, sender=fr_account)
-    yvmkusd.approve(rewards, 2**256-1, sender=fr_account)
     # Enable stakes
     owner = accounts[staker.owner()]
-    owner.balance += 10**18
     staker.setWeightedStaker(gov, True, sender=owner)
     rewards.configureRecipient(ZERO_ADDRESS, sender=user)
 
@@ -214,6 +323,24 @@ def stake_and_deposit_rewards(yvmkusd_whale, user, accounts, staker, gov, user3,
     
     yield stake_and_deposit_rewards
 
+@pytest.fixture
+def deploy_ybs(project, registry, gov):
+    """
+        Create a YBS deployment with `max_weeks` growth weeks over fresh mock stake and
+        reward tokens, starting this week, so every benchmark or load run begins from the
+        same empty state.
+    """
+    def deploy(max_weeks):
+        token = gov.deploy(project.MockERC20, "Benchmark", "BENCH", 18)
+        reward_token = gov.deploy(project.MockERC20, "Benchmark Reward", "BREWARD", 18)
+        tx = registry.createNewDeployment(token, max_weeks, chain.pending_timestamp, reward_token, sender=gov)
+        deployment = registry.deployments(token)
+        staker = project.YearnBoostedStaker.at(deployment.yearnBoostedStaker)
+        rewards = project.SingleTokenRewardDistributor.at(deployment.rewardDistributor)
+        return token, reward_token, staker, rewards, tx
+    return deploy
+
+
 @pytest.fixture(scope="function")
 def deposit_rewards(yvmkusd_whale, rewards, fee_receiver, accounts):
     fr_account = accounts[fee_receiver.address]
@@ -223,7 +350,10 @@ def deposit_rewards(yvmkusd_whale, rewards, fee_receiver, accounts):
     yield deposit_rewards
 
 @pytest.fixture(scope="session")
-def registry(project, yprisma, user, gov, rando):
+def registry(project, yprisma, user, gov, rando, local_chain):
+    if LOCAL_MODE:
+        yield project.YBSRegistry.at(local_chain['registry'])
+        return
     approved_deployers = [rando]
     ybs_factory = user.deploy(
         project.YBSFactory
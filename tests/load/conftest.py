@@ -0,0 +1,69 @@
+"""
+    Load tests. Skipped unless YBS_LOAD is set, since a run mines thousands of
+    transactions for every growth-weeks setting and arrival pattern:
+
+        YBS_LOAD=1 ape test tests/load --network ethereum:local:foundry
+        YBS_LOAD=1 YBS_LOAD_ACCOUNTS=10000 YBS_LOAD_WEEKS=104 YBS_LOAD_SEED=7 ape test tests/load ...
+
+    See `test_load.py` for the other settings. Each case's summary is written to
+    `report.json` next to this file and shown at the end of the session; the same
+    settings and seed give the same transactions and gas.
+"""
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+from utils.load import PERCENTILES, format_summary
+
+LOAD = os.getenv("YBS_LOAD", "")
+LOAD_DIR = Path(__file__).resolve().parent
+REPORT_PATH = LOAD_DIR / "report.json"
+
+reports = {}
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "load: load test, only run when YBS_LOAD is set")
+
+
+def pytest_collection_modifyitems(config, items):
+    skip = pytest.mark.skip(reason="set YBS_LOAD=1 to run load tests")
+    for item in items:
+        if LOAD_DIR in Path(item.fspath).parents:
+            item.add_marker("load")
+            if not LOAD:
+                item.add_marker(skip)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if reports:
+        REPORT_PATH.write_text(json.dumps(dict(sorted(reports.items())), indent=1) + "\n")
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not reports:
+        return
+    terminalreporter.section("load")
+    for key, report in sorted(reports.items()):
+        terminalreporter.write_line(key)
+        terminalreporter.write_line(format_summary(report["summary"]))
+    # How the tail moves with the growth-weeks setting, per op.
+    top = f"p{PERCENTILES[-1]}"
+    terminalreporter.write_line(f"\n{'case':<40} {'op':<8} {top:>10} {'max':>10}")
+    for key, report in sorted(reports.items()):
+        for op, gas in report["summary"]["gas"].items():
+            if gas:
+                terminalreporter.write_line(f"{key:<40} {op:<8} {gas[top]:>10,} {gas['max']:>10,}")
+    terminalreporter.write_line(f"{len(reports)} cases, report in {REPORT_PATH}")
+
+
+@pytest.fixture
+def load_report():
+    """Record a run's `summarize` output under its config, e.g. "load[max=4,arrival=steady]"."""
+    def record(config, summary):
+        key = f"load[max={config.max_weeks},arrival={config.arrival}]"
+        reports[key] = {"config": asdict(config), "summary": summary}
+        return key
+    return record
@@ -0,0 +1,39 @@
+import os
+import random
+
+import pytest
+from utils.load import ARRIVALS, LoadConfig, LoadRunner
+
+MAX_WEEKS = [int(w) for w in os.getenv("YBS_LOAD_MAX_WEEKS", "1,2,3,4,5,6,7").split(",")]
+ARRIVAL_CASES = os.getenv("YBS_LOAD_ARRIVALS", ",".join(ARRIVALS)).split(",")
+CONFIG = {
+    "accounts": int(os.getenv("YBS_LOAD_ACCOUNTS", "2000")),
+    "weeks": int(os.getenv("YBS_LOAD_WEEKS", "26")),
+    "actions_per_week": int(os.getenv("YBS_LOAD_ACTIONS", "500")),
+    "per_block": int(os.getenv("YBS_LOAD_PER_BLOCK", "250")),
+    "seed": int(os.getenv("YBS_LOAD_SEED", "0")),
+}
+SAMPLED_ACCOUNTS = 50
+
+
+@pytest.mark.parametrize("arrival", ARRIVAL_CASES)
+@pytest.mark.parametrize("max_weeks", MAX_WEEKS)
+def test_load(deploy_ybs, gov, load_report, max_weeks, arrival):
+    config = LoadConfig(max_weeks=max_weeks, arrival=arrival, **CONFIG)
+    token, reward_token, staker, rewards, _ = deploy_ybs(max_weeks)
+    runner = LoadRunner(staker, rewards, token, reward_token, gov, config)
+    runner.setup()
+    summary = runner.run()
+    load_report(config, summary)
+
+    assert summary["unexpected"] == []
+    # The chain ends where the models do; checking every account would take longer than the run.
+    model, rewards_model = runner.model, runner.rewards_model
+    assert staker.totalSupply() == model.total_supply
+    for account in random.Random(config.seed).sample(runner.accounts, min(SAMPLED_ACCOUNTS, len(runner.accounts))):
+        a = account.address
+        assert staker.balanceOf(a) == model.balance_of(a)
+        assert staker.accountData(a).lastUpdateWeek == model.get_account_data(a)[2]
+        assert reward_token.balanceOf(a) == runner.claimed.get(a, 0)
+        assert rewards.accountInfo(a).lastClaimWeek == rewards_model.get_account_info(a)[1]
+        assert rewards.getClaimable(a) == rewards_model.get_claimable(a)
@@ -0,0 +1,88 @@
+from ape import chain
+from utils.constants import WEEK
+from utils.batch import ProviderRPC
+from ybs.access_list import AccessListBuilder, to_access_list
+from ybs.trace import storage_accesses
+
+
+def advance(weeks):
+    chain.pending_timestamp += weeks * WEEK
+    chain.mine()
+
+
+def accesses(tx):
+    trace = chain.provider.make_request("debug_traceTransaction", [tx.txn_hash, {"disableStorage": True}])
+    return storage_accesses(trace["structLogs"], tx.receiver.lower())
+
+
+def assert_matches(derived, actual, *tokens):
+    # Token layouts differ on a fork, so only their addresses are derived.
+    tokens = {t.address.lower() for t in tokens}
+    assert set(derived) <= set(actual)
+    for address, slots in derived.items():
+        if address not in tokens:
+            assert slots == actual[address], address
+
+
+def test_stake_and_checkpoint_slots(user, staker, yprisma, yprisma_whale):
+    builder = AccessListBuilder(ProviderRPC(), token_layout=None)
+    derived = builder.stake(staker.address, user.address, 10 ** 18)
+    assert_matches(derived, accesses(staker.stake(10 ** 18, sender=user)), yprisma)
+
+    advance(9)
+    builder = AccessListBuilder(ProviderRPC(), token_layout=None)
+    derived = builder.checkpoint_account(staker.address, user.address)
+    assert_matches(derived, accesses(staker.checkpointAccount(user, sender=user)))
+
+    advance(13)
+    builder = AccessListBuilder(ProviderRPC(), token_layout=None)
+    derived = builder.stake(staker.address, user.address, 10 ** 18)
+    assert len(derived[staker.address.lower()]) > 13
+    assert_matches(derived, accesses(staker.stake(10 ** 18, sender=user)), yprisma)
+
+
+def test_unstake_slots(user, user2, staker, yprisma, yprisma_whale):
+    for _ in range(3):
+        staker.stake(10 ** 18, sender=user)
+        staker.stake(10 ** 18, sender=user2)
+        advance(1)
+    advance(5)
+    # Partial unstakes stop at different pending weeks.
+    for amount in (10 ** 18 // 2, 10 ** 18 * 3 // 2, staker.balanceOf(user) // 2):
+        builder = AccessListBuilder(ProviderRPC(), token_layout=None)
+        derived = builder.unstake(staker.address, user.address, amount, user2.address)
+        assert_matches(derived, accesses(staker.unstake(amount, user2, sender=user)), yprisma)
+        staker.stake(10 ** 18, sender=user)
+        advance(1)
+
+
+def test_claim_with_range_slots(user, user2, staker, rewards, yprisma, yprisma_whale, yvmkusd, deposit_rewards):
+    staker.stake(10 ** 18, sender=user)
+    staker.stake(3 * 10 ** 18, sender=user2)
+    for _ in range(6):
+        advance(1)
+        deposit_rewards()
+    advance(1)
+
+    start, end = rewards.getSuggestedClaimRange(user)
+    builder = AccessListBuilder(ProviderRPC(), token_layout=None)
+    derived = builder.claim_with_range(rewards.address, user.address, start, end)
+    assert staker.address.lower() in derived
+    assert_matches(derived, accesses(rewards.claimWithRange(start, end, sender=user)), yvmkusd)
+
+    # Nothing left to claim: only the account's last claim week is read.
+    builder = AccessListBuilder(ProviderRPC(), token_layout=None)
+    derived = builder.claim_with_range(rewards.address, user.address, start, end)
+    assert_matches(derived, accesses(rewards.claimWithRange(start, end, sender=user)))
+
+
+def test_to_access_list_skips_unprofitable_entries():
+    to, sender, token = "0x" + "11" * 20, "0x" + "22" * 20, "0x" + "33" * 20
+    touched = {to: set(range(24)), token: {1, 2}, "0x" + "44" * 20: set()}
+    assert [e["address"] for e in to_access_list(touched, sender=sender, to=to)] == [token, "0x" + "44" * 20]
+
+    touched[to] = set(range(25))
+    access_list = to_access_list(touched, sender=sender, to=to)
+    assert access_list[0]["address"] == to
+    assert access_list[0]["storageKeys"][1] == "0x" + "0" * 63 + "1"
+    assert to_access_list({sender: {1}}, sender=sender) == []
@@ -0,0 +1,53 @@
+import csv
+import random
+from ape import chain
+from utils.constants import WEEK
+from ybs.claimable import compute_claimable, check_sample, write_csv
+from ybs.distributor import SingleTokenRewardDistributor
+from ybs.matrix import WeightMatrix, append_from_models
+from ybs.staker import YearnBoostedStaker
+
+
+def test_bulk_claimable_matches_chain(tmp_path, staker, rewards, user, user2, user3, rando, fee_receiver_acc, yvmkusd_whale):
+    rng = random.Random(11)
+    users = [user, user2, user3, rando]
+    model = YearnBoostedStaker.from_chain(staker)
+    rewards_model = SingleTokenRewardDistributor.from_chain(rewards, model)
+    matrix = WeightMatrix.create(tmp_path / "ybs", model.MAX_STAKE_GROWTH_WEEKS, rewards.START_WEEK(), capacity=2)
+
+    for week in range(10):
+        model.week = staker.getWeek()
+        for u in rng.sample(users[:3], 2):
+            amount = rng.randint(2, 1_000 * 10 ** 18)
+            staker.stake(amount, sender=u)
+            model.stake(u.address, amount)
+        if week % 2 == 0:
+            amount = rng.randint(1, 500 * 10 ** 18)
+            rewards.depositReward(amount, sender=fee_receiver_acc)
+            rewards_model.deposit_reward(amount)
+        if week == 6:
+            rewards.claim(sender=user)
+        if week == 7:
+            # Skips earlier weeks for good.
+            rewards.claimWithRange(week - 2, week - 1, sender=user2)
+        chain.pending_timestamp += WEEK
+        chain.mine()
+
+    current_week = staker.getWeek()
+    model.week = current_week
+    append_from_models(matrix, model, rewards_model, [u.address for u in users], current_week)
+    last_claim_weeks = {u.address: rewards.accountInfo(u).lastClaimWeek for u in users}
+
+    rows = list(compute_claimable(matrix, current_week, rewards.START_WEEK(), last_claim_weeks, chunk_size=3))
+    assert [r[0] for r in rows] == [u.address for u in users]
+    for account, claimable, start, end in rows:
+        assert claimable == rewards.getClaimable(account)
+        if claimable:
+            assert (start, end) == tuple(rewards.getSuggestedClaimRange(account))
+    assert rows[-1][1] == 0  # rando never staked
+    assert check_sample(rows, rewards.getClaimable, rewards.getSuggestedClaimRange, k=2, seed=1) == []
+
+    write_csv(rows, tmp_path / "claimable.csv")
+    with open(tmp_path / "claimable.csv") as f:
+        written = list(csv.reader(f))
+    assert written[1:] == [[str(v) for v in row] for row in rows]
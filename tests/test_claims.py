@@ -0,0 +1,80 @@
+import pytest
+import random
+from ape import chain
+from utils.constants import WEEK
+from ybs.claims import check_plan, claim_cost, claimable_by_week, plan_claims, suggested_claim_range
+from ybs.distributor import SingleTokenRewardDistributor
+from ybs.matrix import WeightMatrix, append_from_models
+from ybs.staker import YearnBoostedStaker
+
+
+def test_plan_claims_chunks_within_budget():
+    # Claimable every week from 10 to 59 but 25-39; nothing in weeks divisible by 7.
+    amounts = {w: 0 if 25 <= w < 40 or w % 7 == 0 else 5 for w in range(10, 60)}
+    cost = claim_cost()
+    assert suggested_claim_range(amounts) == (10, 59)
+    assert suggested_claim_range(amounts, min_start_week=50) == (50, 59)
+    assert suggested_claim_range({}, 0) == (0, 0)
+
+    # Gaps of a week aren't worth another call; the empty stretch is.
+    assert plan_claims(amounts, cost(10, 59)) == [(10, 24), (40, 59)]
+    assert plan_claims({10: 1, 12: 1}, cost(10, 12)) == [(10, 12)]
+
+    ranges = plan_claims(amounts, 300_000)
+    assert all(cost(start, end) <= 300_000 for start, end in ranges)
+    assert all(amounts[start] and amounts[end] for start, end in ranges)
+    check_plan(ranges, amounts)
+    # Weeks already claimed are left out.
+    assert plan_claims(amounts, 400_000, min_start_week=45)[0][0] == 45
+
+    with pytest.raises(ValueError, match="alone costs more"):
+        plan_claims(amounts, cost(10, 10) - 1)
+
+
+def test_check_plan_rejects_forfeits():
+    amounts = {10: 1, 11: 0, 12: 3, 13: 2}
+    check_plan([(10, 10), (12, 13)], amounts)
+    check_plan([(12, 13)], amounts, last_claim_week=11)
+    with pytest.raises(ValueError, match="forfeits claimable weeks \\[12\\]"):
+        check_plan([(10, 10), (13, 13)], amounts)
+    with pytest.raises(ValueError, match="not claimed"):
+        check_plan([(10, 12)], amounts)
+    with pytest.raises(ValueError, match="claims nothing"):
+        check_plan([(10, 12), (11, 11), (13, 13)], amounts)
+
+
+def test_planned_claims_match_chain(tmp_path, staker, rewards, yvmkusd, user, user2, fee_receiver_acc, yvmkusd_whale):
+    rng = random.Random(5)
+    model = YearnBoostedStaker.from_chain(staker)
+    rewards_model = SingleTokenRewardDistributor.from_chain(rewards, model)
+    matrix = WeightMatrix.create(tmp_path / "ybs", model.MAX_STAKE_GROWTH_WEEKS, rewards.START_WEEK(), capacity=2)
+
+    for week in range(12):
+        model.week = staker.getWeek()
+        for u in (user, user2):
+            amount = rng.randint(10 ** 18, 1_000 * 10 ** 18)
+            staker.stake(amount, sender=u)
+            model.stake(u.address, amount)
+        if week % 3 != 1:
+            amount = rng.randint(1, 500 * 10 ** 18)
+            rewards.depositReward(amount, sender=fee_receiver_acc)
+            rewards_model.deposit_reward(amount)
+        chain.pending_timestamp += WEEK
+        chain.mine()
+
+    current_week = staker.getWeek()
+    model.week = current_week
+    append_from_models(matrix, model, rewards_model, [user.address, user2.address], current_week)
+
+    amounts = claimable_by_week(matrix, user.address, current_week, rewards.START_WEEK())
+    assert sum(amounts.values()) == rewards.getClaimable(user)
+    assert suggested_claim_range(amounts) == tuple(rewards.getSuggestedClaimRange(user))
+
+    cost = claim_cost()
+    ranges = plan_claims(amounts, cost(*suggested_claim_range(amounts)) - 1, cost)
+    assert len(ranges) > 1
+    before = yvmkusd.balanceOf(user)
+    for start, end in ranges:
+        rewards.claimWithRange(start, end, sender=user)
+    assert yvmkusd.balanceOf(user) - before == sum(amounts.values())
+    assert rewards.getClaimable(user) == 0
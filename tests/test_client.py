@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+from ape import chain
+from utils.constants import WEEK
+from utils.batch import ProviderRPC
+from ybs.client import YBSClient, CallReverted
+
+
+def test_client_batches_and_caches(project, registry, staker, rewards, yprisma, user, user2, user3, gov, fee_receiver_acc, yvmkusd_whale):
+    multicall = gov.deploy(project.Multicall3)
+    users = [user, user2, user3]
+    for week in range(4):
+        for i, u in enumerate(users):
+            staker.stake((i + 1) * 10 ** 18 * (week + 1), sender=u)
+        rewards.depositReward(10 ** 18, sender=fee_receiver_acc)
+        chain.pending_timestamp += WEEK
+        chain.mine()
+    current = staker.getWeek()
+    weeks = range(current - 4, current + 1)
+
+    async def run():
+        client = await YBSClient.from_registry(ProviderRPC(), registry.address, yprisma.address, multicall=multicall.address)
+        assert client.addresses["staker"] == staker.address.lower()
+        assert client.addresses["rewards"] == rewards.address.lower()
+        await client.pin()
+
+        reads = [client.get_account_weight_at(u.address, w) for u in users for w in weeks]
+        reads += [client.compute_shares_at(u.address, w) for u in users for w in weeks]
+        reads += [client.weekly_reward_amount(w) for w in weeks]
+        reads += [client.account_data(u.address) for u in users]
+        before = client.stats["requests"]
+        values = await asyncio.gather(*reads)
+        # One round trip for getWeek, one for everything else.
+        assert client.stats["requests"] - before <= 2
+
+        expected = [staker.getAccountWeightAt(u, w) for u in users for w in weeks]
+        expected += [rewards.computeSharesAt(u, w) for u in users for w in weeks]
+        expected += [rewards.weeklyRewardAmount(w) for w in weeks]
+        for u in users:
+            data = staker.accountData(u)
+            expected.append((data.realizedStake, data.pendingStake, data.lastUpdateWeek, data.updateWeeksBitmap))
+        assert list(values) == expected
+
+        # Everything is now cached at this block.
+        requests = client.stats["requests"]
+        assert await client.get_account_weight_at(user.address, current - 1) == expected[3]
+        assert await client.account_data(user.address) == expected[-3]
+        assert client.stats["requests"] == requests
+
+        # A new block: ended weeks come from the permanent cache, the current week is re-read.
+        staker.stake(10 ** 18, sender=user)
+        await client.pin()
+        assert await client.get_account_weight_at(user.address, current - 1) == expected[3]
+        assert client.stats["requests"] == requests + 1  # getWeek at the new block
+        assert await client.get_account_weight_at(user.address, current) == staker.getAccountWeightAt(user, current)
+        assert client.stats["requests"] == requests + 2
+
+        with pytest.raises(CallReverted):
+            await client.compute_shares_at(user.address, current + 1)
+
+    asyncio.run(run())
+
+
+def test_client_final_cache_respects_pinned_week(staker, user, user2):
+    staker.stake(10 ** 18, sender=user)
+    old_block = chain.blocks.head.number
+    old_week = staker.getWeek()
+    chain.pending_timestamp += 3 * WEEK
+    chain.mine()
+    staker.stake(10 ** 18, sender=user2)
+    week = old_week + 1  # ended at the head, still in the future at `old_block`
+    at_head = staker.getAccountWeightAt(user, week)
+    assert at_head > 0
+
+    async def run():
+        client = YBSClient(ProviderRPC(), staker.address, staker.address, multicall=None)
+        await client.pin()
+        assert await client.get_account_weight_at(user.address, week) == at_head
+
+        # An older block, where the week hasn't ended, doesn't get the head's value...
+        await client.pin(old_block)
+        assert await client.get_account_weight_at(user.address, week) == 0
+        # ...nor does it overwrite it.
+        client.unpin()
+        assert await client.get_account_weight_at(user.address, week) == at_head
+        await client.pin()
+        requests = client.stats["requests"]
+        assert await client.get_account_weight_at(user.address, week) == at_head
+        assert client.stats["requests"] == requests
+
+    asyncio.run(run())
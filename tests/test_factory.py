@@ -66,6 +66,18 @@ def test_factory(
     assert ybs.address == rewards.staker()
     assert ybs.stakeToken() == utils.TOKEN()
 
+    # Clones are initialized once, and implementations never.
+    with ape.reverts():
+        ybs.initialize(yprisma, 4, 0, user, sender=user)
+    with ape.reverts():
+        rewards.initialize(ybs, yvmkusd, sender=user)
+    with ape.reverts():
+        utils.initialize(ybs, rewards, sender=user)
+    with ape.reverts():
+        project.YearnBoostedStaker.at(ybs_factory.implementation()).initialize(
+            yprisma, 4, 0, user, sender=user
+        )
+
     deployment = registry.deployments(yprisma)
 
     # Prevent a duplicate deployment
@@ -156,4 +168,33 @@ def test_factory(
     assert user != registry.owner()
     registry.transferOwnership(user, sender=gov)
     registry.acceptOwnership(sender=user)
-    assert user == registry.owner()
\ No newline at end of file
+    assert user == registry.owner()
+
+def test_registry_lens(
+    user, staker, rewards, utils, registry, yprisma, stake_and_deposit_rewards
+):
+    lens = user.deploy(project.YBSRegistryLens, registry)
+    stake_and_deposit_rewards()
+
+    page = lens.getDeployments(0, 100)
+    assert len(page) == registry.numTokens()
+    stats = [s for s in page if s.token == yprisma.address][0]
+    assert stats.yearnBoostedStaker == staker.address
+    assert stats.rewardDistributor == rewards.address
+    assert stats.utilities == utils.address
+    assert stats.totalSupply == staker.totalSupply()
+    assert stats.globalWeight == staker.getGlobalWeight()
+    assert stats.globalGrowthRate == staker.globalGrowthRate()
+    week = staker.getWeek()
+    assert stats.weeklyRewardAmount == rewards.weeklyRewardAmount(week)
+    assert stats.lastWeekRewardAmount == rewards.weeklyRewardAmount(week - 1)
+
+    # Paging
+    assert len(lens.getDeployments(registry.numTokens(), 10)) == 0
+    assert len(lens.getDeployments(0, 0)) == 0
+    assert len(lens.getDeployments(registry.numTokens() - 1, 10)) == 1
+
+    # Unknown tokens return empty stats rather than reverting
+    stats = lens.getDeployment(ZERO_ADDRESS)
+    assert stats.yearnBoostedStaker == ZERO_ADDRESS
+    assert stats.totalSupply == 0
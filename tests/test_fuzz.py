@@ -0,0 +1,135 @@
+"""
+    Differential fuzzing of the staker and reward distributor against the reference
+    models in `ybs/`. Hypothesis generates multi-user schedules; each scheduled week
+    is sent as a single block, predicted reverts included, then the invariants from
+    `utils.invariants.check_invariants` and the distributor's views are compared.
+    Failing schedules are shrunk to a minimal reproduction.
+
+        YBS_FUZZ_EXAMPLES=200 ape test tests/test_fuzz.py
+"""
+import os
+from ape import chain
+from hypothesis import given, note, settings, HealthCheck, strategies as st
+from utils.constants import WEEK
+from utils.batch import BlockBatch, manual_mining, succeeded
+from utils.invariants import check_invariants
+from ybs.staker import YearnBoostedStaker, ModelRevert
+from ybs.distributor import SingleTokenRewardDistributor
+
+MAX_EXAMPLES = int(os.getenv("YBS_FUZZ_EXAMPLES", "20"))
+NUM_USERS = 3
+
+amounts = st.one_of(
+    st.integers(min_value=0, max_value=5),  # around the `_amount > 1` bound and `>> 1` truncation
+    st.integers(min_value=2, max_value=20_000 * 10 ** 18),
+    st.just("everything"),
+)
+actions = st.tuples(
+    st.sampled_from(["stake", "unstake", "max_weighted", "checkpoint", "deposit", "claim"]),
+    st.integers(min_value=0, max_value=NUM_USERS - 1),
+    amounts,
+)
+weeks = st.tuples(
+    st.integers(min_value=0, max_value=6),  # weeks to jump before this block
+    st.lists(actions, max_size=8),
+)
+schedules = st.lists(weeks, min_size=1, max_size=10)
+
+
+class Harness:
+    """Queues one week of actions, predicting each outcome with the models."""
+
+    def __init__(self, staker, rewards, yprisma, reward_token, users, gov, depositor):
+        self.staker, self.rewards = staker, rewards
+        self.yprisma, self.reward_token = yprisma, reward_token
+        self.users, self.gov, self.depositor = users, gov, depositor
+        self.model = YearnBoostedStaker.from_chain(staker)
+        self.rewards_model = SingleTokenRewardDistributor.from_chain(rewards, self.model)
+        # Token balances, so failing transfers are predicted too.
+        self.wallets = {a.address: yprisma.balanceOf(a) for a in users + [gov]}
+        self.reward_wallets = {a.address: reward_token.balanceOf(a) for a in users + [depositor]}
+
+    def queue(self, batch, kind, u, amount):
+        """Add one action to `batch` and return whether it should succeed."""
+        user = self.users[u]
+        model, rewards_model = self.model, self.rewards_model
+        if amount == "everything":
+            amount = {
+                "unstake": model.balance_of(user.address),
+                "max_weighted": self.wallets[self.gov.address],
+                "deposit": self.reward_wallets[self.depositor.address],
+            }.get(kind, self.wallets[user.address])
+
+        if kind == "stake":
+            batch.add(self.staker.stake, amount, sender=user)
+            if amount >> 1 << 1 > self.wallets[user.address]:
+                return False
+            return self._apply(lambda: model.stake(user.address, amount), user.address, -1)
+        if kind == "max_weighted":
+            batch.add(self.staker.stakeAsMaxWeighted, user, amount, sender=self.gov)
+            if amount >> 1 << 1 > self.wallets[self.gov.address]:
+                return False
+            return self._apply(lambda: model.stake_as_max_weighted(user.address, amount), self.gov.address, -1)
+        if kind == "unstake":
+            batch.add(self.staker.unstake, amount, user, sender=user)
+            return self._apply(lambda: model.unstake(user.address, amount), user.address, 1)
+        if kind == "checkpoint":
+            batch.add(self.staker.checkpointAccount, user, sender=user)
+            model.checkpoint_account(user.address)
+            return True
+        if kind == "deposit":
+            if amount > self.reward_wallets[self.depositor.address]:
+                amount = self.reward_wallets[self.depositor.address]
+            batch.add(self.rewards.depositReward, amount, sender=self.depositor)
+            rewards_model.deposit_reward(amount)
+            self.reward_wallets[self.depositor.address] -= amount
+            return True
+        # claim
+        batch.add(self.rewards.claim, sender=user)
+        claimed = rewards_model.claim(user.address)
+        self.reward_wallets[rewards_model.recipient_of(user.address)] += claimed
+        return True
+
+    def _apply(self, action, wallet, direction):
+        try:
+            moved = action()
+        except ModelRevert:
+            return False
+        self.wallets[wallet] += direction * moved
+        return True
+
+    def check(self):
+        check_invariants(self.staker, self.model, self.users, self.yprisma, self.wallets)
+        for user in self.users:
+            a = user.address
+            assert self.reward_token.balanceOf(user) == self.reward_wallets[a]
+            assert self.rewards.getClaimable(user) == self.rewards_model.get_claimable(a)
+
+
+@settings(
+    max_examples=MAX_EXAMPLES,
+    deadline=None,
+    suppress_health_check=[HealthCheck.function_scoped_fixture, HealthCheck.too_slow],
+)
+@given(schedule=schedules)
+def test_fuzz_models_match_chain(schedule, staker, rewards, yprisma, yvmkusd, user, user2, user3, gov, fee_receiver_acc, accounts):
+    note(f"schedule={schedule!r}")
+    # Hypothesis runs many examples per test call, so isolate each one here.
+    snapshot = chain.snapshot()
+    try:
+        if not staker.approvedWeightedStaker(gov):
+            staker.setWeightedStaker(gov, True, sender=accounts[staker.owner()])
+        harness = Harness(staker, rewards, yprisma, yvmkusd, [user, user2, user3], gov, fee_receiver_acc)
+        timestamp = chain.pending_timestamp
+        with manual_mining():
+            for jump, week_actions in schedule:
+                timestamp += jump * WEEK + 1
+                harness.model.set_time(timestamp)
+                batch = BlockBatch()
+                expected = [harness.queue(batch, *action) for action in week_actions]
+                receipts = batch.mine(timestamp)
+                for action, ok, receipt in zip(week_actions, expected, receipts):
+                    assert succeeded(receipt) == ok, f"{action} expected {'success' if ok else 'revert'}"
+                harness.check()
+    finally:
+        chain.restore(snapshot)
@@ -0,0 +1,63 @@
+import random
+from ybs.gas import GasModel, claim_features, staker_features
+
+
+def test_staker_features():
+    # Staked in weeks 10 and 12 with 4 growth weeks, last checkpoint in week 12.
+    data = (0, 300, 12, 0b101)
+    features = staker_features(13, 4, data, global_last_update_week=12)
+    assert features == {
+        "account_weeks": 1, "realizations": 0, "global_weeks": 1, "new_account": 0, "pending_weeks": 2,
+    }
+    # The week 10 stake realizes in week 14, the week 12 stake in week 16.
+    assert staker_features(14, 4, data)["realizations"] == 1
+    assert staker_features(30, 4, data)["realizations"] == 2
+    assert staker_features(30, 4, data)["pending_weeks"] == 0
+    assert staker_features(30, 4, data)["global_weeks"] == 0
+    # Staked in weeks 10 and 14: the week 10 bit has shifted past MAX_WEEK_BIT but stays
+    # in the bitmap, and nothing realizes again until week 18.
+    data = (50, 50, 14, 0b10001)
+    assert staker_features(15, 4, data)["realizations"] == 0
+    assert staker_features(15, 4, data)["pending_weeks"] == 1
+    assert staker_features(18, 4, data)["realizations"] == 1
+    # Fully realized stake still fills every missed week; an empty account fills none.
+    assert staker_features(30, 4, (100, 0, 12, 0))["account_weeks"] == 18
+    assert staker_features(30, 4, (0, 0, 0, 0)) == {
+        "account_weeks": 0, "realizations": 0, "global_weeks": 0, "new_account": 1, "pending_weeks": 0,
+    }
+
+
+def test_claim_features():
+    data = (0, 300, 12, 0b101)  # everything pending has realized by week 16
+    features = claim_features(10, 15, 4, data, 13, [0, 5, 5, 0, 5, 5])
+    assert features == {
+        "claim_weeks": 6,
+        "funded_weeks": 4,
+        "lagged_weeks": 3,  # 13, 14, 15
+        "lag_iterations": 1 + 2 + 3,
+        "global_lag_iterations": 1 + 2,
+        "transfer": 1,
+    }
+    assert claim_features(16, 15, 4, data, 13, [])["claim_weeks"] == 0
+
+
+def test_fit_recovers_linear_gas():
+    rng = random.Random(7)
+    true = {"constant": 60_000, "account_weeks": 22_300, "realizations": 2_200, "global_weeks": 24_500, "new_account": 17_000}
+    samples = []
+    for _ in range(40):
+        features = {name: rng.randint(0, 50) for name in true if name != "constant"}
+        features["new_account"] = rng.randint(0, 1)
+        gas = true["constant"] + sum(true[n] * v for n, v in features.items())
+        samples.append({"op": "stake", "features": features, "gas": gas})
+
+    model = GasModel.fit(samples)
+    for name, value in true.items():
+        assert abs(model.coefficients["stake"][name] - value) < 1
+    report = model.report(samples)
+    assert report["stake"]["n"] == 40
+    assert report["stake"]["max_abs"] <= 1
+
+    # Measurement noise shows up in the report.
+    noisy = [{**s, "gas": s["gas"] + rng.randint(-500, 500)} for s in samples]
+    assert 0 < GasModel.fit(noisy).report(noisy)["stake"]["mean_abs"] < 500
@@ -0,0 +1,82 @@
+from ape import chain
+from utils.constants import MAX_INT, WEEK
+from utils.batch import ProviderRPC
+from ybs.indexer import Indexer
+
+
+def test_indexer_follows_chain(
+    tmp_path, project, registry, staker, rewards, yprisma, user, user2, gov, fee_receiver_acc, yvmkusd_whale
+):
+    indexer = Indexer(ProviderRPC(), tmp_path / "ybs.sqlite", start_block=chain.blocks.head.number + 1,
+                      confirmations=0, batch_size=3)
+    # Deployments made before `start_block` are added by hand; later ones come from the registry.
+    indexer.add_contract(registry.address, "registry")
+    indexer.add_contract(staker.address, "staker")
+    indexer.add_contract(rewards.address, "rewards")
+
+    yprisma.approve(staker, MAX_INT, sender=user)
+    staker.stake(10 * 10 ** 18, sender=user)
+    staker.unstake(2 * 10 ** 18, user, sender=user)
+    rewards.configureRecipient(user2, sender=user)
+    chain.pending_timestamp += WEEK
+    chain.mine()
+    rewards.depositReward(1_000 * 10 ** 18, sender=fee_receiver_acc)
+    chain.pending_timestamp += WEEK
+    chain.mine()
+    claimable = rewards.getClaimable(user)
+    rewards.claim(sender=user)
+
+    token = gov.deploy(project.MockERC20, "Indexed", "IDX", 18)
+    reward_token = gov.deploy(project.MockERC20, "Indexed Reward", "RIDX", 18)
+    registry.createNewDeployment(token, 4, chain.pending_timestamp, reward_token, sender=gov)
+    new_staker = project.YearnBoostedStaker.at(registry.deployments(token).yearnBoostedStaker)
+    token.mint(user, 4 * 10 ** 18, sender=user)
+    token.approve(new_staker, MAX_INT, sender=user)
+    new_staker.stake(4 * 10 ** 18, sender=user)
+
+    assert indexer.sync() == chain.blocks.head.number
+    assert new_staker.address.lower() in indexer.contracts("staker")
+    assert [(e["contract"], e["amount"]) for e in indexer.events("Staked", account=user.address)] == [
+        (staker.address.lower(), 10 * 10 ** 18),
+        (new_staker.address.lower(), 4 * 10 ** 18),
+    ]
+    [unstaked] = indexer.events("Unstaked")
+    assert unstaked["amount"] == 2 * 10 ** 18
+    assert unstaked["new_user_weight"] == staker.getAccountWeightAt(user, unstaked["week"])
+    [deposit] = indexer.events("RewardDeposited", contract=rewards.address)
+    assert deposit["reward_amount"] == 1_000 * 10 ** 18
+    assert deposit["depositor"] == fee_receiver_acc.address.lower()
+    [claim] = indexer.events("RewardsClaimed", account=user.address)
+    assert claim["reward_amount"] == claimable > 0
+    assert indexer.events("RecipientConfigured")[0]["recipient"] == user2.address.lower()
+    assert len(indexer.events("NewDeployment")) == 1
+
+    # Resuming picks up only new blocks.
+    staker.stake(2 * 10 ** 18, sender=user)
+    indexer.sync()
+    assert len(indexer.events("Staked")) == 3
+
+
+def test_indexer_rolls_back_reorg(tmp_path, staker, yprisma, user, user2):
+    indexer = Indexer(ProviderRPC(), tmp_path / "ybs.sqlite", start_block=chain.blocks.head.number + 1,
+                      confirmations=0)
+    indexer.add_contract(staker.address, "staker")
+    yprisma.approve(staker, MAX_INT, sender=user)
+    yprisma.approve(staker, MAX_INT, sender=user2)
+    staker.stake(10 ** 18, sender=user)
+    indexer.sync()
+
+    snapshot = chain.snapshot()
+    staker.stake(2 * 10 ** 18, sender=user)
+    indexer.sync()
+    assert len(indexer.events("Staked")) == 2
+
+    # Replace the last block with a different one at the same height.
+    chain.restore(snapshot)
+    chain.pending_timestamp += 1
+    staker.stake(3 * 10 ** 18, sender=user2)
+    indexer.sync()
+    assert [(e["account"], e["amount"]) for e in indexer.events("Staked")] == [
+        (user.address.lower(), 10 ** 18),
+        (user2.address.lower(), 3 * 10 ** 18),
+    ]
@@ -0,0 +1,90 @@
+import pytest
+from ape import chain
+from utils.constants import WEEK
+from utils.batch import ProviderRPC
+from ybs.keeper import Checkpoint, CheckpointReverted, Keeper
+
+BUDGET = 1_000_000
+
+
+class RevertingRPC:
+    """Mines every transaction at once; those sent with `revert` calldata fail."""
+
+    def __init__(self, revert):
+        self.revert = revert
+        self.sent = []
+
+    def call(self, method, *params):
+        if method == "eth_sendTransaction":
+            self.sent.append(params[0]["data"])
+            return f"0x{len(self.sent):064x}"
+        data = self.sent[int(params[0], 16) - 1]
+        return {"transactionHash": params[0], "status": "0x0" if data == self.revert else "0x1", "gasUsed": "0x1"}
+
+
+def advance(weeks):
+    chain.pending_timestamp += weeks * WEEK
+    chain.mine()
+
+
+def test_keeper_clears_lag_within_budget(staker, user, user2, user3, rando, yprisma_whale):
+    # Idle accounts 30, 25 and 20 weeks behind; rando never staked.
+    staker.stake(10 ** 18, sender=user)
+    advance(5)
+    staker.stake(2 * 10 ** 18, sender=user2)
+    advance(5)
+    staker.stake(3 * 10 ** 18, sender=user3)
+    advance(20)
+    week = staker.getWeek()
+
+    keeper = Keeper(ProviderRPC(), staker.address)
+    keeper.read_state([u.address for u in (user, user2, user3, rando)])
+    assert keeper.lagged() == [(user.address.lower(), 30), (user2.address.lower(), 25), (user3.address.lower(), 20)]
+    assert keeper.week - keeper.global_last_update_week == 20
+
+    schedule = keeper.plan(BUDGET)
+    assert len(schedule) > 1
+    assert all(sum(c.gas for c in block) <= BUDGET for block in schedule)
+    # Largest saving first; the second account doesn't fit whole and is cut short.
+    assert schedule[0][0].account == user.address.lower() and schedule[0][0].week == week
+    assert schedule[0][1].account == user2.address.lower() and schedule[0][1].week < week
+
+    receipts = keeper.send(schedule, user.address)
+    for block in receipts:
+        assert all(int(r["status"], 16) == 1 for r in block)
+        assert sum(int(r["gasUsed"], 16) for r in block) <= BUDGET
+
+    assert staker.globalLastUpdateWeek() == week
+    for u in (user, user2, user3):
+        assert staker.accountData(u).lastUpdateWeek == week
+    keeper.read_state([u.address for u in (user, user2, user3)])
+    assert keeper.lagged() == [] and keeper.plan(BUDGET) == []
+
+
+def test_keeper_plans_limited_blocks(staker, user, user2, yprisma_whale):
+    staker.stake(10 ** 18, sender=user)
+    staker.stake(10 ** 18, sender=user2)
+    advance(40)
+
+    keeper = Keeper(ProviderRPC(), staker.address)
+    keeper.read_state([user.address, user2.address])
+    schedule = keeper.plan(BUDGET, blocks=1)
+    assert len(schedule) == 1
+    # The keeper's copy of the state moves on as checkpoints are scheduled.
+    assert keeper.account_data[user.address.lower()][2] == keeper.week
+    assert keeper.lagged()
+
+
+def test_keeper_stops_at_reverted_checkpoint():
+    account, other = "0x" + "11" * 20, "0x" + "22" * 20
+    failing = Checkpoint("account", account, 5)
+    schedule = [[Checkpoint("global", week=5), failing], [Checkpoint("account", other, 5)]]
+    rpc = RevertingRPC(failing.calldata())
+    keeper = Keeper(rpc, "0x" + "33" * 20)
+
+    with pytest.raises(CheckpointReverted) as exc:
+        keeper.send(schedule, "0x" + "44" * 20, poll_interval=0)
+    assert [c for c, _ in exc.value.failed] == [failing]
+    assert len(exc.value.receipts) == 1
+    # The second block, planned on top of the first, is never sent.
+    assert len(rpc.sent) == 2
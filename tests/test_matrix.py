@@ -0,0 +1,46 @@
+import random
+from ape import chain
+from utils.constants import WEEK
+from ybs.matrix import WeightMatrix, append_from_models
+from ybs.staker import YearnBoostedStaker
+from ybs.distributor import SingleTokenRewardDistributor
+
+
+def test_matrix_matches_chain(tmp_path, staker, rewards, yprisma, user, user2, user3, fee_receiver_acc, yvmkusd_whale):
+    rng = random.Random(42)
+    users = [user, user2, user3]
+    model = YearnBoostedStaker.from_chain(staker)
+    rewards_model = SingleTokenRewardDistributor.from_chain(rewards, model)
+    start_week = staker.getWeek()
+    matrix = WeightMatrix.create(tmp_path / "ybs", model.MAX_STAKE_GROWTH_WEEKS, start_week, staker.address, capacity=2)
+
+    for week in range(8):
+        model.week = staker.getWeek()
+        for u in rng.sample(users, 2):
+            amount = rng.randint(2, 1_000 * 10 ** 18)
+            staker.stake(amount, sender=u)
+            model.stake(u.address, amount)
+        if week % 3 == 2:
+            amount = model.balance_of(user.address) // 3
+            staker.unstake(amount, user, sender=user)
+            model.unstake(user.address, amount)
+        rewards.depositReward(100 * 10 ** 18, sender=fee_receiver_acc)
+        rewards_model.deposit_reward(100 * 10 ** 18)
+        chain.pending_timestamp += WEEK
+        chain.mine()
+        # Append each week once it's complete, as a live job would.
+        model.week = staker.getWeek()
+        append_from_models(matrix, model, rewards_model, [u.address for u in users], model.week)
+
+    matrix = WeightMatrix(tmp_path / "ybs")
+    assert matrix.weeks == 8 and matrix.n_accounts == 3
+    for week in range(matrix.start_week, matrix.end_week):
+        row = matrix.row(week)
+        assert matrix.adjusted_global_weight(row).to_int() == rewards.adjustedGlobalWeightAt(week)
+        assert matrix.column("global_weight")[row].to_int() == staker.getGlobalWeightAt(week)
+        assert matrix.column("reward_amount")[row].to_int() == rewards.weeklyRewardAmount(week)
+        for u in users:
+            i = matrix.account_index(u.address)
+            assert matrix.column("weight")[row, i].to_int() == staker.getAccountWeightAt(u, week)
+            assert matrix.adjusted_weight(row, i).to_int() == rewards.adjustedAccountWeightAt(u, week)
+        assert matrix.column("weight")[row].sum() == matrix.column("global_weight")[row].to_int()
@@ -0,0 +1,164 @@
+import random
+import numpy as np
+import ape
+from ape import chain
+from utils.constants import WEEK
+from ybs.staker import YearnBoostedStaker, ModelRevert
+from ybs.distributor import SingleTokenRewardDistributor
+from ybs.sim import Simulation
+
+NUM_WEEKS = 12
+ACTIONS_PER_WEEK = 6
+
+
+def assert_staker_matches(model, staker, users):
+    assert model.get_week() == staker.getWeek()
+    assert model.total_supply == staker.totalSupply()
+    assert model.global_growth_rate == staker.globalGrowthRate()
+    assert model.get_global_weight() == staker.getGlobalWeight()
+    for week in range(max(0, model.week - 5), model.week + 1):
+        assert model.get_global_weight_at(week) == staker.getGlobalWeightAt(week)
+    for u in users:
+        assert model.balance_of(u.address) == staker.balanceOf(u)
+        data = staker.accountData(u)
+        assert model.get_account_data(u.address) == (
+            data.realizedStake, data.pendingStake, data.lastUpdateWeek, data.updateWeeksBitmap
+        )
+        assert model.get_account_weight(u.address) == staker.getAccountWeight(u)
+        assert model.project_account_weights(u.address, 8) == list(staker.projectAccountWeights(u, 8))
+    assert model.project_global_weights(8) == list(staker.projectGlobalWeights(8))
+
+
+def test_staker_model_matches_chain(staker, yprisma, user, user2, user3, gov, accounts):
+    """
+        Drive the contract and the model with the same seeded random actions,
+        comparing every view at the end of each week.
+    """
+    rng = random.Random(1234)
+    users = [user, user2, user3]
+    owner = accounts[staker.owner()]
+    staker.setWeightedStaker(gov, True, sender=owner)
+    model = YearnBoostedStaker.from_chain(staker)
+
+    for week in range(NUM_WEEKS):
+        model.week = staker.getWeek()
+        for _ in range(ACTIONS_PER_WEEK):
+            u = rng.choice(users)
+            action = rng.choice(["stake", "stake", "unstake", "max_weighted", "checkpoint"])
+            # Odd amounts exercise the `>> 1` truncation; the occasional oversized
+            # unstake checks reverts are predicted too.
+            amount = rng.randint(2, 2_000 * 10 ** 18)
+            if action == "stake":
+                staker.stake(amount, sender=u)
+                model.stake(u.address, amount)
+            elif action == "max_weighted":
+                staker.stakeAsMaxWeighted(u, amount, sender=gov)
+                model.stake_as_max_weighted(u.address, amount)
+            elif action == "checkpoint":
+                staker.checkpointAccount(u, sender=u)
+                model.checkpoint_account(u.address)
+            else:
+                if rng.random() < 0.2:
+                    amount = model.balance_of(u.address) + 2
+                try:
+                    model.unstake(u.address, amount)
+                except ModelRevert:
+                    with ape.reverts():
+                        staker.unstake(amount, u, sender=u)
+                else:
+                    staker.unstake(amount, u, sender=u)
+        assert_staker_matches(model, staker, users)
+
+        chain.pending_timestamp += WEEK
+        chain.mine()
+
+
+def test_distributor_model_matches_chain(staker, rewards, yprisma, yvmkusd, user, user2, user3, fee_receiver, accounts):
+    """
+        Stake, unstake, deposit and claim with seeded random amounts, comparing
+        shares, claimables and amounts claimed against the model.
+    """
+    rng = random.Random(4321)
+    users = [user, user2, user3]
+    fr_account = accounts[fee_receiver.address]
+    model = YearnBoostedStaker.from_chain(staker)
+    rewards_model = SingleTokenRewardDistributor.from_chain(rewards, model)
+
+    for week in range(NUM_WEEKS):
+        model.week = staker.getWeek()
+        for u in users:
+            if rng.random() < 0.6:
+                amount = rng.randint(2, 1_000 * 10 ** 18)
+                staker.stake(amount, sender=u)
+                model.stake(u.address, amount)
+            elif model.balance_of(u.address) > 2 and rng.random() < 0.5:
+                amount = rng.randint(2, model.balance_of(u.address))
+                staker.unstake(amount, u, sender=u)
+                model.unstake(u.address, amount)
+        if rng.random() < 0.8:
+            amount = rng.randint(1, 5_000 * 10 ** 18)
+            rewards.depositReward(amount, sender=fr_account)
+            rewards_model.deposit_reward(amount)
+
+        u = rng.choice(users)
+        if rng.random() < 0.3:
+            start, end = rewards.getSuggestedClaimRange(u)
+            assert rewards_model.get_suggested_claim_range(u.address) == (start, end)
+            tx = rewards.claimWithRange(start, end, sender=u)
+            assert tx.return_value == rewards_model.claim_with_range(u.address, start, end)
+        elif rng.random() < 0.3:
+            tx = rewards.claim(sender=u)
+            assert tx.return_value == rewards_model.claim(u.address)
+
+        for past in range(rewards_model.START_WEEK, model.week):
+            assert rewards_model.adjusted_global_weight_at(past) == rewards.adjustedGlobalWeightAt(past)
+            assert rewards_model.pushable_rewards(past) == rewards.pushableRewards(past)
+            for v in users:
+                assert rewards_model.compute_shares_at(v.address, past) == rewards.computeSharesAt(v, past)
+                assert rewards_model.get_claimable_at(v.address, past) == rewards.getClaimableAt(v, past)
+        for v in users:
+            assert rewards_model.get_account_info(v.address)[1] == rewards.accountInfo(v).lastClaimWeek
+            assert rewards_model.get_claimable(v.address) == rewards.getClaimable(v)
+
+        chain.pending_timestamp += WEEK
+        chain.mine()
+
+
+def test_simulation_matches_model():
+    """
+        The vectorized simulator must agree exactly with the reference model on
+        amounts it can represent (even multiples of its unit).
+    """
+    unit, n = 10**12, 20
+    for max_weeks in [1, 4, 7]:
+        rng = random.Random(max_weeks)
+        sim = Simulation(n, max_weeks, unit=unit)
+        model = YearnBoostedStaker(max_weeks)
+        for week in range(30):
+            model.week = week
+            idx = [rng.randrange(n) for _ in range(8)]
+            amounts = [2 * rng.randint(1, 10**6) for _ in idx]
+            sim.stake(idx, amounts)
+            for i, a in zip(idx, amounts):
+                model.stake(i, a * unit)
+            if rng.random() < 0.3:
+                sim.stake_as_max_weighted(idx[:2], amounts[:2])
+                for i, a in zip(idx[:2], amounts[:2]):
+                    model.stake_as_max_weighted(i, a * unit)
+
+            idx = [rng.randrange(n) for _ in range(8)]
+            amounts = [2 * rng.randint(1, 10**6) for _ in idx]
+            sim.unstake(idx, amounts)
+            for i, a in zip(idx, amounts):
+                # The simulator clips oversized unstakes to the balance.
+                a = min(a * unit, model.balance_of(i))
+                if a > 1:
+                    model.unstake(i, a)
+
+            assert sim.global_weight * unit == model.get_global_weight()
+            assert sim.total_supply * unit == model.total_supply
+            assert list(sim.account_weight(np.arange(n))) == [model.get_account_weight(i) for i in range(n)]
+            assert list(sim.balance_of(np.arange(n))) == [model.balance_of(i) for i in range(n)]
+            adjusted = model.get_global_weight() - model.get_global_weekly_to_realize(week + max_weeks)[0]
+            sim.advance()
+            assert sim.series["adjusted_global_weight"][-1] == adjusted
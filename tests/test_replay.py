@@ -0,0 +1,48 @@
+import random
+from ape import chain
+from utils.constants import WEEK
+from utils.batch import ProviderRPC
+from ybs.indexer import Indexer
+from ybs.replay import actions_from_indexer, replay
+
+
+def test_sharded_replay_matches_chain(tmp_path, staker, yprisma, user, user2, user3, gov, accounts):
+    rng = random.Random(7)
+    users = [user, user2, user3]
+    staker.setWeightedStaker(gov, True, sender=accounts[staker.owner()])
+    indexer = Indexer(ProviderRPC(), tmp_path / "ybs.sqlite", start_block=chain.blocks.head.number + 1,
+                      confirmations=0)
+    indexer.add_contract(staker.address, "staker")
+    start_week = staker.getWeek()
+
+    for week in range(10):
+        for u in users:
+            balance = staker.balanceOf(u)
+            if balance > 2 and rng.random() < 0.3:
+                staker.unstake(rng.randint(2, balance), u, sender=u)
+            else:
+                staker.stake(rng.randint(2, 1_000 * 10 ** 18), sender=u)
+        if week % 4 == 1:
+            staker.stakeAsMaxWeighted(rng.choice(users), rng.randint(2, 100 * 10 ** 18), sender=gov)
+        chain.pending_timestamp += rng.choice([WEEK, 2 * WEEK])
+        chain.mine()
+    staker.checkpointGlobal(sender=user)
+
+    indexer.sync()
+    end_week = staker.getWeek()
+    actions = actions_from_indexer(indexer, staker.address.lower())
+    for processes in [1, 2]:
+        result = replay(actions, staker.MAX_STAKE_GROWTH_WEEKS(), end_week, start_week, processes=processes, n_shards=3)
+        assert result.total_supply == staker.totalSupply()
+        assert result.global_growth_rate == staker.globalGrowthRate()
+        for week in range(start_week, end_week + 1):
+            assert result.global_weight_at(week) == staker.getGlobalWeightAt(week)
+        for u in users:
+            a = u.address.lower()
+            data = staker.accountData(u)
+            assert result.account_data[a] == (
+                data.realizedStake, data.pendingStake, data.lastUpdateWeek, data.updateWeeksBitmap
+            )
+            assert result.balances[a] == staker.balanceOf(u)
+            for week in range(start_week, end_week + 1):
+                assert result.account_weight_at(a, week) == staker.getAccountWeightAt(u, week)
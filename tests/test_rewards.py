@@ -268,21 +268,25 @@ def test_claims_when_start_week_is_set_gt_zero(
     gov, 
     user,
     yprisma_whale,
-    yvmkusd_whale
+    yvmkusd_whale,
+    start_time
 ):
-    start_time = Contract('0x5d17eA085F2FF5da3e6979D5d26F1dBaB664ccf8').startTime()
-    staker = user.deploy(
-        project.YearnBoostedStaker, 
+    ybs_factory = user.deploy(project.YBSFactory)
+    reward_factory = user.deploy(project.YBSRewardFactory)
+    tx = ybs_factory.deploy(
         gov_token, 
         4, # <-- Number of growth weeks
         start_time,
         gov,
+        sender=user
     )
-    rewards = user.deploy(
-        project.SingleTokenRewardDistributor,
+    staker = project.YearnBoostedStaker.at(tx.return_value)
+    tx = reward_factory.deploy(
         staker,
-        stable_token
+        stable_token,
+        sender=user
     )
+    rewards = project.SingleTokenRewardDistributor.at(tx.return_value)
     yprisma = gov_token
     yprisma.approve(staker, 2**256-1, sender=user)
     yprisma.approve(staker, 2**256-1, sender=user2)
@@ -0,0 +1,82 @@
+from scripts.rpc_cache import RPCCache, cacheable
+
+CHAIN_ID = {"jsonrpc": "2.0", "id": 1, "method": "eth_chainId", "params": []}
+CODE = {"jsonrpc": "2.0", "id": 2, "method": "eth_getCode", "params": ["0x" + "11" * 20, "0x10"]}
+BLOCK_NUMBER = {"jsonrpc": "2.0", "id": 3, "method": "eth_blockNumber", "params": []}
+LATEST_CALL = {"jsonrpc": "2.0", "id": 4, "method": "eth_call", "params": [{"to": "0x" + "11" * 20}, "latest"]}
+
+
+class Upstream:
+    """Answers every request with `result(request)`, or with `reply` as a whole when set."""
+
+    def __init__(self, reply=None):
+        self.reply = reply
+        self.batches = []
+
+    def __call__(self, payload):
+        self.batches.append(payload)
+        if self.reply is not None:
+            return self.reply
+        return [{"jsonrpc": "2.0", "id": r["id"], "result": f"{r['method']}:{len(self.batches)}"} for r in payload]
+
+
+def make_cache(tmp_path, monkeypatch, upstream, replay=False):
+    cache = RPCCache(tmp_path / "cache.sqlite", "http://upstream.invalid", replay)
+    monkeypatch.setattr(cache, "forward", upstream)
+    return cache
+
+
+def test_record_then_replay(tmp_path, monkeypatch):
+    upstream = Upstream()
+    cache = make_cache(tmp_path, monkeypatch, upstream)
+    assert cache.handle(CHAIN_ID)["result"] == "eth_chainId:1"
+    # Hits are served locally; only the misses go upstream, as one batch.
+    responses = cache.handle([CHAIN_ID, CODE, BLOCK_NUMBER])
+    assert [r["result"] for r in responses] == ["eth_chainId:1", "eth_getCode:2", "eth_blockNumber:2"]
+    assert [r["id"] for r in upstream.batches[1]] == [2, 3]
+    # eth_blockNumber moves with time and is never stored.
+    assert cache.handle(BLOCK_NUMBER)["result"] == "eth_blockNumber:3"
+
+    replay = make_cache(tmp_path, monkeypatch, Upstream(), replay=True)
+    assert replay.handle({**CODE, "id": 9}) == {"jsonrpc": "2.0", "id": 9, "result": "eth_getCode:2"}
+    responses = replay.handle([CHAIN_ID, BLOCK_NUMBER])
+    assert responses[0]["result"] == "eth_chainId:1"
+    assert responses[1]["id"] == 3 and "rpc cache miss: eth_blockNumber" in responses[1]["error"]["message"]
+    assert replay.handle(BLOCK_NUMBER)["error"]["code"] == -32000
+    assert (replay.hits, replay.misses) == (2, 2)
+
+
+def test_upstream_errors(tmp_path, monkeypatch):
+    # A batch answered with a single error object.
+    limited = Upstream({"jsonrpc": "2.0", "id": None, "error": {"code": 429, "message": "rate limited"}})
+    cache = make_cache(tmp_path, monkeypatch, limited)
+    responses = cache.handle([CHAIN_ID, CODE])
+    assert [r["id"] for r in responses] == [1, 2]
+    assert all(r["error"]["message"] == "upstream error: rate limited" for r in responses)
+
+    # A response with its id missing.
+    partial = Upstream([{"jsonrpc": "2.0", "id": 1, "result": "0x1"}])
+    cache = make_cache(tmp_path, monkeypatch, partial)
+    responses = cache.handle([CHAIN_ID, CODE])
+    assert responses[0]["result"] == "0x1"
+    assert responses[1]["id"] == 2 and "no response" in responses[1]["error"]["message"]
+    # Nothing failed is stored.
+    assert cache.get(cache.key(CODE["method"], CODE["params"])) is None
+
+
+def test_block_tags_are_not_cached(tmp_path, monkeypatch):
+    assert cacheable("eth_getCode", ["0x" + "11" * 20, "0x10"])
+    assert cacheable("eth_call", [{}, {"blockHash": "0x" + "22" * 32}])
+    assert cacheable("eth_getTransactionReceipt", ["0x" + "22" * 32])
+    assert not cacheable("eth_call", [{}, "latest"])
+    assert not cacheable("eth_call", [{}])
+    assert not cacheable("eth_getBlockByNumber", ["pending", False])
+    assert not cacheable("eth_getStorageAt", ["0x" + "11" * 20, "0x0", "safe"])
+    assert not cacheable("eth_blockNumber", [])
+
+    upstream = Upstream()
+    cache = make_cache(tmp_path, monkeypatch, upstream)
+    assert cache.handle(LATEST_CALL)["result"] == "eth_call:1"
+    assert cache.handle(LATEST_CALL)["result"] == "eth_call:2"
+    replay = make_cache(tmp_path, monkeypatch, Upstream(), replay=True)
+    assert "rpc cache miss" in replay.handle(LATEST_CALL)["error"]["message"]
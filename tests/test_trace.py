@@ -0,0 +1,103 @@
+import pytest
+from ape import chain
+from eth_utils import keccak
+from utils.constants import WEEK
+from ybs.layout import StorageLayout
+from ybs.trace import SourceFunctions, load_solc_output, parse_source_map, profile_trace, step_costs
+
+
+def trace_steps(tx):
+    trace = chain.provider.make_request(
+        "debug_traceTransaction", [tx.txn_hash, {"enableMemory": True, "disableStorage": True}]
+    )
+    return trace["structLogs"]
+
+
+def get_code(address):
+    return bytes(chain.provider.get_code(address))
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    from scripts.gas_profile import compile_sources
+    return [c for output in compile_sources() for c in load_solc_output(output)]
+
+
+def test_trace_attributes_all_gas(user, staker, yprisma):
+    tx = staker.stake(100 * 10 ** 18, sender=user)
+    steps = trace_steps(tx)
+
+    # Without compiler output every frame is labelled by address; totals must still add up.
+    profile = profile_trace(steps, staker.address.lower(), tx.gas_used, get_code, [])
+    assert sum(profile.stacks.values()) == tx.gas_used
+    assert sum(step_costs(steps)) <= tx.gas_used
+    sstores = [k for k in profile.storage if k[2] == "SSTORE"]
+    assert len(sstores) > 0
+
+
+def test_trace_names_functions_and_storage(compiled, user, staker, yprisma):
+    staker.stake(100 * 10 ** 18, sender=user)
+    chain.pending_timestamp += 2 * WEEK
+    chain.mine()
+    tx = staker.stake(100 * 10 ** 18, sender=user)
+
+    profile = profile_trace(trace_steps(tx), staker.address.lower(), tx.gas_used, get_code, compiled)
+    assert sum(profile.stacks.values()) == tx.gas_used
+    # The clone delegates to the implementation, whose internal functions show up as frames.
+    assert any("YearnBoostedStaker._checkpointAccount" in stack.split(";") for stack in profile.stacks)
+    assert profile.functions["YearnBoostedStaker._checkpointAccount"] > 0
+    sstores = {variable for contract, variable, op in profile.storage if op == "SSTORE"}
+    assert {"accountWeeklyWeights", "globalWeeklyWeights"} <= sstores
+
+    lines = profile.folded().splitlines()
+    assert len(lines) == len([g for g in profile.stacks.values() if g > 0])
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == tx.gas_used
+    assert any(";YearnBoostedStaker;" in line and ";SSTORE accountWeeklyWeights " in line for line in lines)
+
+
+def test_source_map_and_functions():
+    # Empty fields repeat the previous entry.
+    assert parse_source_map("1:2:0:-;:5;;3::1:i") == [
+        (1, 2, 0, "-"), (1, 5, 0, "-"), (1, 5, 0, "-"), (3, 5, 1, "i"),
+    ]
+    ast = {"nodeType": "SourceUnit", "nodes": [{
+        "nodeType": "ContractDefinition", "name": "C", "nodes": [
+            {"nodeType": "FunctionDefinition", "name": "outer", "src": "10:100:0", "body": {
+                "nodeType": "Block", "statements": [],
+            }},
+            {"nodeType": "FunctionDefinition", "name": "", "kind": "constructor", "src": "200:20:0"},
+            {"nodeType": "ModifierDefinition", "name": "only", "src": "30:10:0"},
+        ],
+    }]}
+    functions = SourceFunctions([ast])
+    assert functions.find(50, 5, 0) == "C.outer"
+    assert functions.find(32, 2, 0) == "C.only"  # innermost
+    assert functions.find(205, 1, 0) == "C.constructor"
+    assert functions.find(150, 1, 0) is None
+    assert functions.find(50, 5, 1) is None
+
+
+def test_layout_names_mapping_slots():
+    layout = StorageLayout({"storage": [
+        {"label": "config", "slot": "0"},
+        {"label": "accountData", "slot": "1"},
+        {"label": "accountWeeklyWeights", "slot": "2"},
+    ]})
+    account = bytes.fromhex("00" * 12 + "11" * 20)
+    week = (7).to_bytes(32, "big")
+
+    def slot(preimage):
+        return int.from_bytes(keccak(preimage), "big")
+
+    inner = slot(account + (2).to_bytes(32, "big"))
+    value = slot(week + inner.to_bytes(32, "big"))
+    data = slot(account + (1).to_bytes(32, "big"))
+    preimages = {
+        inner: account + (2).to_bytes(32, "big"),
+        value: week + inner.to_bytes(32, "big"),
+        data: account + (1).to_bytes(32, "big"),
+    }
+    assert str(layout.name(0, preimages)) == "config"
+    assert str(layout.name(value, preimages)) == f"accountWeeklyWeights[0x{'11' * 20}][7]"
+    assert str(layout.name(data + 1, preimages)) == f"accountData[0x{'11' * 20}]+1"
+    assert str(layout.name(12345, preimages)) == "?"
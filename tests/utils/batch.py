@@ -0,0 +1,90 @@
+"""
+    Send many transactions into a single block.
+
+    With automine on, every transaction costs a block and a round trip. Inside
+    `manual_mining()` transactions are queued with `BlockBatch.add` and mined together
+    by `BlockBatch.mine`, which also sets the block timestamp, so a whole simulated
+    week (or several) of activity costs one block.
+"""
+from contextlib import contextmanager
+
+from ape import chain
+
+BLOCK_GAS_LIMIT = 1_000_000_000
+TX_GAS = 3_000_000
+
+
+def rpc(method, *params):
+    return chain.provider.make_request(method, list(params))
+
+
+class ProviderRPC:
+    """A `ybs.rpc.RPC` stand-in that routes requests through ape's provider."""
+
+    def call(self, method, *params):
+        return rpc(method, *params)
+
+    def batch(self, calls):
+        # The provider has no batch endpoint; callers only see the results.
+        return [rpc(method, *params) for method, params in calls]
+
+
+@contextmanager
+def manual_mining():
+    rpc("evm_setAutomine", False)
+    rpc("evm_setBlockGasLimit", hex(BLOCK_GAS_LIMIT))
+    try:
+        yield
+    finally:
+        rpc("evm_setAutomine", True)
+
+
+class BlockBatch:
+    def __init__(self, gas=TX_GAS):
+        self.gas = gas
+        self.calls = []
+
+    def __len__(self):
+        return len(self.calls)
+
+    def add(self, method, *args, sender):
+        """Queue `method(*args)` (e.g. `staker.stake`) from `sender`. Returns its index in the block."""
+        self.calls.append({
+            "from": sender.address,
+            "to": method.contract.address,
+            "data": method.encode_input(*args).hex(),
+        })
+        return len(self.calls) - 1
+
+    def mine(self, timestamp=None):
+        """
+            Send everything queued and mine it in one block, optionally at `timestamp`.
+            Returns the receipts (raw RPC dicts) in the order calls were added, and
+            clears the batch.
+        """
+        hashes = []
+        for i, call in enumerate(self.calls):
+            # Strictly decreasing gas prices keep block order equal to send order
+            # whichever ordering the node's mempool uses.
+            gas_price = len(self.calls) - i
+            tx = {**call, "gas": hex(self.gas), "gasPrice": hex(gas_price)}
+            if not tx["data"].startswith("0x"):
+                tx["data"] = "0x" + tx["data"]
+            hashes.append(rpc("eth_sendTransaction", tx))
+        if timestamp is not None:
+            rpc("evm_setNextBlockTimestamp", hex(timestamp))
+        rpc("evm_mine")
+        self.calls = []
+        if not hashes:
+            return []
+
+        receipts = rpc("eth_getBlockReceipts", "latest")
+        by_hash = {r["transactionHash"]: r for r in receipts}
+        ordered = [by_hash[h] for h in hashes]
+        assert [int(r["transactionIndex"], 16) for r in ordered] == list(range(len(hashes))), \
+            "transactions were not mined in the order they were sent"
+        return ordered
+
+
+def succeeded(receipt):
+    return int(receipt["status"], 16) == 1
@@ -6,6 +6,7 @@ YEAR = 31_556_952  # same value used in vault
 MAX_INT = 2**256 - 1
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 MAX_BPS = 1_000_000_000_000
+MAX_GROWTH_WEEKS = 4  # Used by the YBS deployment in the test fixtures.
 
 
 class ApprovalStatus(IntFlag):
@@ -44,6 +45,8 @@ CURVE_PROXY = '0x490b8C6007fFa5d3728A49c2ee199e51f05D2F7e'
 MULTICOLLATERAL_HINT_HELPERS = '0x3C5871D69C8d6503001e1A8f3bF7E5EbE447A9Cd'
 MULTI_TROVE_GETTER = '0x58fa5521f48b258B5e48A56b9B1bd95bFFA1eb1C'
 TROVE_MANAGER_GETTERS = '0xBBa100Eca7ea6fb0c651d1a234ca343088B1AC01'
+# YEARN
+YEARN_GOV = '0xFEB4acf3df3cDEA7399794D0869ef76A6EfAff52'
 # YEARN: PRISMA
 YPRISMA = '0xe3668873D944E4A949DA05fc8bDE419eFF543882'
 YEARN_LOCKER = '0x90be6DFEa8C80c184C442a36e17cB2439AAE25a7'
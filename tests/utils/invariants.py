@@ -0,0 +1,68 @@
+"""
+    System invariants of a staker, checked against the reference model in `ybs.staker`
+    that has been fed the same transactions. Shared by the sequenced scenario in
+    `test_staker` and the differential fuzzer in `test_fuzz`.
+"""
+
+
+def account_data(staker, account):
+    data = staker.accountData(account)
+    return (data.realizedStake, data.pendingStake, data.lastUpdateWeek, data.updateWeeksBitmap)
+
+
+def check_invariants(staker, model, accounts, token=None, wallets=None):
+    """
+        `accounts` must include every account holding a stake, so their weights add up
+        to the global weight. `wallets` optionally maps addresses to the stake token
+        balance each should hold.
+    """
+    max_weeks = model.MAX_STAKE_GROWTH_WEEKS
+    total_balance = total_weight = 0
+    for account in accounts:
+        a = account if isinstance(account, str) else account.address
+        balance, weight = staker.balanceOf(a), staker.getAccountWeight(a)
+        realized, pending, last_update_week, bitmap = account_data(staker, a)
+        assert (realized, pending, last_update_week, bitmap) == model.get_account_data(a)
+        # Each balance is its pending plus realized stake.
+        assert balance == model.balance_of(a) == (realized + pending) * 2
+        assert weight == model.get_account_weight(a)
+        # Weight never exceeds full boost, and is zero exactly when the balance is.
+        assert 2 * weight <= balance * (max_weeks + 1)
+        assert (weight == 0) == (balance == 0)
+        if balance == 0:
+            assert pending == 0 and realized == 0
+        if pending == 0:
+            assert weight == realized * (max_weeks + 1)
+        if wallets is not None:
+            assert token.balanceOf(a) == wallets[a]
+        total_balance += balance
+        total_weight += weight
+
+    assert total_balance == staker.totalSupply() == model.total_supply
+    assert total_weight == staker.getGlobalWeight() == model.get_global_weight()
+    assert staker.globalGrowthRate() == model.global_growth_rate
+    if token is not None:
+        assert token.balanceOf(staker) >= staker.totalSupply()
+
+
+def check_end_invariants(staker, model, accounts):
+    """
+        For every week so far, each account's deposits realizing `MAX_STAKE_GROWTH_WEEKS`
+        later plus its max-weighted deposits match the model, and add up to the global
+        figures.
+    """
+    max_weeks = model.MAX_STAKE_GROWTH_WEEKS
+    addresses = [a if isinstance(a, str) else a.address for a in accounts]
+    for week in range(staker.getWeek() + 1):
+        realize_week = week + max_weeks
+        users_sum = 0
+        for a in addresses:
+            to_realize = staker.accountWeeklyToRealize(a, realize_week).weightPersistent
+            max_stake = staker.accountWeeklyMaxStake(a, week)
+            assert to_realize == model.get_account_weekly_to_realize(a, realize_week)[0]
+            assert max_stake == model.account_weekly_max_stake.get(a, {}).get(week, 0)
+            users_sum += to_realize * 2 + max_stake
+        to_realize = staker.globalWeeklyToRealize(realize_week).weightPersistent
+        max_stake = staker.globalWeeklyMaxStake(week)
+        assert to_realize == model.get_global_weekly_to_realize(realize_week)[0]
+        assert users_sum == to_realize * 2 + max_stake
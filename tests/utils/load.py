@@ -0,0 +1,262 @@
+"""
+    Drive a staker and its reward distributor with thousands of synthetic accounts.
+
+    `generate(config)` turns a `LoadConfig` into a schedule, `{week index: [(op,
+    account index, fraction), ...]}` plus the reward deposited each week, using only
+    `random.Random(config.seed)`, so a seed always gives the same run. How many
+    operations land in a week follows the arrival pattern, and which accounts act
+    follows a heavy-tailed activity weight, so a few accounts act almost every week
+    while most go idle for long stretches.
+
+    `LoadRunner` funds the accounts (impersonated on anvil), then mines each week as
+    blocks of at most `per_block` transactions with automine off. Outcomes are
+    predicted with the reference models in `ybs.staker` and `ybs.distributor`, which
+    also give the `ybs.gas` features of every transaction before it is sent and the
+    reward tokens every account should end up with. `summarize` reports
+    throughput, gas percentiles per operation and the most expensive transactions
+    found, with the features that explain them.
+"""
+import heapq
+import random
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+from ape import chain
+
+from utils.constants import MAX_INT, WEEK
+from utils.batch import BlockBatch, manual_mining, rpc, succeeded
+from ybs.distributor import SingleTokenRewardDistributor
+from ybs.gas import claim_features, staker_features
+from ybs.staker import YearnBoostedStaker, ModelRevert
+
+OPS = ("stake", "unstake", "claim")
+BLOCK_TIME = 12
+STAKE_UNIT = 1_000 * 10 ** 18
+FUNDING = 10 ** 9 * 10 ** 18
+ETH_BALANCE = 10 ** 20
+SETUP_GAS = 100_000
+PERCENTILES = (50, 90, 99)
+
+# Relative number of operations in week `week` of `weeks`; all but "idle" average 1.
+ARRIVALS = {
+    "steady": lambda week, weeks: 1.0,
+    "ramp": lambda week, weeks: 2.0 * (week + 1) / (weeks + 1),
+    # A week at 4.5x every eight weeks, 0.5x in between.
+    "bursty": lambda week, weeks: 4.5 if week % 8 == 0 else 0.5,
+    # Busy for the first quarter and the last two weeks, idle in between, so everyone
+    # comes back to a long lag at once.
+    "idle": lambda week, weeks: 1.0 if week < max(weeks // 4, 1) or week >= weeks - 2 else 0.0,
+}
+
+
+@dataclass
+class LoadConfig:
+    max_weeks: int = 4
+    accounts: int = 2_000
+    weeks: int = 26
+    actions_per_week: int = 500     # mean, scaled by the arrival pattern
+    per_block: int = 250            # transactions per block
+    arrival: str = "steady"
+    mix: dict = field(default_factory=lambda: {"stake": 0.6, "unstake": 0.2, "claim": 0.2})
+    funded: float = 0.8             # chance a week gets a reward deposit
+    activity_shape: float = 1.2     # Pareto shape of account activity; lower is more skewed
+    seed: int = 0
+
+
+@dataclass
+class SyntheticAccount:
+    address: str
+
+
+def generate(config):
+    """`(accounts, schedule, deposits)` for `config`; deposits map week index to an amount."""
+    rng = random.Random(config.seed)
+    accounts = [SyntheticAccount("0x%040x" % rng.getrandbits(160)) for _ in range(config.accounts)]
+    activity = [rng.paretovariate(config.activity_shape) for _ in accounts]
+    ops, weights = zip(*sorted(config.mix.items()))
+    arrival = ARRIVALS[config.arrival]
+
+    schedule, deposits = {}, {}
+    for week in range(config.weeks):
+        if rng.random() < config.funded:
+            deposits[week] = rng.randint(1, 10_000) * 10 ** 18
+        n = int(round(config.actions_per_week * arrival(week, config.weeks)))
+        if not n:
+            continue
+        chosen = rng.choices(range(config.accounts), weights=activity, k=n)
+        schedule[week] = [(rng.choices(ops, weights)[0], i, rng.random()) for i in chosen]
+    return accounts, schedule, deposits
+
+
+class LoadRunner:
+    def __init__(self, staker, rewards, token, reward_token, depositor, config):
+        self.staker = staker
+        self.rewards = rewards
+        self.token = token
+        self.reward_token = reward_token
+        self.depositor = depositor
+        self.config = config
+        self.accounts, self.schedule, self.deposits = generate(config)
+        self.model = YearnBoostedStaker.from_chain(staker)
+        self.rewards_model = SingleTokenRewardDistributor.from_chain(rewards, self.model)
+        self.claimed = {}               # recipient -> reward tokens received
+        self.records = []
+        self.blocks = []                # (transactions, gas used, seconds) per block
+
+    def setup(self):
+        """Give every synthetic account ETH, stake tokens and an approval, in as few blocks as fit."""
+        rpc("anvil_autoImpersonateAccount", True)
+        for account in self.accounts:
+            rpc("anvil_setBalance", account.address, hex(ETH_BALANCE))
+        with manual_mining():
+            batch = BlockBatch(gas=SETUP_GAS)
+            batch.add(self.reward_token.mint, self.depositor, sum(self.deposits.values()), sender=self.depositor)
+            batch.add(self.reward_token.approve, self.rewards, MAX_INT, sender=self.depositor)
+            for account in self.accounts:
+                batch.add(self.token.mint, account.address, FUNDING, sender=self.depositor)
+                batch.add(self.token.approve, self.staker, MAX_INT, sender=account)
+                if len(batch) >= 2 * self.config.per_block:
+                    assert all(succeeded(r) for r in batch.mine())
+            assert all(succeeded(r) for r in batch.mine())
+        rpc("anvil_autoImpersonateAccount", False)
+
+    def run(self):
+        """Mine the whole schedule. Returns `summarize(...)` of what was recorded."""
+        latest = chain.provider.get_block("latest").timestamp
+        start = max(chain.pending_timestamp, latest + 1)
+        rpc("anvil_autoImpersonateAccount", True)
+        try:
+            with manual_mining():
+                for week_index in range(self.config.weeks):
+                    self._run_week(week_index, start + week_index * WEEK)
+        finally:
+            rpc("anvil_autoImpersonateAccount", False)
+        return summarize(self.records, self.blocks)
+
+    def _run_week(self, week_index, timestamp):
+        actions = self.schedule.get(week_index, [])
+        deposit = self.deposits.get(week_index)
+        size = self.config.per_block
+        for first in range(0, max(len(actions), 1 if deposit else 0), size):
+            block_timestamp = timestamp + first // size * BLOCK_TIME
+            self.model.set_time(block_timestamp)
+            batch = BlockBatch()
+            deposited = int(bool(deposit) and not first)
+            if deposited:
+                # Funds the week before anyone acts in it; not counted as an operation.
+                batch.add(self.rewards.depositReward, deposit, sender=self.depositor)
+                self.rewards_model.deposit_reward(deposit)
+            queued = [self._queue(batch, *action) for action in actions[first:first + size]]
+            began = time.perf_counter()
+            receipts = batch.mine(block_timestamp)
+            seconds = time.perf_counter() - began
+            assert all(succeeded(r) for r in receipts[:deposited]), "reward deposit failed"
+            for record, receipt in zip(queued, receipts[deposited:]):
+                record["gas"] = int(receipt["gasUsed"], 16)
+                record["status"] = succeeded(receipt)
+                self.records.append(record)
+            self.blocks.append((len(receipts), sum(int(r["gasUsed"], 16) for r in receipts), seconds))
+
+    def _queue(self, batch, op, index, fraction):
+        """Add one action to `batch`, apply it to the model and return its record."""
+        model = self.model
+        week = model.week
+        account = self.accounts[index]
+        balance = model.balance_of(account.address)
+        if op == "unstake" and balance < 2:
+            op = "stake"  # nothing to unstake yet
+        global_last = model.global_last_update_week
+        if not model.get_global_weight_at(global_last):
+            global_last = None
+        data = model.get_account_data(account.address)
+
+        if op == "claim":
+            rewards_model = self.rewards_model
+            start = rewards_model.get_account_info(account.address)[1] or rewards_model.START_WEEK
+            end = week - 1
+            features = claim_features(
+                start, end, model.MAX_STAKE_GROWTH_WEEKS, data, global_last,
+                [rewards_model.weekly_reward_amount.get(w, 0) for w in range(start, end + 1)],
+            )
+            batch.add(self.rewards.claim, sender=account)
+            recipient = rewards_model.recipient_of(account.address)
+            self.claimed[recipient] = self.claimed.get(recipient, 0) + rewards_model.claim(account.address)
+            expected = True
+        else:
+            features = staker_features(week, model.MAX_STAKE_GROWTH_WEEKS, data, global_last)
+            if op == "stake":
+                amount = max(int(fraction * STAKE_UNIT), 2)
+                batch.add(self.staker.stake, amount, sender=account)
+                apply = lambda: model.stake(account.address, amount)
+            else:
+                amount = max(int(fraction * balance), 2)
+                batch.add(self.staker.unstake, amount, account.address, sender=account)
+                apply = lambda: model.unstake(account.address, amount)
+            try:
+                apply()
+                expected = True
+            except ModelRevert:
+                expected = False
+        return {"op": op, "week": week, "account": account.address, "features": features, "expected": expected}
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    points = np.percentile(values, PERCENTILES, method="higher")
+    return {
+        "n": len(values),
+        "mean": float(np.mean(values)),
+        **{f"p{p}": int(v) for p, v in zip(PERCENTILES, points)},
+        "max": int(max(values)),
+    }
+
+
+def summarize(records, blocks, worst=5):
+    """
+        Summary of a run: totals and throughput, gas percentiles per op, and the
+        `worst` most expensive transactions of each op with their features.
+        `unexpected` lists transactions whose status the model got wrong.
+    """
+    seconds = sum(s for _, _, s in blocks)
+    transactions = sum(n for n, _, _ in blocks)
+    gas_used = sum(g for _, g, _ in blocks)
+    by_op = {}
+    for record in records:
+        by_op.setdefault(record["op"], []).append(record)
+    return {
+        "transactions": transactions,
+        "blocks": len(blocks),
+        "seconds": seconds,
+        "transactions_per_second": transactions / seconds if seconds else 0.0,
+        "gas_per_second": gas_used / seconds if seconds else 0.0,
+        "max_block_gas": max((g for _, g, _ in blocks), default=0),
+        "reverts": sum(1 for r in records if not r["status"]),
+        "unexpected": [r for r in records if r["status"] != r["expected"]],
+        "gas": {op: percentiles([r["gas"] for r in rows if r["status"]]) for op, rows in sorted(by_op.items())},
+        "worst": {
+            op: heapq.nlargest(worst, (r for r in rows if r["status"]), key=lambda r: r["gas"])
+            for op, rows in sorted(by_op.items())
+        },
+    }
+
+
+def format_summary(summary):
+    lines = [
+        f"{summary['transactions']:,} transactions in {summary['blocks']:,} blocks, {summary['seconds']:.1f}s: "
+        f"{summary['transactions_per_second']:,.0f} tx/s, {summary['gas_per_second']:,.0f} gas/s, "
+        f"max block {summary['max_block_gas']:,} gas, {summary['reverts']} reverts",
+        f"  {'op':<8} {'n':>7} {'mean':>10} " + " ".join(f"{'p' + str(p):>10}" for p in PERCENTILES) + f" {'max':>10}",
+    ]
+    for op, g in summary["gas"].items():
+        if g:
+            lines.append(
+                f"  {op:<8} {g['n']:>7,} {g['mean']:>10,.0f} "
+                + " ".join(f"{g['p' + str(p)]:>10,}" for p in PERCENTILES) + f" {g['max']:>10,}"
+            )
+    for op, rows in summary["worst"].items():
+        for r in rows[:1]:
+            features = ", ".join(f"{k}={v}" for k, v in r["features"].items() if v)
+            lines.append(f"  worst {op}: {r['gas']:,} gas in week {r['week']} by {r['account']} ({features})")
+    return "\n".join(lines)
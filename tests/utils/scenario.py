@@ -0,0 +1,93 @@
+"""
+    Run `ACTIVITY`-style schedules against a staker, one block per scheduled week.
+
+    A schedule maps a week index (weeks from the start of the run) to a list of
+    actions, as in `test_staker.test_sequenced_stake_and_unstake`:
+
+        {'type': 'stake' | 'unstake' | 'weighted_stake', 'user': account, 'amount': int | 'everything'}
+
+    Every action of a week is queued with `BlockBatch` and mined in a single block with
+    automine off; time moves with one `evm_setNextBlockTimestamp` per scheduled week, and
+    weeks without actions cost nothing. Outcomes are predicted with the reference model
+    in `ybs.staker`, which also resolves `'everything'` to the balance at that point in
+    the block (written back into the action). Weighted stakes are sent by
+    `weighted_staker`, which must be approved.
+"""
+from ape import chain
+
+from utils.constants import WEEK
+from utils.batch import BlockBatch, manual_mining, succeeded
+from ybs.staker import YearnBoostedStaker, ModelRevert
+
+
+class WeekResult:
+    def __init__(self, week_index, actions, receipts, weights):
+        self.week_index = week_index
+        self.actions = actions
+        self.receipts = receipts
+        # The model's account weight right after each action, None where it reverts.
+        self.weights = weights
+
+    def gas_used(self, kind=None):
+        return sum(
+            int(r["gasUsed"], 16)
+            for a, r in zip(self.actions, self.receipts)
+            if kind is None or a['type'] == kind
+        )
+
+
+class ScenarioRunner:
+    def __init__(self, staker, weighted_staker=None):
+        self.staker = staker
+        self.weighted_staker = weighted_staker
+        self.model = YearnBoostedStaker.from_chain(staker)
+
+    def run(self, activity, on_week=None):
+        """
+            Mine every week of `activity` in order. `on_week(result)` is called after
+            each block with its `WeekResult`. Returns the list of results.
+        """
+        latest = chain.provider.get_block("latest").timestamp
+        start = max(chain.pending_timestamp, latest + 1)
+        results = []
+        with manual_mining():
+            for week_index in sorted(activity):
+                timestamp = start + week_index * WEEK
+                self.model.set_time(timestamp)
+                batch = BlockBatch()
+                actions = activity[week_index]
+                weights = [self._queue(batch, action) for action in actions]
+                receipts = batch.mine(timestamp)
+                for action, weight, receipt in zip(actions, weights, receipts):
+                    ok = weight is not None
+                    assert succeeded(receipt) == ok, \
+                        f"week {week_index}: {action} expected {'success' if ok else 'revert'}"
+                result = WeekResult(week_index, actions, receipts, weights)
+                results.append(result)
+                if on_week is not None:
+                    on_week(result)
+        return results
+
+    def _queue(self, batch, action):
+        """Add `action` to `batch`. Returns the account's weight after it, or None if it should revert."""
+        staker, model = self.staker, self.model
+        u, amount = action['user'], action['amount']
+        if amount == 'everything':
+            amount = action['amount'] = model.balance_of(u.address)
+
+        if action['type'] == 'stake':
+            batch.add(staker.stake, amount, sender=u)
+            apply = lambda: model.stake(u.address, amount)
+        elif action['type'] == 'weighted_stake':
+            batch.add(staker.stakeAsMaxWeighted, u, amount, sender=self.weighted_staker)
+            apply = lambda: model.stake_as_max_weighted(u.address, amount)
+        elif action['type'] == 'unstake':
+            batch.add(staker.unstake, amount, u, sender=u)
+            apply = lambda: model.unstake(u.address, amount)
+        else:
+            raise ValueError(f"unknown action type {action['type']!r}")
+        try:
+            apply()
+        except ModelRevert:
+            return None
+        return model.get_account_weight(u.address)
@@ -0,0 +1,145 @@
+"""
+    Local (non-fork) test chain setup, cached as an anvil state dump.
+
+    `setup_local_chain` deploys the mock tokens, the registry and a YBS deployment,
+    and funds every account the fixtures use. Its result is dumped to `tests/.state`
+    keyed by a hash of the contract bytecode and of this module, so a change to either
+    invalidates the dump and the next session rebuilds it. A dump doesn't go stale
+    with time: loading it puts the clock back where the dump was taken, relative to
+    its `start_time`, so tests see the same weeks as after a fresh setup. Dumps can be
+    built ahead of time (e.g. for a CI cache) with:
+
+        YBS_TEST_MODE=local ape run build_test_state --network ethereum:local:foundry
+"""
+import hashlib
+import inspect
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from ape import chain
+
+from utils.constants import WEEK, YEARN_FEE_RECEIVER, YEARN_GOV, MAX_GROWTH_WEEKS
+
+STATE_DIR = Path(__file__).resolve().parents[1] / ".state"
+LOCAL_START_WEEKS_AGO = 10  # Synthetic start time keeps the week counter > 0, as on mainnet.
+
+# Contracts deployed during setup. Factories embed their implementations' creation
+# code, so this covers YearnBoostedStaker, the distributor and the utilities too.
+DEPLOYED_CONTRACTS = ["MockERC20", "YBSFactory", "YBSRewardFactory", "YBSUtilsFactory", "YBSRegistry"]
+
+MOCK_TOKENS = {
+    "yprisma": ("Yearn PRISMA", "yPRISMA"),
+    "prisma": ("Prisma Governance Token", "PRISMA"),
+    "mkusd": ("Prisma mkUSD", "mkUSD"),
+    "yvmkusd": ("mkUSD yVault", "yvmkUSD"),
+    "dai": ("Dai Stablecoin", "DAI"),
+}
+
+
+def state_key(project):
+    h = hashlib.sha256()
+    for name in DEPLOYED_CONTRACTS:
+        h.update(getattr(project, name).contract_type.deployment_bytecode.bytecode.encode())
+    h.update(inspect.getsource(sys.modules[__name__]).encode())
+    return h.hexdigest()[:16]
+
+
+def setup_local_chain(project, accounts):
+    deployer, user, user2, user3, rando = accounts[0], accounts[1], accounts[2], accounts[3], accounts[9]
+    yprisma_whale, yvmkusd_whale, dai_whale = accounts[8], accounts[7], accounts[6]
+    gov = accounts[YEARN_GOV]
+    fee_receiver = accounts[YEARN_FEE_RECEIVER]
+    for a in [gov, fee_receiver]:
+        a.balance += 10 ** 18
+
+    tokens = {
+        key: deployer.deploy(project.MockERC20, name, symbol, 18)
+        for key, (name, symbol) in MOCK_TOKENS.items()
+    }
+    yprisma, yvmkusd, dai = tokens["yprisma"], tokens["yvmkusd"], tokens["dai"]
+    for recipient, amount in [
+        (user, 100_000), (user2, 100_000), (user3, 100_000), (fee_receiver, 200_000),
+        (rando, 100_000), (gov, 100_000), (yprisma_whale, 1_000_000),
+    ]:
+        yprisma.mint(recipient, amount * 10 ** 18, sender=deployer)
+    yvmkusd.mint(yvmkusd_whale, 900_000 * 10 ** 18, sender=deployer)
+    yvmkusd.mint(fee_receiver, 100_000 * 10 ** 18, sender=deployer)
+    dai.mint(dai_whale, 1_000_000 * 10 ** 18, sender=deployer)
+
+    registry = user.deploy(
+        project.YBSRegistry,
+        gov,
+        user.deploy(project.YBSFactory),
+        user.deploy(project.YBSRewardFactory),
+        user.deploy(project.YBSUtilsFactory),
+        [rando],
+    )
+    start_time = chain.pending_timestamp - LOCAL_START_WEEKS_AGO * WEEK
+    registry.createNewDeployment(yprisma, MAX_GROWTH_WEEKS, start_time, yvmkusd, sender=gov)
+    deployment = registry.deployments(yprisma)
+
+    for token in [yprisma, yvmkusd]:
+        token.approve(deployment.rewardDistributor, 2**256-1, sender=fee_receiver)
+    for u in [user, user2, user3, gov]:
+        yprisma.approve(deployment.yearnBoostedStaker, 2**256-1, sender=u)
+
+    return {
+        **{key: token.address for key, token in tokens.items()},
+        "registry": registry.address,
+        "start_time": start_time,
+        "yprisma_whale": yprisma_whale.address,
+        "yvmkusd_whale": yvmkusd_whale.address,
+        "dai_whale": dai_whale.address,
+    }
+
+
+def _read_dump(path):
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+def dump_local_chain(project, manifest):
+    """
+        Write the dump, unless another xdist worker already wrote one. The file is
+        written next to its final path and renamed into place, so concurrent workers
+        never read or write a partial dump.
+    """
+    STATE_DIR.mkdir(exist_ok=True)
+    path = STATE_DIR / f"local-{state_key(project)}.json"
+    if path.exists():
+        return path
+    state = chain.provider.make_request("anvil_dumpState", [])
+    manifest = {**manifest, "timestamp": chain.pending_timestamp}
+    fd, tmp = tempfile.mkstemp(dir=STATE_DIR, prefix=path.stem, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"manifest": manifest, "state": state}, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def load_local_chain(project):
+    """
+        Load a matching dump into the connected node and return its manifest, or None.
+        The next block is timestamped as if no time had passed since the dump, so it
+        lands in the same week relative to the dumped `start_time`.
+    """
+    dump = _read_dump(STATE_DIR / f"local-{state_key(project)}.json")
+    if dump is None:
+        return None
+    chain.provider.make_request("anvil_loadState", [dump["state"]])
+    chain.pending_timestamp = dump["manifest"]["timestamp"]
+    return dump["manifest"]
+
+
+def local_chain(project, accounts):
+    manifest = load_local_chain(project)
+    if manifest is None:
+        manifest = setup_local_chain(project, accounts)
+        dump_local_chain(project, manifest)
+    return manifest
@@ -0,0 +1,6 @@
+"""
+    Off-chain tooling for Yearn Boosted Staker deployments.
+
+    Plain modules importable from the repository root (tests and scripts put it on
+    `sys.path`); nothing here is needed to compile or deploy the contracts.
+"""
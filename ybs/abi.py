@@ -0,0 +1,109 @@
+"""
+    The little ABI encoding the off-chain tools need: static arguments and return
+    values (addresses, uints, bools), Multicall3's `aggregate3`, and the selectors
+    of the YBS functions they call.
+
+    Hex strings are "0x"-prefixed; addresses decode lowercase.
+"""
+AGGREGATE3 = "0x82ad56cb"  # aggregate3((address,bool,bytes)[])
+MULTICALL3 = "0xca11bde05977b3631167028862be2a173976ca11"
+
+# Selectors of the YBS functions the off-chain tools call.
+# YearnBoostedStaker
+ACCOUNT_DATA = "0xdeb906e7"                   # accountData(address)
+BALANCE_OF = "0x70a08231"                     # balanceOf(address)
+TOTAL_SUPPLY = "0x18160ddd"                   # totalSupply()
+GET_WEEK = "0x874d6d81"                       # getWeek(), on the distributor too
+GLOBAL_GROWTH_RATE = "0x95255285"             # globalGrowthRate()
+GLOBAL_LAST_UPDATE_WEEK = "0x28f1ae51"        # globalLastUpdateWeek()
+MAX_STAKE_GROWTH_WEEKS = "0x29340501"         # MAX_STAKE_GROWTH_WEEKS()
+GET_ACCOUNT_WEIGHT = "0x3ea01b34"             # getAccountWeight(address)
+GET_GLOBAL_WEIGHT = "0x802c4a0f"              # getGlobalWeight()
+GET_ACCOUNT_WEIGHT_AT = "0x07f93a38"          # getAccountWeightAt(address,uint256)
+GET_GLOBAL_WEIGHT_AT = "0x4b3b140a"           # getGlobalWeightAt(uint256)
+ACCOUNT_WEEKLY_TO_REALIZE = "0x88ba63ba"      # accountWeeklyToRealize(address,uint256)
+GLOBAL_WEEKLY_TO_REALIZE = "0xe399f29f"       # globalWeeklyToRealize(uint256)
+CHECKPOINT_GLOBAL = "0xb48e9519"              # checkpointGlobal()
+CHECKPOINT_ACCOUNT_WITH_LIMIT = "0x12cf9dad"  # checkpointAccountWithLimit(address,uint256)
+# SingleTokenRewardDistributor
+START_WEEK = "0x0e057047"                     # START_WEEK()
+WEEKLY_REWARD_AMOUNT = "0x37381f42"           # weeklyRewardAmount(uint256)
+ACCOUNT_INFO = "0xa7310b58"                   # accountInfo(address)
+COMPUTE_SHARES_AT = "0x5fe6b010"              # computeSharesAt(address,uint256)
+ADJUSTED_ACCOUNT_WEIGHT_AT = "0x6db369ca"     # adjustedAccountWeightAt(address,uint256)
+ADJUSTED_GLOBAL_WEIGHT_AT = "0x3f43ae69"      # adjustedGlobalWeightAt(uint256)
+GET_CLAIMABLE = "0xa583024b"                  # getClaimable(address)
+GET_CLAIMABLE_AT = "0xbe960fda"               # getClaimableAt(address,uint256)
+GET_SUGGESTED_CLAIM_RANGE = "0x7e9c3626"      # getSuggestedClaimRange(address)
+PUSHABLE_REWARDS = "0x91c17197"               # pushableRewards(uint256)
+# YBSRegistry
+DEPLOYMENTS = "0x316b3739"                    # deployments(address)
+
+
+def _word(kind, value):
+    if kind == "address":
+        return value[2:].lower().rjust(64, "0")
+    if kind == "bool":
+        return "1".rjust(64, "0") if value else "0" * 64
+    if not 0 <= value < 2**256:
+        raise ValueError(f"{value} out of uint256 range")
+    return f"{value:064x}"
+
+
+def _unword(kind, word):
+    if kind == "address":
+        return "0x" + word[-40:].lower()
+    if kind == "bool":
+        return int(word, 16) != 0
+    return int(word, 16)
+
+
+def encode_call(selector, kinds=(), args=()):
+    """Calldata for `selector` with static arguments of the given kinds."""
+    return selector + "".join(_word(k, a) for k, a in zip(kinds, args))
+
+
+def decode(kinds, data):
+    """Decode static return values; a single value is returned bare."""
+    data = data[2:]
+    if len(data) < 64 * len(kinds):
+        raise ValueError(f"expected {len(kinds)} words, got {len(data) // 64}")
+    values = tuple(_unword(k, data[i * 64:(i + 1) * 64]) for i, k in enumerate(kinds))
+    return values[0] if len(values) == 1 else values
+
+
+def _bytes(data):
+    data = data[2:]
+    padded = data + "0" * (-len(data) % 64)
+    return f"{len(data) // 2:064x}" + padded
+
+
+def encode_aggregate3(calls, allow_failure=True):
+    """Calldata for `aggregate3` over `[(target, calldata), ...]`."""
+    tuples = [_word("address", target) + _word("bool", allow_failure) + f"{0x60:064x}" + _bytes(data)
+              for target, data in calls]
+    offsets, position = [], 32 * len(tuples)
+    for t in tuples:
+        offsets.append(f"{position:064x}")
+        position += len(t) // 2
+    return AGGREGATE3 + f"{0x20:064x}" + f"{len(calls):064x}" + "".join(offsets) + "".join(tuples)
+
+
+def decode_aggregate3(data):
+    """`[(success, return data), ...]` from `aggregate3`'s return value."""
+    data = bytes.fromhex(data[2:])
+
+    def word(position):
+        return int.from_bytes(data[position:position + 32], "big")
+
+    array = word(0)
+    length = word(array)
+    head = array + 32
+    results = []
+    for i in range(length):
+        item = head + word(head + 32 * i)
+        success = word(item) != 0
+        start = item + word(item + 32)
+        size = word(start)
+        results.append((success, "0x" + data[start + 32:start + 32 + size].hex()))
+    return results
@@ -0,0 +1,203 @@
+"""
+    Compute every account's claimable rewards off chain.
+
+        python -m ybs.claimable --matrix data/0xstaker --rewards 0x... --out claimable.csv --check 50
+
+    Reproduces `SingleTokenRewardDistributor.getClaimable` and
+    `getSuggestedClaimRange` from a `ybs.matrix.WeightMatrix` (weights, weightPersistent
+    and weeklyRewardAmount per week) and each account's `lastClaimWeek`. Adjusted
+    weights are subtracted on the matrix's uint64 limbs; shares and amounts then
+    follow the contract's truncating integer math on Python ints (object arrays, so
+    nothing overflows), for a chunk of accounts at once and only in weeks that pay:
+
+        share  = adjustedAccountWeight * PRECISION // adjustedGlobalWeight
+        amount = share * weeklyRewardAmount // PRECISION
+
+    The matrix must hold every week from `START_WEEK` up to the week before the current
+    one. An account whose only positive week is the current week gets (0, 0) as its
+    suggested range, where the contract returns (current, current - 1); both claim
+    nothing.
+"""
+import argparse
+import csv
+import random
+
+import numpy as np
+
+from ybs.distributor import PRECISION
+
+COLUMNS = ("account", "claimable", "claim_start_week", "claim_end_week")
+
+
+def compute_claimable(matrix, current_week, start_week, last_claim_weeks, chunk_size=10_000):
+    """
+        Yield `(account, claimable, claim_start_week, claim_end_week)` for every account
+        in `matrix`, in index order. `last_claim_weeks` maps account to
+        `accountInfo(account).lastClaimWeek`; missing accounts have never claimed.
+    """
+    for accounts, weeks, amounts in weekly_claimable(matrix, current_week, start_week, last_claim_weeks, chunk_size):
+        if not len(weeks):
+            for account in accounts:
+                yield account, 0, 0, 0
+            continue
+        positive = amounts > 0
+        has_any = positive.any(axis=1)
+        claim_start = weeks[positive.argmax(axis=1)]
+        claim_end = weeks[len(weeks) - 1 - positive[:, ::-1].argmax(axis=1)]
+        totals = amounts.sum(axis=1)
+
+        for i, account in enumerate(accounts):
+            if has_any[i]:
+                yield account, int(totals[i]), int(claim_start[i]), int(claim_end[i])
+            else:
+                yield account, 0, 0, 0
+
+
+def weekly_claimable(matrix, current_week, start_week, last_claim_weeks, chunk_size=10_000, indexes=slice(None)):
+    """
+        Yield `(accounts, weeks, amounts)` for chunks of the accounts at `indexes` (a
+        slice), in index order, where `amounts[i, j]` is what `accounts[i]` can still
+        claim for `weeks[j]`, every week from `start_week` to `current_week - 1`.
+    """
+    if matrix.start_week > start_week:
+        raise ValueError(f"matrix starts at week {matrix.start_week}, after START_WEEK {start_week}")
+    if matrix.end_week < current_week:
+        raise ValueError(f"matrix ends at week {matrix.end_week - 1}, need up to {current_week - 1}")
+
+    lo, hi, _ = indexes.indices(matrix.n_accounts)
+    chunks = [(first, min(first + chunk_size, hi)) for first in range(lo, hi, chunk_size)]
+    weeks = np.arange(start_week, max(current_week, start_week))
+    if not len(weeks):
+        for first, last in chunks:
+            yield matrix.accounts[first:last], weeks, np.zeros((last - first, 0), dtype=object)
+        return
+
+    rows = slice(matrix.row(start_week), matrix.row(current_week - 1) + 1)
+    global_weight = matrix.adjusted_global_weight(rows).to_int()
+    rewards = matrix.column("reward_amount")[rows].to_int()
+    # Weeks with no global weight or no rewards pay nothing; only the others are
+    # converted to Python ints and divided.
+    paid = np.flatnonzero((global_weight > 0) & (rewards > 0))
+
+    for first, last in chunks:
+        accounts = matrix.accounts[first:last]
+        amounts = np.zeros((last - first, len(weeks)), dtype=object)
+        if len(paid):
+            # (weeks, accounts) -> (accounts, weeks)
+            weights = matrix.adjusted_weight(rows, slice(first, last))[paid].to_int().T
+            shares = weights * PRECISION // global_weight[paid]
+            amounts[:, paid] = shares * rewards[paid] // PRECISION
+
+        min_start = np.array([max(start_week, last_claim_weeks.get(a, 0)) for a in accounts])
+        yield accounts, weeks, np.where(weeks[None, :] >= min_start[:, None], amounts, 0)
+
+
+def write_csv(rows, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for row in rows:
+            writer.writerow(row)
+
+
+def write_parquet(rows, path, batch_size=100_000):
+    """Write rows with pyarrow, `claimable` as a decimal string (it can exceed 64 bits)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("account", pa.string()), ("claimable", pa.string()),
+        ("claim_start_week", pa.int64()), ("claim_end_week", pa.int64()),
+    ])
+    with pq.ParquetWriter(path, schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                writer.write_table(_table(pa, schema, batch))
+                batch = []
+        if batch:
+            writer.write_table(_table(pa, schema, batch))
+
+
+def _table(pa, schema, batch):
+    account, claimable, start, end = zip(*batch)
+    return pa.table([list(account), [str(c) for c in claimable], list(start), list(end)], schema=schema)
+
+
+def check_sample(rows, get_claimable, get_suggested_claim_range, k=50, seed=None):
+    """
+        Compare `k` random rows against the contract through the given callables
+        (account -> int, account -> (start, end)). Returns the mismatches as
+        `(row, claimable, range)`.
+    """
+    rows = list(rows)
+    sample = random.Random(seed).sample(rows, min(k, len(rows)))
+    mismatches = []
+    for row in sample:
+        account, claimable, start, end = row
+        expected = get_claimable(account)
+        expected_range = tuple(get_suggested_claim_range(account))
+        if claimable != expected or ((start, end) != expected_range and claimable != 0):
+            mismatches.append((row, expected, expected_range))
+    return mismatches
+
+
+def main():
+    from ybs.abi import (
+        ACCOUNT_INFO, GET_CLAIMABLE, GET_SUGGESTED_CLAIM_RANGE, GET_WEEK, START_WEEK, decode, encode_call,
+    )
+    from ybs.matrix import WeightMatrix
+    from ybs.rpc import RPC
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matrix", required=True)
+    parser.add_argument("--rewards", required=True, help="SingleTokenRewardDistributor address.")
+    parser.add_argument("--rpc", default="http://127.0.0.1:8545")
+    parser.add_argument("--block", default="latest")
+    parser.add_argument("--out", required=True, help="Output path; .parquet writes Parquet, anything else CSV.")
+    parser.add_argument("--check", type=int, default=0, help="Check this many random accounts against the contract.")
+    args = parser.parse_args()
+
+    rpc = RPC(args.rpc)
+    block = args.block if args.block == "latest" else hex(int(args.block))
+
+    def call_params(selector, *accounts):
+        return {"to": args.rewards, "data": encode_call(selector, ["address"] * len(accounts), accounts)}, block
+
+    def call(selector, *accounts):
+        return rpc.call("eth_call", *call_params(selector, *accounts))
+
+    matrix = WeightMatrix(args.matrix)
+    current_week = decode(["uint"], call(GET_WEEK))
+    start_week = decode(["uint"], call(START_WEEK))
+    last_claim_weeks = {}
+    for first in range(0, matrix.n_accounts, 500):
+        accounts = matrix.accounts[first:first + 500]
+        results = rpc.batch([("eth_call", call_params(ACCOUNT_INFO, a)) for a in accounts])
+        last_claim_weeks.update((a, decode(["address", "uint"], r)[1]) for a, r in zip(accounts, results))
+
+    rows = compute_claimable(matrix, current_week, start_week, last_claim_weeks)
+    if args.check:
+        rows = list(rows)
+        mismatches = check_sample(
+            rows,
+            lambda a: decode(["uint"], call(GET_CLAIMABLE, a)),
+            lambda a: decode(["uint", "uint"], call(GET_SUGGESTED_CLAIM_RANGE, a)),
+            args.check,
+        )
+        for row, claimable, claim_range in mismatches:
+            print(f"MISMATCH {row[0]}: computed {row[1]} {row[2:]}, contract {claimable} {claim_range}")
+        if mismatches:
+            raise SystemExit(1)
+        print(f"Sample of {min(args.check, len(rows))} accounts matches the contract")
+
+    if args.out.endswith(".parquet"):
+        write_parquet(rows, args.out)
+    else:
+        write_csv(rows, args.out)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+    Plan claims from local data: the tightest claim range, split into gas-bounded
+    `claimWithRange` calls when one call would cost too much.
+
+        amounts = claimable_by_week(matrix, account, current_week, start_week, last_claim_week)
+        ranges = plan_claims(amounts, budget=2_000_000, cost=claim_cost())
+
+    `claimWithRange(start, end)` starts at `max(lastClaimWeek, start)` and moves
+    `lastClaimWeek` to `end + 1`, so any week left between two calls is forfeited for
+    good. A plan only ever leaves out weeks with nothing to claim: each range starts
+    and ends on a claimable week, ranges are in order, and every claimable week is
+    inside one of them. `check_plan` replays a plan the way the contract applies it.
+
+    Among such plans `plan_claims` picks the cheapest whose every call fits the
+    budget, given `cost(start, end)`. `claim_cost` builds it from a calibrated
+    `ybs.gas.GasModel` and the account's state, or from a rough per-week price.
+"""
+import numpy as np
+
+from ybs.claimable import weekly_claimable
+from ybs.gas import OPS, claim_features
+
+# Without a model: a claim pays the fixed transaction and transfer costs once, and
+# about five cold reads and four calls into the staker per week scanned.
+FALLBACK_BASE = 60_000
+FALLBACK_WEEK = 16_000
+
+
+def claimable_by_week(matrix, account, current_week, start_week, last_claim_week=0):
+    """`{week: claimable}` for one account of a `ybs.matrix.WeightMatrix`, weeks with nothing left out."""
+    index = matrix.account_index(account)
+    _, weeks, amounts = next(weekly_claimable(
+        matrix, current_week, start_week, {account: last_claim_week}, indexes=slice(index, index + 1)
+    ))
+    return {int(w): int(a) for w, a in zip(weeks, amounts[0]) if a > 0}
+
+
+def suggested_claim_range(amounts, min_start_week=0):
+    """The tightest `(start, end)` covering every claimable week from `min_start_week`, or (0, 0)."""
+    weeks = [w for w, amount in amounts.items() if amount > 0 and w >= min_start_week]
+    return (min(weeks), max(weeks)) if weeks else (0, 0)
+
+
+def claim_cost(model=None, max_weeks=None, account_data=None, global_last_update_week=None, reward_amounts=None):
+    """
+        `cost(start, end)`, the estimated gas of `claimWithRange(start, end)`. With a
+        `GasModel`, the account's `accountData`, the staker's global checkpoint and
+        `{week: weeklyRewardAmount}` are needed too. Features add up week by week, so
+        ranges are priced from running sums.
+    """
+    if model is None:
+        return lambda start, end: FALLBACK_BASE + (end - start + 1) * FALLBACK_WEEK
+    reward_amounts = reward_amounts or {}
+    names = OPS["claimWithRange"]
+    origin, prefix = None, []  # prefix[k]: feature sums over weeks origin..origin + k - 1
+
+    def sums(start, end):
+        nonlocal origin, prefix
+        if origin is None or start < origin:
+            origin, prefix = start, [dict.fromkeys(names, 0)]
+        while origin + len(prefix) <= end + 1:
+            week = origin + len(prefix) - 1
+            features = claim_features(
+                week, week, max_weeks, account_data, global_last_update_week, [reward_amounts.get(week, 0)]
+            )
+            prefix.append({n: prefix[-1][n] + features[n] for n in names})
+        return {n: prefix[end + 1 - origin][n] - prefix[start - origin][n] for n in names}
+
+    def cost(start, end):
+        features = sums(start, end)
+        features["transfer"] = int(features["funded_weeks"] > 0)
+        return model.predict("claimWithRange", features)
+
+    return cost
+
+
+def plan_claims(amounts, budget, cost=None, min_start_week=0):
+    """
+        Split the claim of `amounts` (`{week: claimable}`, weeks before
+        `min_start_week` already claimed) into `[(start, end), ...]` calls, each
+        estimated at most `budget` gas, with the least total gas. Raises ValueError
+        if a single claimable week doesn't fit the budget.
+    """
+    cost = cost or claim_cost()
+    weeks = sorted(w for w, amount in amounts.items() if amount > 0 and w >= min_start_week)
+    # best[j]: cheapest plan for the first j claimable weeks, whose last call starts at weeks[first[j]].
+    best = [0] + [np.inf] * len(weeks)
+    first = [0] * (len(weeks) + 1)
+    for j in range(1, len(weeks) + 1):
+        for i in range(j, 0, -1):
+            gas = cost(weeks[i - 1], weeks[j - 1])
+            if gas > budget:
+                break  # an earlier start only scans more weeks
+            if best[i - 1] + gas < best[j]:
+                best[j], first[j] = best[i - 1] + gas, i - 1
+        if best[j] == np.inf:
+            raise ValueError(f"claiming week {weeks[j - 1]} alone costs more than {budget} gas")
+
+    ranges, j = [], len(weeks)
+    while j > 0:
+        ranges.append((weeks[first[j]], weeks[j - 1]))
+        j = first[j]
+    ranges.reverse()
+    check_plan(ranges, amounts, min_start_week)
+    return ranges
+
+
+def check_plan(ranges, amounts, last_claim_week=0, start_week=0):
+    """
+        Apply `ranges` as consecutive `claimWithRange` calls from `lastClaimWeek` and
+        raise ValueError if any claimable week would be skipped or left unclaimed.
+    """
+    last = last_claim_week
+    claimed = set()
+    for start, end in ranges:
+        begin = max(last or start_week, start)
+        if begin > end:
+            raise ValueError(f"range ({start}, {end}) claims nothing after lastClaimWeek {last}")
+        skipped = [w for w, amount in amounts.items() if amount > 0 and max(last, start_week) <= w < begin]
+        if skipped:
+            raise ValueError(f"range ({start}, {end}) forfeits claimable weeks {sorted(skipped)}")
+        claimed.update(range(begin, end + 1))
+        last = end + 1
+    missed = [w for w, amount in amounts.items() if amount > 0 and w >= max(last_claim_week, start_week) and w not in claimed]
+    if missed:
+        raise ValueError(f"claimable weeks {sorted(missed)} are not claimed")
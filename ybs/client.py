@@ -0,0 +1,208 @@
+"""
+    Async read client for a YBS deployment.
+
+        client = await YBSClient.from_registry(RPC(url), registry, token)
+        await client.pin()  # read everything at the current head
+        weights = await asyncio.gather(*(client.get_account_weight_at(a, week) for a in accounts))
+
+    Reads made concurrently are coalesced: everything queued in the same event loop
+    turn is packed into Multicall3 `aggregate3` calls (or plain `eth_call`s when
+    `multicall` is None) and sent as one JSON-RPC batch. The blocking HTTP request runs
+    in a worker thread through `ybs.rpc.RPC`.
+
+    Reads are made at the pinned block (`pin`), or at "latest" when unpinned. Views
+    of a week that has ended at the block read from never change again, so they are
+    cached for the life of the client and served to any read at a block where that
+    week has ended too; `weeklyRewardAmount` and claimable amounts are the exception,
+    since `pushRewards` and claims change past weeks. Everything else read at a
+    pinned block goes into an LRU keyed by block.
+"""
+import asyncio
+from collections import OrderedDict
+
+from ybs import abi
+from ybs.abi import MULTICALL3, decode, decode_aggregate3, encode_aggregate3, encode_call
+
+
+class CallReverted(Exception):
+    pass
+
+
+class View:
+    def __init__(self, contract, selector, args, returns, final=False):
+        self.contract = contract  # "staker", "rewards" or "registry"
+        self.selector = selector
+        self.args = args
+        self.returns = returns
+        self.final = final        # fixed once its `week` argument (the last one) has ended
+
+
+VIEWS = {
+    "account_data": View("staker", abi.ACCOUNT_DATA, ["address"], ["uint", "uint", "uint", "uint"]),
+    "balance_of": View("staker", abi.BALANCE_OF, ["address"], ["uint"]),
+    "total_supply": View("staker", abi.TOTAL_SUPPLY, [], ["uint"]),
+    "get_week": View("staker", abi.GET_WEEK, [], ["uint"]),
+    "global_growth_rate": View("staker", abi.GLOBAL_GROWTH_RATE, [], ["uint"]),
+    "get_account_weight": View("staker", abi.GET_ACCOUNT_WEIGHT, ["address"], ["uint"]),
+    "get_global_weight": View("staker", abi.GET_GLOBAL_WEIGHT, [], ["uint"]),
+    "get_account_weight_at": View("staker", abi.GET_ACCOUNT_WEIGHT_AT, ["address", "uint"], ["uint"], final=True),
+    "get_global_weight_at": View("staker", abi.GET_GLOBAL_WEIGHT_AT, ["uint"], ["uint"], final=True),
+    "account_weekly_to_realize": View("staker", abi.ACCOUNT_WEEKLY_TO_REALIZE, ["address", "uint"], ["uint", "uint"], final=True),
+    "global_weekly_to_realize": View("staker", abi.GLOBAL_WEEKLY_TO_REALIZE, ["uint"], ["uint", "uint"], final=True),
+    "compute_shares_at": View("rewards", abi.COMPUTE_SHARES_AT, ["address", "uint"], ["uint"], final=True),
+    "adjusted_account_weight_at": View("rewards", abi.ADJUSTED_ACCOUNT_WEIGHT_AT, ["address", "uint"], ["uint"], final=True),
+    "adjusted_global_weight_at": View("rewards", abi.ADJUSTED_GLOBAL_WEIGHT_AT, ["uint"], ["uint"], final=True),
+    "weekly_reward_amount": View("rewards", abi.WEEKLY_REWARD_AMOUNT, ["uint"], ["uint"]),
+    "account_info": View("rewards", abi.ACCOUNT_INFO, ["address"], ["address", "uint"]),
+    "get_claimable": View("rewards", abi.GET_CLAIMABLE, ["address"], ["uint"]),
+    "get_claimable_at": View("rewards", abi.GET_CLAIMABLE_AT, ["address", "uint"], ["uint"]),
+    "get_suggested_claim_range": View("rewards", abi.GET_SUGGESTED_CLAIM_RANGE, ["address"], ["uint", "uint"]),
+    "pushable_rewards": View("rewards", abi.PUSHABLE_REWARDS, ["uint"], ["uint"]),
+}
+DEPLOYMENTS = View("registry", abi.DEPLOYMENTS, ["address"], ["address", "address", "address"])
+BLOCK_NUMBER = "eth_blockNumber"
+
+
+class YBSClient:
+    def __init__(self, rpc, staker, rewards, multicall=MULTICALL3, block=None, cache_size=50_000, batch_size=250):
+        self.rpc = rpc
+        self.addresses = {"staker": staker.lower(), "rewards": rewards.lower()}
+        self.multicall = multicall
+        self.block = block
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.final = {}            # (target, calldata) -> value
+        self.recent = OrderedDict()  # (block, target, calldata) -> value
+        self._latest_ended_week = -1  # every week up to this one has ended at the head
+        self._pending = []         # (block tag, target, calldata, future)
+        self._inflight = {}        # (block tag, target, calldata) -> future
+        self._flush_scheduled = False
+        self.stats = {"calls": 0, "cached": 0, "requests": 0}
+
+    @classmethod
+    async def from_registry(cls, rpc, registry, token, **kwargs):
+        """Resolve the deployment for `token` from `YBSRegistry.deployments`."""
+        client = cls(rpc, "0x" + "00" * 20, "0x" + "00" * 20, **kwargs)
+        client.addresses["registry"] = registry.lower()
+        staker, rewards, utilities = await client._read(DEPLOYMENTS, token)
+        if int(staker, 16) == 0:
+            raise LookupError(f"no deployment for {token}")
+        client.addresses.update(staker=staker, rewards=rewards, utilities=utilities)
+        return client
+
+    async def pin(self, block=None):
+        """Read at `block` from now on (default: the current head). Returns the block number."""
+        if block is None:
+            block = int(await asyncio.to_thread(self.rpc.call, BLOCK_NUMBER), 16)
+        self.block = block
+        return block
+
+    def unpin(self):
+        self.block = None
+
+    # Reading
+
+    async def _read(self, view, *args):
+        target = self.addresses[view.contract]
+        calldata = encode_call(view.selector, view.args, args)
+        tag = "latest" if self.block is None else hex(self.block)
+        self.stats["calls"] += 1
+
+        if view.final:
+            key = (target, calldata)
+            ended = await self._has_ended(args[-1], tag)
+            if ended and key in self.final:
+                self.stats["cached"] += 1
+                return self.final[key]
+            value = await self._fetch(tag, target, calldata, view)
+            if ended:
+                self.final[key] = value
+            return value
+        return await self._fetch(tag, target, calldata, view)
+
+    async def _has_ended(self, week, tag):
+        """Whether `week` has ended at the block `tag`, from that block's `getWeek()`."""
+        if tag == "latest":
+            # The head only moves forward, so a week seen ended there stays ended.
+            if week > self._latest_ended_week:
+                self._latest_ended_week = max(self._latest_ended_week, await self._get_week(tag) - 1)
+            return week <= self._latest_ended_week
+        # Cached per block, so this costs at most one call per pinned block.
+        return week <= await self._get_week(tag) - 1
+
+    async def _get_week(self, tag):
+        view = VIEWS["get_week"]
+        return await self._fetch(tag, self.addresses["staker"], encode_call(view.selector, view.args, ()), view)
+
+    async def _fetch(self, tag, target, calldata, view):
+        key = (tag, target, calldata)
+        if tag != "latest" and key in self.recent:
+            self.recent.move_to_end(key)
+            self.stats["cached"] += 1
+            return self.recent[key]
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._inflight[key] = asyncio.get_running_loop().create_future()
+            self._pending.append((tag, target, calldata, future))
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                asyncio.get_running_loop().call_soon(lambda: asyncio.ensure_future(self._flush()))
+        data = await future
+        value = decode(view.returns, data)
+        if tag != "latest":
+            self.recent[key] = value
+            self.recent.move_to_end(key)
+            while len(self.recent) > self.cache_size:
+                self.recent.popitem(last=False)
+        return value
+
+    async def _flush(self):
+        pending, self._pending = self._pending, []
+        self._flush_scheduled = False
+        requests = []
+        if self.multicall is None:
+            for tag, target, calldata, _ in pending:
+                requests.append(("eth_call", ({"to": target, "data": calldata}, tag)))
+        else:
+            by_block = {}
+            for item in pending:
+                by_block.setdefault(item[0], []).append(item)
+            pending = []
+            for tag, items in by_block.items():
+                for i in range(0, len(items), self.batch_size):
+                    chunk = items[i:i + self.batch_size]
+                    data = encode_aggregate3([(target, calldata) for _, target, calldata, _ in chunk])
+                    requests.append(("eth_call", ({"to": self.multicall, "data": data}, tag)))
+                    pending.extend(chunk)
+
+        self.stats["requests"] += 1
+        try:
+            # Without multicall, one reverting call fails the whole batch.
+            results = await asyncio.to_thread(self.rpc.batch, requests)
+        except Exception as exc:
+            for tag, target, calldata, future in pending:
+                self._inflight.pop((tag, target, calldata), None)
+                future.set_exception(exc)
+            return
+
+        outcomes = []
+        for result in results:
+            outcomes.extend([(True, result)] if self.multicall is None else decode_aggregate3(result))
+        for (tag, target, calldata, future), (success, data) in zip(pending, outcomes):
+            self._inflight.pop((tag, target, calldata), None)
+            if success and len(data) > 2:
+                future.set_result(data)
+            else:
+                future.set_exception(CallReverted(f"{target} {calldata[:10]} reverted"))
+
+
+def _view_method(name, view):
+    async def read(self, *args):
+        return await self._read(view, *args)
+    read.__name__ = name
+    read.__doc__ = f"`{view.selector}` on the {view.contract}, args {tuple(view.args)}."
+    return read
+
+
+for _name, _view in VIEWS.items():
+    setattr(YBSClient, _name, _view_method(_name, _view))
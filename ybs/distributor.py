@@ -0,0 +1,177 @@
+"""
+    Reference model of `SingleTokenRewardDistributor`.
+
+    Reads weights from a `ybs.staker.YearnBoostedStaker` model and reproduces the
+    contract's integer math exactly: shares scaled to `PRECISION` and truncated, the
+    first-week `weightPersistent` exclusion, and `lastClaimWeek` being one past the
+    last claimed week. Token transfers and claimer approvals are not modelled.
+"""
+from ybs.staker import ModelRevert, _sub
+
+PRECISION = 10**27
+
+
+class AccountInfo:
+    __slots__ = ("recipient", "last_claim_week")
+
+    def __init__(self, recipient=None, last_claim_week=0):
+        self.recipient = recipient
+        self.last_claim_week = last_claim_week
+
+
+_EMPTY_INFO = AccountInfo()
+
+
+class SingleTokenRewardDistributor:
+    __slots__ = ("staker", "START_WEEK", "MAX_STAKE_GROWTH_WEEKS", "weekly_reward_amount", "account_info")
+
+    def __init__(self, staker, start_week=None):
+        """`start_week` defaults to the staker model's week, as when deployed alongside it."""
+        self.staker = staker
+        self.START_WEEK = staker.week if start_week is None else start_week
+        self.MAX_STAKE_GROWTH_WEEKS = staker.MAX_STAKE_GROWTH_WEEKS
+        self.weekly_reward_amount = {}  # week -> amount
+        self.account_info = {}          # account -> AccountInfo
+
+    @classmethod
+    def from_chain(cls, rewards, staker):
+        """A fresh model of a deployed distributor, over the model `staker`."""
+        return cls(staker, rewards.START_WEEK())
+
+    def get_week(self):
+        return self.staker.week
+
+    # Mutations
+
+    def deposit_reward(self, amount):
+        if amount > 0:
+            week = self.get_week()
+            self.weekly_reward_amount[week] = self.weekly_reward_amount.get(week, 0) + amount
+
+    def push_rewards(self, week):
+        current_week = self.get_week()
+        amount = self.pushable_rewards(week)
+        if amount == 0:
+            return False
+        self.weekly_reward_amount[week] = 0
+        self.weekly_reward_amount[current_week] = self.weekly_reward_amount.get(current_week, 0) + amount
+        return True
+
+    def claim(self, account):
+        current_week = self.get_week()
+        return self.claim_with_range(account, 0, 0 if current_week == 0 else current_week - 1)
+
+    claim_for = claim
+
+    def claim_with_range(self, account, claim_start_week, claim_end_week):
+        """Returns the amount claimed; see `recipient_of` for who receives it."""
+        if claim_end_week >= self.get_week():
+            return 0
+        info = self.account_info.get(account, _EMPTY_INFO)
+        min_start_week = self.START_WEEK if info.last_claim_week == 0 else info.last_claim_week
+        claim_start_week = max(min_start_week, claim_start_week)
+        if claim_start_week > claim_end_week:
+            return 0
+
+        amount_claimed = self._get_total_claimable_by_range(account, claim_start_week, claim_end_week)
+        if info is _EMPTY_INFO:
+            info = self.account_info[account] = AccountInfo()
+        info.last_claim_week = claim_end_week + 1
+        return amount_claimed
+
+    claim_with_range_for = claim_with_range
+
+    def configure_recipient(self, account, recipient):
+        info = self.account_info.get(account)
+        if info is None:
+            info = self.account_info[account] = AccountInfo()
+        info.recipient = recipient
+
+    # Views
+
+    def recipient_of(self, account):
+        recipient = self.account_info.get(account, _EMPTY_INFO).recipient
+        return recipient or account
+
+    def get_account_info(self, account):
+        """Same field order as the `accountInfo` getter, with None for the zero address."""
+        info = self.account_info.get(account, _EMPTY_INFO)
+        return (info.recipient, info.last_claim_week)
+
+    def pushable_rewards(self, week):
+        if week >= self.get_week():
+            return 0
+        if self.adjusted_global_weight_at(week) != 0:
+            return 0
+        return self.weekly_reward_amount.get(week, 0)
+
+    def compute_shares_at(self, account, week):
+        if week > self.get_week():
+            raise ModelRevert("Invalid week")
+        adj_acct_weight = self.adjusted_account_weight_at(account, week)
+        if adj_acct_weight == 0:
+            return 0
+        adj_global_weight = self.adjusted_global_weight_at(week)
+        if adj_global_weight == 0:
+            return 0
+        return adj_acct_weight * PRECISION // adj_global_weight
+
+    def adjusted_account_weight_at(self, account, week):
+        acct_weight = self.staker.get_account_weight_at(account, week)
+        if acct_weight == 0:
+            return 0
+        persistent = self.staker.get_account_weekly_to_realize(account, week + self.MAX_STAKE_GROWTH_WEEKS)[0]
+        return _sub(acct_weight, persistent)
+
+    def adjusted_global_weight_at(self, week):
+        global_weight = self.staker.get_global_weight_at(week)
+        if global_weight == 0:
+            return 0
+        persistent = self.staker.get_global_weekly_to_realize(week + self.MAX_STAKE_GROWTH_WEEKS)[0]
+        return _sub(global_weight, persistent)
+
+    def get_claimable(self, account):
+        start, end = self.get_suggested_claim_range(account)
+        return self._get_total_claimable_by_range(account, start, end)
+
+    def get_total_claimable_by_range(self, account, claim_start_week, claim_end_week):
+        current_week = self.get_week()
+        if claim_end_week >= current_week:
+            claim_end_week = _sub(current_week, 1)
+        return self._get_total_claimable_by_range(account, claim_start_week, claim_end_week)
+
+    def _get_total_claimable_by_range(self, account, claim_start_week, claim_end_week):
+        return sum(self._get_claimable_at(account, week) for week in range(claim_start_week, claim_end_week + 1))
+
+    def get_suggested_claim_range(self, account):
+        current_week = self.get_week()
+        if current_week == 0:
+            return (0, 0)
+        last_claim_week = self.account_info.get(account, _EMPTY_INFO).last_claim_week
+        claim_start_week = max(self.START_WEEK, last_claim_week)
+
+        # Like the contract, the forward search includes the current week.
+        while claim_start_week <= current_week:
+            if self._get_claimable_at(account, claim_start_week) > 0:
+                break
+            claim_start_week += 1
+        else:
+            return (0, 0)
+
+        claim_end_week = current_week - 1
+        while claim_end_week > claim_start_week:
+            if self._get_claimable_at(account, claim_end_week) > 0:
+                break
+            claim_end_week -= 1
+        return (claim_start_week, claim_end_week)
+
+    def get_claimable_at(self, account, week):
+        if week >= self.get_week():
+            return 0
+        return self._get_claimable_at(account, week)
+
+    def _get_claimable_at(self, account, week):
+        if week < self.account_info.get(account, _EMPTY_INFO).last_claim_week:
+            return 0
+        share = self.compute_shares_at(account, week)
+        return share * self.weekly_reward_amount.get(week, 0) // PRECISION
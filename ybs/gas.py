@@ -0,0 +1,178 @@
+"""
+    Predict the gas of user operations from state, without an RPC round trip.
+
+        model = GasModel.load("tests/benchmarks/gas_model.json")
+        model.predict("stake", staker_features(week, max_weeks, account_data, global_last_update_week))
+
+    Gas is linear in the number of storage writes and loop iterations a call makes, and
+    those follow from a few values a frontend already holds: how far the account and
+    the global checkpoints lag the current week, which pending weeks realize on the
+    way, and for claims how many weeks are scanned and how many of them were funded.
+    Each operation has its own coefficients, fitted by least squares to benchmark
+    receipts (`YBS_BENCHMARK=update` writes `gas_model.json` next to the baseline):
+
+        python -m ybs.gas fit tests/benchmarks/samples.json --out gas_model.json
+        python -m ybs.gas report gas_model.json samples.json
+
+    A sample is `{"op": ..., "features": {...}, "gas": gas_used}`.
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+CLAIM_FEATURES = ("claim_weeks", "funded_weeks", "lagged_weeks", "lag_iterations", "global_lag_iterations", "transfer")
+
+# Features each operation's gas depends on, besides a constant.
+OPS = {
+    "stake": ("account_weeks", "realizations", "global_weeks", "new_account"),
+    "unstake": ("account_weeks", "realizations", "global_weeks", "pending_weeks"),
+    "checkpointAccount": ("account_weeks", "realizations"),
+    "checkpointGlobal": ("global_weeks",),
+    "claim": CLAIM_FEATURES,
+    "claimWithRange": CLAIM_FEATURES,
+}
+
+
+def _popcount(value):
+    return bin(value).count("1")
+
+
+def staker_features(week, max_weeks, account_data, global_last_update_week=None):
+    """
+        Features for `stake`, `unstake` and `checkpointAccount` in `week`. `account_data`
+        is `accountData(account)`; `global_last_update_week` is None while the global
+        weight is zero (nothing to catch up).
+    """
+    realized, pending, last, bitmap = account_data
+    weeks = max(week - last, 0)
+    window = min(weeks, max_weeks)
+    # Bits at or past MAX_WEEK_BIT have already realized; the uint8 bitmap keeps them.
+    pending_bits = bitmap & ((1 << max_weeks) - 1)
+    realizations = _popcount(pending_bits >> (max_weeks - window)) if pending else 0
+    # Pending weeks still ahead after the checkpoint; unstake reads each of them.
+    shifted = (bitmap << window) & 0xFF if pending else bitmap
+    return {
+        "account_weeks": weeks if pending or realized else 0,
+        "realizations": realizations,
+        "global_weeks": 0 if global_last_update_week is None else max(week - global_last_update_week, 0),
+        "new_account": int(not (realized or pending)),
+        "pending_weeks": _popcount(shifted & ((1 << max_weeks) - 1)),
+    }
+
+
+def claim_features(start_week, end_week, max_weeks, account_data, global_last_update_week, reward_amounts):
+    """
+        Features for a claim of `start_week..end_week` (already clamped the way the
+        contract clamps it; pass an empty range when nothing is claimed).
+        `reward_amounts` is `weeklyRewardAmount` for each week of the range.
+    """
+    _, pending, last, bitmap = account_data
+    weeks = range(start_week, end_week + 1)
+    funded = sum(1 for amount in reward_amounts if amount > 0)
+    # Weights past the last checkpoint are projected in a loop that stops once the
+    # lowest pending week has realized.
+    lagged = [w for w in weeks if w > last] if pending else []
+    lowest = (bitmap & -bitmap).bit_length() - 1 if bitmap else 0
+    lag_iterations = sum(min(w - last, max_weeks - lowest) for w in lagged)
+    global_lag = 0 if global_last_update_week is None else sum(max(w - global_last_update_week, 0) for w in weeks)
+    return {
+        "claim_weeks": len(weeks),
+        "funded_weeks": funded,
+        "lagged_weeks": len(lagged),
+        "lag_iterations": lag_iterations,
+        "global_lag_iterations": global_lag,
+        "transfer": int(funded > 0),
+    }
+
+
+class GasModel:
+    def __init__(self, coefficients):
+        """`coefficients` maps op to `{"constant": c, feature: coefficient, ...}`."""
+        self.coefficients = coefficients
+
+    @classmethod
+    def load(cls, path):
+        return cls(json.loads(Path(path).read_text()))
+
+    def save(self, path):
+        Path(path).write_text(json.dumps(self.coefficients, indent=2, sort_keys=True) + "\n")
+
+    @classmethod
+    def fit(cls, samples):
+        """Least-squares fit of each op's coefficients to `samples`."""
+        by_op = {}
+        for sample in samples:
+            by_op.setdefault(sample["op"], []).append(sample)
+        coefficients = {}
+        for op, rows in sorted(by_op.items()):
+            names = OPS.get(op, ())
+            x = np.array([[1.0] + [float(r["features"].get(n, 0)) for n in names] for r in rows])
+            y = np.array([float(r["gas"]) for r in rows])
+            solution, *_ = np.linalg.lstsq(x, y, rcond=None)
+            coefficients[op] = {"constant": round(float(solution[0]), 3)}
+            coefficients[op].update((n, round(float(c), 3)) for n, c in zip(names, solution[1:]))
+        return cls(coefficients)
+
+    def predict(self, op, features):
+        c = self.coefficients[op]
+        gas = c["constant"]
+        for name, value in features.items():
+            gas += c.get(name, 0.0) * value
+        return int(round(gas))
+
+    def report(self, samples):
+        """
+            Prediction error against measured gas, per op: `{op: {"n", "mean_abs",
+            "max_abs", "mean_pct", "max_pct"}}`.
+        """
+        errors = {}
+        for sample in samples:
+            if sample["op"] in self.coefficients:
+                error = self.predict(sample["op"], sample["features"]) - sample["gas"]
+                errors.setdefault(sample["op"], []).append((abs(error), abs(error) / sample["gas"] * 100))
+        return {
+            op: {
+                "n": len(rows),
+                "mean_abs": sum(e for e, _ in rows) / len(rows),
+                "max_abs": max(e for e, _ in rows),
+                "mean_pct": sum(p for _, p in rows) / len(rows),
+                "max_pct": max(p for _, p in rows),
+            }
+            for op, rows in sorted(errors.items())
+        }
+
+
+def format_report(report):
+    lines = [f"{'op':<20} {'n':>5} {'mean abs':>10} {'max abs':>10} {'mean %':>8} {'max %':>8}"]
+    for op, r in report.items():
+        lines.append(
+            f"{op:<20} {r['n']:>5} {r['mean_abs']:>10,.0f} {r['max_abs']:>10,} {r['mean_pct']:>8.2f} {r['max_pct']:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    fit = commands.add_parser("fit", help="Fit coefficients to benchmark samples.")
+    fit.add_argument("samples")
+    fit.add_argument("--out", required=True)
+    report = commands.add_parser("report", help="Report a model's error against samples.")
+    report.add_argument("model")
+    report.add_argument("samples")
+    args = parser.parse_args()
+
+    samples = json.loads(Path(args.samples).read_text())
+    if args.command == "fit":
+        model = GasModel.fit(samples)
+        model.save(args.out)
+        print(f"Wrote {args.out}")
+    else:
+        model = GasModel.load(args.model)
+    print(format_report(model.report(samples)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+    Incremental event indexer into SQLite.
+
+        python -m ybs.indexer --rpc http://127.0.0.1:8545 --db ybs.sqlite --registry 0x... --start-block N --follow
+
+    Streams `Staked`, `Unstaked`, `RewardDeposited`, `RewardsClaimed`, `RewardPushed`,
+    `RecipientConfigured` and `NewDeployment` logs with `eth_getLogs` in block-range
+    batches. Stakers and distributors are discovered from their registry's
+    `NewDeployment` logs, or added directly with `add_contract`.
+
+    Only blocks at least `confirmations` deep are indexed. The hash of every block that
+    produced a log, and of the last block of every batch, is kept; each sync first
+    checks the newest of those against the node and, if it changed, rolls back every
+    row above the newest block that still matches before continuing. Each batch is
+    written in one transaction, so an interrupted run resumes from the last complete
+    batch.
+
+    Addresses are stored lowercase, weeks as INTEGER and other uints as decimal TEXT,
+    since they don't fit SQLite's 64-bit integers.
+"""
+import argparse
+import sqlite3
+import time
+
+from ybs.rpc import RPC, RPCError
+
+
+class Event:
+    def __init__(self, name, topic, table, indexed, data):
+        self.name = name
+        self.topic = topic
+        self.table = table
+        self.indexed = indexed  # [(column, kind)] from topics[1:]
+        self.data = data        # [(column, kind)] from the data words
+
+    @property
+    def columns(self):
+        return self.indexed + self.data
+
+
+EVENTS = [
+    # Staked(address indexed account, uint indexed week, uint amount, uint newUserWeight, uint weightAdded)
+    Event("Staked", "0x9cfd25589d1eb8ad71e342a86a8524e83522e3936c0803048c08f6d9ad974f40", "staked",
+          [("account", "address"), ("week", "week")],
+          [("amount", "uint"), ("new_user_weight", "uint"), ("weight_added", "uint")]),
+    # Unstaked(address indexed account, uint indexed week, uint amount, uint newUserWeight, uint weightRemoved)
+    Event("Unstaked", "0xdcfd2b4017d03f7e541021db793b2f9b31e4acdee005f789e52853c390e3e962", "unstaked",
+          [("account", "address"), ("week", "week")],
+          [("amount", "uint"), ("new_user_weight", "uint"), ("weight_removed", "uint")]),
+    # RewardDeposited(uint indexed week, address indexed depositor, uint rewardAmount)
+    Event("RewardDeposited", "0x4e3c672324bfa4c8193ded7cce75b1e608180241cf3d89ca45bc08101f3594b3", "reward_deposited",
+          [("week", "week"), ("depositor", "address")],
+          [("reward_amount", "uint")]),
+    # RewardsClaimed(address indexed account, uint indexed week, uint rewardAmount)
+    Event("RewardsClaimed", "0xdacbdde355ba930696a362ea6738feb9f8bd52dfb3d81947558fd3217e23e325", "rewards_claimed",
+          [("account", "address"), ("week", "week")],
+          [("reward_amount", "uint")]),
+    # RewardPushed(uint indexed fromWeek, uint indexed toWeek, uint amount)
+    Event("RewardPushed", "0x87fed1526492187eb815d549aa57942a31b68987639b4703148b85f5a877a24d", "reward_pushed",
+          [("from_week", "week"), ("to_week", "week")],
+          [("amount", "uint")]),
+    # RecipientConfigured(address indexed account, address indexed recipient)
+    Event("RecipientConfigured", "0xaa5fe307c4032d125234ac8d9407bec1dd055f9b536fefb4e299a188b2553e7b", "recipient_configured",
+          [("account", "address"), ("recipient", "address")],
+          []),
+    # NewDeployment(address indexed yearnBoostedStaker, address indexed rewardDistributor, address indexed utilities)
+    Event("NewDeployment", "0x5805c1ddf3f17ada490421c81320be2220d7d2c4a1c3560b376a71d92141d0fc", "new_deployment",
+          [("yearn_boosted_staker", "address"), ("reward_distributor", "address"), ("utilities", "address")],
+          []),
+]
+EVENTS_BY_TOPIC = {e.topic: e for e in EVENTS}
+EVENTS_BY_NAME = {e.name: e for e in EVENTS}
+
+SQL_TYPES = {"address": "TEXT", "week": "INTEGER", "uint": "TEXT"}
+
+
+def _decode(kind, word):
+    if kind == "address":
+        return "0x" + word[-40:].lower()
+    value = int(word, 16)
+    return value if kind == "week" else str(value)
+
+
+def _schema():
+    statements = [
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS blocks (number INTEGER PRIMARY KEY, hash TEXT NOT NULL)",
+        """CREATE TABLE IF NOT EXISTS contracts (
+            address TEXT PRIMARY KEY, kind TEXT NOT NULL, added_block INTEGER
+        )""",
+    ]
+    for event in EVENTS:
+        columns = "".join(f", {name} {SQL_TYPES[kind]} NOT NULL" for name, kind in event.columns)
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {event.table} ("
+            "block_number INTEGER NOT NULL, log_index INTEGER NOT NULL, "
+            f"tx_hash TEXT NOT NULL, contract TEXT NOT NULL{columns}, "
+            "PRIMARY KEY (block_number, log_index))"
+        )
+        for name, kind in event.indexed:
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS {event.table}_{name} ON {event.table} (contract, {name})"
+            )
+    return statements
+
+
+class Indexer:
+    def __init__(self, rpc, path, start_block=0, confirmations=12, batch_size=2_000):
+        self.rpc = rpc
+        self.confirmations = confirmations
+        self.batch_size = batch_size
+        self.db = sqlite3.connect(path)
+        with self.db:
+            for statement in _schema():
+                self.db.execute(statement)
+            self.db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('start_block', ?)", (str(start_block),))
+            self.db.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('last_block', ?)", (str(start_block - 1),)
+            )
+
+    def close(self):
+        self.db.close()
+
+    def _meta(self, key):
+        return int(self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0])
+
+    @property
+    def start_block(self):
+        return self._meta("start_block")
+
+    @property
+    def last_block(self):
+        """The last block fully indexed."""
+        return self._meta("last_block")
+
+    def add_contract(self, address, kind):
+        """Track `address` ("registry", "staker" or "rewards") from the next block indexed onwards."""
+        with self.db:
+            self._add_contract(address, kind, None)
+
+    def _add_contract(self, address, kind, block):
+        """Returns whether `address` is new. Contracts added by hand (`block` None) survive rollbacks."""
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO contracts (address, kind, added_block) VALUES (?, ?, ?)",
+            (address.lower(), kind, block),
+        )
+        return cursor.rowcount == 1
+
+    def contracts(self, kind=None):
+        if kind is None:
+            rows = self.db.execute("SELECT address FROM contracts ORDER BY address")
+        else:
+            rows = self.db.execute("SELECT address FROM contracts WHERE kind = ? ORDER BY address", (kind,))
+        return [address for (address,) in rows]
+
+    def events(self, name, **where):
+        """Rows of event `name` as dicts in chain order, uints as ints. `where` filters on columns."""
+        event = EVENTS_BY_NAME[name]
+        clause = " AND ".join(f"{column} = ?" for column in where)
+        values = [v.lower() if isinstance(v, str) else v for v in where.values()]
+        cursor = self.db.execute(
+            f"SELECT * FROM {event.table}{' WHERE ' + clause if clause else ''} ORDER BY block_number, log_index",
+            values,
+        )
+        names = [d[0] for d in cursor.description]
+        kinds = dict(event.columns)
+        return [
+            {n: int(v) if kinds.get(n) == "uint" else v for n, v in zip(names, row)}
+            for row in cursor
+        ]
+
+    # Syncing
+
+    def sync(self, to_block=None):
+        """Index up to `to_block` (default: the newest confirmed block). Returns the last block indexed."""
+        self.rollback_reorgs()
+        target = int(self.rpc.call("eth_blockNumber"), 16) - self.confirmations
+        if to_block is not None:
+            target = min(target, to_block)
+        start = self.last_block + 1
+        while start <= target:
+            end = min(start + self.batch_size - 1, target)
+            self._index_range(start, end)
+            start = end + 1
+        return self.last_block
+
+    def follow(self, interval=12):
+        while True:
+            self.sync()
+            time.sleep(interval)
+
+    def rollback_reorgs(self):
+        """
+            Drop everything above the newest recorded block whose hash still matches the
+            node. Returns that block number, or None if nothing changed.
+        """
+        stored = self.db.execute("SELECT number, hash FROM blocks ORDER BY number DESC").fetchall()
+        if not stored or self._block_hash(stored[0][0]) == stored[0][1]:
+            return None
+        ancestor = self.start_block - 1
+        for number, block_hash in stored[1:]:
+            if self._block_hash(number) == block_hash:
+                ancestor = number
+                break
+
+        with self.db:
+            for event in EVENTS:
+                self.db.execute(f"DELETE FROM {event.table} WHERE block_number > ?", (ancestor,))
+            self.db.execute("DELETE FROM blocks WHERE number > ?", (ancestor,))
+            self.db.execute("DELETE FROM contracts WHERE added_block > ?", (ancestor,))
+            self._set_last_block(ancestor)
+        return ancestor
+
+    def _block_hash(self, number):
+        block = self.rpc.call("eth_getBlockByNumber", hex(number), False)
+        return None if block is None else block["hash"]
+
+    def _set_last_block(self, number):
+        self.db.execute("UPDATE meta SET value = ? WHERE key = 'last_block'", (str(number),))
+
+    def _get_logs(self, addresses, start, end):
+        """`eth_getLogs` for `addresses`, halving the range when the node refuses it."""
+        if not addresses:
+            return []
+        try:
+            return self.rpc.call("eth_getLogs", {
+                "fromBlock": hex(start),
+                "toBlock": hex(end),
+                "address": addresses,
+                "topics": [[e.topic for e in EVENTS]],
+            })
+        except RPCError:
+            if start == end:
+                raise
+            middle = (start + end) // 2
+            return self._get_logs(addresses, start, middle) + self._get_logs(addresses, middle + 1, end)
+
+    def _index_range(self, start, end):
+        end_hash = self._block_hash(end)
+        with self.db:
+            addresses = self.contracts()
+            while addresses:
+                # Contracts found in this range are fetched again over the same range.
+                addresses = self._store(self._get_logs(addresses, start, end))
+            self.db.execute("INSERT OR REPLACE INTO blocks (number, hash) VALUES (?, ?)", (end, end_hash))
+            self._set_last_block(end)
+
+    def _store(self, logs):
+        """Insert `logs` and return the addresses of any newly discovered contracts."""
+        discovered = []
+        for log in logs:
+            if log.get("removed"):
+                continue
+            event = EVENTS_BY_TOPIC.get(log["topics"][0])
+            if event is None:
+                continue
+            block = int(log["blockNumber"], 16)
+            data = log["data"][2:]
+            words = [data[i:i + 64] for i in range(0, len(data), 64)]
+            values = [_decode(kind, word) for (_, kind), word in zip(event.indexed, log["topics"][1:])]
+            values += [_decode(kind, word) for (_, kind), word in zip(event.data, words)]
+            columns = ", ".join(["block_number", "log_index", "tx_hash", "contract"] + [n for n, _ in event.columns])
+            self.db.execute(
+                f"INSERT OR REPLACE INTO {event.table} ({columns}) VALUES ({', '.join('?' * (4 + len(values)))})",
+                [block, int(log["logIndex"], 16), log["transactionHash"], log["address"].lower()] + values,
+            )
+            self.db.execute("INSERT OR REPLACE INTO blocks (number, hash) VALUES (?, ?)", (block, log["blockHash"]))
+
+            if event.name == "NewDeployment":
+                staker, rewards = values[0], values[1]
+                for address, kind in ((staker, "staker"), (rewards, "rewards")):
+                    if self._add_contract(address, kind, block):
+                        discovered.append(address)
+        return discovered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpc", default="http://127.0.0.1:8545")
+    parser.add_argument("--db", default="ybs.sqlite")
+    parser.add_argument("--registry", action="append", default=[], help="Registry to discover deployments from.")
+    parser.add_argument("--staker", action="append", default=[])
+    parser.add_argument("--rewards", action="append", default=[])
+    parser.add_argument("--start-block", type=int, default=0)
+    parser.add_argument("--confirmations", type=int, default=12)
+    parser.add_argument("--batch-size", type=int, default=2_000)
+    parser.add_argument("--follow", action="store_true", help="Keep polling for new blocks.")
+    parser.add_argument("--interval", type=float, default=12)
+    args = parser.parse_args()
+
+    indexer = Indexer(RPC(args.rpc), args.db, args.start_block, args.confirmations, args.batch_size)
+    for kind, addresses in (("registry", args.registry), ("staker", args.staker), ("rewards", args.rewards)):
+        for address in addresses:
+            indexer.add_contract(address, kind)
+    if args.follow:
+        indexer.follow(args.interval)
+    else:
+        print(f"Indexed up to block {indexer.sync()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+    Keep account and global checkpoints close to the current week.
+
+        python -m ybs.keeper --staker 0x... --db ybs.sqlite --budget 5000000 --blocks 3
+        python -m ybs.keeper --staker 0x... --db ybs.sqlite --budget 5000000 --send --sender 0x...
+
+    Every week an account or the global state goes without a checkpoint is a weight
+    written later by whoever interacts next, at about 22k gas a week; a year behind
+    and a single `stake` no longer fits comfortably in a block. The keeper reads
+    `accountData` for every known staker (from `ybs.indexer` or a list) and schedules
+    `checkpointGlobal` and `checkpointAccountWithLimit` calls into blocks of at most
+    `budget` gas, largest saving first. The saving of a checkpoint is the lag-dependent
+    part of its cost, which the next interaction no longer pays. A checkpoint that
+    doesn't fit the block's remaining budget is cut short with a week limit and
+    finished in a later block. The global checkpoint has no limited form, so one that
+    alone exceeds the budget is left out.
+
+    Costs come from a calibrated `ybs.gas.GasModel` when given, otherwise from
+    storage prices, which overestimate slightly.
+"""
+import argparse
+import time
+from dataclasses import dataclass
+
+from ybs.abi import (
+    ACCOUNT_DATA,
+    CHECKPOINT_ACCOUNT_WITH_LIMIT,
+    CHECKPOINT_GLOBAL,
+    GET_GLOBAL_WEIGHT_AT,
+    GET_WEEK,
+    GLOBAL_LAST_UPDATE_WEEK,
+    MAX_STAKE_GROWTH_WEEKS,
+    decode,
+    encode_call,
+)
+from ybs.gas import GasModel, staker_features
+
+# Without a model: a new weight is a zero-to-nonzero SSTORE (22,100), a realized week
+# adds a cold SLOAD (2,100) and the global catch-up also reads `globalWeeklyToRealize`,
+# each with some loop overhead. The fixed part covers the intrinsic 21,000, the
+# delegatecall and the slots read and written once.
+FALLBACK_BASE = 40_000
+FALLBACK_ACCOUNT_WEEK = 22_500
+FALLBACK_REALIZATION = 2_400
+FALLBACK_GLOBAL_WEEK = 24_600
+
+
+class CheckpointReverted(Exception):
+    def __init__(self, failed, receipts):
+        self.failed = failed        # [(Checkpoint, receipt)]
+        self.receipts = receipts    # every receipt so far, grouped by block
+        targets = ", ".join(
+            f"{'global' if c.kind == 'global' else c.account} ({r['transactionHash']})" for c, r in failed
+        )
+        super().__init__(f"{len(failed)} checkpoint(s) reverted: {targets}")
+
+
+@dataclass
+class Checkpoint:
+    kind: str           # "account" or "global"
+    account: str = None
+    week: int = None    # week checkpointed up to
+    gas: int = 0        # estimated gas used
+    saved: int = 0      # estimated gas taken off the next interaction
+
+    def calldata(self):
+        if self.kind == "global":
+            return CHECKPOINT_GLOBAL
+        return encode_call(CHECKPOINT_ACCOUNT_WITH_LIMIT, ["address", "uint"], [self.account, self.week])
+
+
+def accounts_from_indexer(indexer, staker):
+    """Every account that has staked into `staker`, in order of first stake."""
+    return list(dict.fromkeys(e["account"] for e in indexer.events("Staked", contract=staker.lower())))
+
+
+class Keeper:
+    def __init__(self, rpc, staker, model=None, block="latest"):
+        self.rpc = rpc
+        self.staker = staker.lower()
+        self.model = model
+        self.block = block if isinstance(block, str) else hex(block)
+        self.week = None
+        self.max_weeks = None
+        self.global_last_update_week = None  # None while the global weight is zero
+        self.account_data = {}
+
+    def _call(self, selector, kinds=(), args=()):
+        return {"to": self.staker, "data": encode_call(selector, kinds, args)}, self.block
+
+    def read_state(self, accounts, batch_size=500):
+        """Read the week, the global checkpoint and `accountData` of `accounts`."""
+        week, max_weeks, global_last = self.rpc.batch([
+            ("eth_call", self._call(GET_WEEK)),
+            ("eth_call", self._call(MAX_STAKE_GROWTH_WEEKS)),
+            ("eth_call", self._call(GLOBAL_LAST_UPDATE_WEEK)),
+        ])
+        self.week, self.max_weeks = decode(["uint"], week), decode(["uint"], max_weeks)
+        global_last = decode(["uint"], global_last)
+        weight = decode(["uint"], self.rpc.call("eth_call", *self._call(GET_GLOBAL_WEIGHT_AT, ["uint"], [global_last])))
+        self.global_last_update_week = global_last if weight else None
+
+        self.account_data = {}
+        accounts = [a.lower() for a in accounts]
+        for first in range(0, len(accounts), batch_size):
+            chunk = accounts[first:first + batch_size]
+            results = self.rpc.batch([("eth_call", self._call(ACCOUNT_DATA, ["address"], [a])) for a in chunk])
+            self.account_data.update((a, decode(["uint"] * 4, r)) for a, r in zip(chunk, results))
+
+    def lagged(self, min_weeks=1):
+        """`(account, weeks behind)` for staked accounts at least `min_weeks` behind, most lagged first."""
+        rows = [
+            (account, self.week - data[2])
+            for account, data in self.account_data.items()
+            if (data[0] or data[1]) and self.week - data[2] >= min_weeks
+        ]
+        return sorted(rows, key=lambda row: (-row[1], row[0]))
+
+    # Costs
+
+    def _estimate(self, op, features, fallback):
+        if self.model is None:
+            return FALLBACK_BASE + fallback, fallback
+        gas = self.model.predict(op, features)
+        return gas, gas - int(round(self.model.coefficients[op]["constant"]))
+
+    def _account_checkpoint(self, account, week):
+        features = staker_features(week, self.max_weeks, self.account_data[account])
+        fallback = features["account_weeks"] * FALLBACK_ACCOUNT_WEEK + features["realizations"] * FALLBACK_REALIZATION
+        gas, saved = self._estimate("checkpointAccount", features, fallback)
+        return Checkpoint("account", account, week, gas, saved)
+
+    def _global_checkpoint(self):
+        weeks = self.week - self.global_last_update_week
+        features = {"global_weeks": weeks}
+        gas, saved = self._estimate("checkpointGlobal", features, weeks * FALLBACK_GLOBAL_WEEK)
+        return Checkpoint("global", week=self.week, gas=gas, saved=saved)
+
+    def _fit(self, checkpoint, budget):
+        """The furthest partial account checkpoint costing at most `budget`, or None."""
+        if checkpoint.kind == "global":
+            return None  # there's no limited global checkpoint
+        last = self.account_data[checkpoint.account][2]
+        lo, hi, best = last + 1, checkpoint.week - 1, None
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            partial = self._account_checkpoint(checkpoint.account, mid)
+            if partial.gas <= budget:
+                best, lo = partial, mid + 1
+            else:
+                hi = mid - 1
+        return best
+
+    def _apply(self, checkpoint):
+        """Update the state read as if `checkpoint` had been mined."""
+        if checkpoint.kind == "global":
+            self.global_last_update_week = checkpoint.week
+            return
+        realized, pending, last, bitmap = self.account_data[checkpoint.account]
+        if pending:
+            bitmap = (bitmap << min(checkpoint.week - last, self.max_weeks)) & 0xFF
+            if not bitmap & ((1 << self.max_weeks) - 1):
+                realized, pending = realized + pending, 0
+        self.account_data[checkpoint.account] = (realized, pending, checkpoint.week, bitmap)
+
+    # Scheduling
+
+    def plan(self, budget, blocks=None, min_weeks=1):
+        """
+            Greedily fill up to `blocks` blocks (default: until nothing is left) with
+            checkpoints, each block's estimated gas at most `budget`. Returns a list of
+            blocks, each a list of `Checkpoint`s. The state read is advanced as
+            checkpoints are scheduled; call `read_state` again before re-planning.
+        """
+        schedule = []
+        while blocks is None or len(schedule) < blocks:
+            candidates = [self._account_checkpoint(a, self.week) for a, _ in self.lagged(min_weeks)]
+            if self.global_last_update_week is not None and self.week - self.global_last_update_week >= min_weeks:
+                candidates.append(self._global_checkpoint())
+            candidates.sort(key=lambda c: -c.saved)
+
+            remaining, block = budget, []
+            for checkpoint in candidates:
+                if checkpoint.gas > remaining:
+                    checkpoint = self._fit(checkpoint, remaining)
+                    if checkpoint is None:
+                        continue
+                block.append(checkpoint)
+                remaining -= checkpoint.gas
+                self._apply(checkpoint)
+            if not block:
+                break
+            schedule.append(block)
+        return schedule
+
+    def send(self, schedule, sender, poll_interval=1.0):
+        """
+            Send each planned block's checkpoints from `sender` (an account the node
+            can sign for), waiting for them to be mined before sending the next block.
+            Returns the receipts, grouped like `schedule`. Raises `CheckpointReverted`
+            as soon as a block has a reverted checkpoint, since later blocks were
+            planned assuming it went through.
+        """
+        receipts = []
+        for block in schedule:
+            hashes = [
+                self.rpc.call("eth_sendTransaction", {"from": sender, "to": self.staker, "data": c.calldata()})
+                for c in block
+            ]
+            mined = []
+            for tx_hash in hashes:
+                receipt = self.rpc.call("eth_getTransactionReceipt", tx_hash)
+                while receipt is None:
+                    time.sleep(poll_interval)
+                    receipt = self.rpc.call("eth_getTransactionReceipt", tx_hash)
+                mined.append(receipt)
+            receipts.append(mined)
+            failed = [(c, r) for c, r in zip(block, mined) if int(r["status"], 16) != 1]
+            if failed:
+                raise CheckpointReverted(failed, receipts)
+        return receipts
+
+
+def main():
+    from ybs.indexer import Indexer
+    from ybs.rpc import RPC
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--staker", required=True)
+    parser.add_argument("--rpc", default="http://127.0.0.1:8545")
+    parser.add_argument("--db", help="Database written by ybs.indexer, to find accounts.")
+    parser.add_argument("--accounts", help="File with one account per line, instead of --db.")
+    parser.add_argument("--budget", type=int, default=5_000_000, help="Gas per block.")
+    parser.add_argument("--blocks", type=int, help="Plan at most this many blocks.")
+    parser.add_argument("--min-weeks", type=int, default=1)
+    parser.add_argument("--model", help="gas_model.json from the benchmarks.")
+    parser.add_argument("--send", action="store_true")
+    parser.add_argument("--sender")
+    args = parser.parse_args()
+
+    if args.accounts:
+        with open(args.accounts) as f:
+            accounts = f.read().split()
+    elif args.db:
+        accounts = accounts_from_indexer(Indexer(None, args.db), args.staker)
+    else:
+        parser.error("one of --db or --accounts is required")
+    if args.send and not args.sender:
+        parser.error("--send needs --sender")
+
+    rpc = RPC(args.rpc)
+    keeper = Keeper(rpc, args.staker, GasModel.load(args.model) if args.model else None)
+    keeper.read_state(accounts)
+    lagged = keeper.lagged(args.min_weeks)
+    print(f"Week {keeper.week}: {len(lagged):,} of {len(accounts):,} accounts lag, most by {lagged[0][1] if lagged else 0} weeks")
+    schedule = keeper.plan(args.budget, args.blocks, args.min_weeks)
+    for i, block in enumerate(schedule):
+        print(f"Block {i}: {len(block)} checkpoints, ~{sum(c.gas for c in block):,} gas, saves ~{sum(c.saved for c in block):,}")
+        for c in block:
+            target = "global" if c.kind == "global" else c.account
+            print(f"  {target} to week {c.week}: ~{c.gas:,} gas")
+    if args.send:
+        for i, receipts in enumerate(keeper.send(schedule, args.sender)):
+            print(f"Block {i}: {sum(int(r['gasUsed'], 16) for r in receipts):,} gas used")
+
+
+if __name__ == "__main__":
+    main()
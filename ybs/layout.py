@@ -0,0 +1,69 @@
+"""
+    Storage slot decoding from solc's `storageLayout` output.
+
+    Mapping and dynamic array slots are keccak hashes, so they can only be named given
+    the hash preimages seen while executing (see `ybs.trace`). A mapping value at
+    `keccak(key . slot)` resolves to the variable at `slot` plus the key; nested
+    mappings and struct members resolve recursively.
+"""
+from dataclasses import dataclass, field
+
+# Largest struct member offset tried when a slot is not itself a known hash.
+MAX_STRUCT_SLOTS = 8
+
+
+@dataclass
+class SlotName:
+    variable: str
+    keys: list = field(default_factory=list)
+    member: int = 0
+
+    def __str__(self):
+        keys = "".join(f"[{k}]" for k in self.keys)
+        member = f"+{self.member}" if self.member else ""
+        return f"{self.variable}{keys}{member}"
+
+
+class StorageLayout:
+    def __init__(self, storage_layout):
+        self.variables = {}
+        for var in storage_layout.get("storage", []):
+            self.variables.setdefault(int(var["slot"]), []).append(var["label"])
+
+    @classmethod
+    def empty(cls):
+        return cls({})
+
+    def name(self, slot, preimages):
+        """
+            Name a slot given `preimages`, a dict of hash -> preimage bytes.
+            Returns a `SlotName`, with variable "?" when the slot can't be resolved.
+        """
+        for member in range(MAX_STRUCT_SLOTS):
+            base = slot - member
+            if base < 0:
+                break
+            if base in self.variables and not member:
+                return SlotName("/".join(self.variables[base]))
+            preimage = preimages.get(base)
+            if preimage is None:
+                continue
+            if len(preimage) == 64:
+                # Mapping value: keccak(key . slot)
+                key, parent = preimage[:32], int.from_bytes(preimage[32:], "big")
+                name = self.name(parent, preimages)
+                return SlotName(name.variable, name.keys + [_format_key(key)], member)
+            if len(preimage) == 32:
+                # Dynamic array data starts at keccak(slot).
+                name = self.name(int.from_bytes(preimage, "big"), preimages)
+                return SlotName(name.variable + "[]", name.keys, member)
+        return SlotName("?")
+
+
+def _format_key(key):
+    value = int.from_bytes(key, "big")
+    if value < 2**32:
+        return str(value)
+    if value < 2**160:
+        return "0x" + key[12:].hex()
+    return "0x" + key.hex()
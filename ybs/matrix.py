@@ -0,0 +1,293 @@
+"""
+    On-disk, memory-mapped week × account weight matrix for one deployment.
+
+    Layout of a matrix directory:
+
+        meta.json                      config and the number of complete weeks
+        accounts.txt                   one address per line; line i is account index i
+        weight.lo / weight.hi          account weight at each week
+        weight_persistent.lo / .hi     account weightPersistent excluded from that week's rewards
+        global_weight.lo / .hi         global weight at each week
+        global_weight_persistent.lo / .hi
+        reward_amount.lo / .hi         weeklyRewardAmount of that week
+
+    Values are unsigned 128-bit, stored as little-endian uint64 low and high limbs in
+    separate files; every weight the contracts produce fits. Account columns are
+    week-major with a fixed row width of `capacity` accounts, so appending a week
+    appends one row to each file and `column()` returns zero-copy `(weeks, accounts)`
+    memmap views. Adding accounts beyond `capacity` rewrites the files at double the
+    width.
+
+    Row `w` holds week `start_week + w`. "Persistent" columns are keyed by the week
+    whose adjusted weight they reduce, i.e. `accountWeeklyToRealize(account,
+    week + MAX_STAKE_GROWTH_WEEKS).weightPersistent`, so adjusted weight is
+    `weight - weight_persistent` on the same row, computed on the limbs without
+    leaving uint64. Only `to_int()` builds Python ints; that is exact but runs at
+    Python-object speed, so convert as little as the caller needs.
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+ACCOUNT_COLUMNS = ("weight", "weight_persistent")
+GLOBAL_COLUMNS = ("global_weight", "global_weight_persistent", "reward_amount")
+LIMB = np.dtype("<u8")
+_MASK = 2**64 - 1
+
+
+def split(values):
+    """Python ints (any shape) to (lo, hi) uint64 arrays."""
+    values = np.asarray(values, dtype=object)
+    if values.size and (values.min() < 0 or values.max() >> 128):
+        raise ValueError("value out of uint128 range")
+    lo = (values & _MASK).astype(np.uint64)
+    hi = (values >> 64).astype(np.uint64)
+    return lo, hi
+
+
+def join(lo, hi):
+    """(lo, hi) uint64 arrays to an object array of Python ints."""
+    return (np.asarray(hi).astype(object) << 64) | np.asarray(lo).astype(object)
+
+
+class U128:
+    """A (lo, hi) pair of equally shaped uint64 arrays, sliced together."""
+
+    def __init__(self, lo, hi):
+        self.lo = lo
+        self.hi = hi
+
+    @property
+    def shape(self):
+        return self.lo.shape
+
+    def __getitem__(self, key):
+        return U128(self.lo[key], self.hi[key])
+
+    def to_int(self):
+        """Exact values as Python ints (an object array, or an int for a scalar)."""
+        values = join(self.lo, self.hi)
+        # Arithmetic on 0-d object arrays already gives back the Python int.
+        return int(values) if np.ndim(values) == 0 else values
+
+    def to_float(self):
+        return self.hi.astype(np.float64) * 2.0**64 + self.lo.astype(np.float64)
+
+    def __sub__(self, other):
+        """Exact `self - other`, subtracting the limbs with borrow. Raises on underflow."""
+        lo, other_lo = np.asarray(self.lo), np.asarray(other.lo)
+        hi, other_hi = np.asarray(self.hi), np.asarray(other.hi)
+        borrow = lo < other_lo
+        if np.any((hi < other_hi) | ((hi == other_hi) & borrow)):
+            raise ValueError("uint128 subtraction underflow")
+        # uint64 ufuncs wrap around, which is the borrow already accounted for.
+        return U128(
+            np.subtract(lo, other_lo),
+            np.subtract(np.subtract(hi, other_hi), np.asarray(borrow, dtype=LIMB)),
+        )
+
+    def sum(self, axis=None):
+        """
+            Exact sum as Python int(s). Limbs are summed in 32-bit halves with uint64
+            accumulators, which can't overflow below 2**32 terms.
+        """
+        low, shift = np.uint64(0xFFFFFFFF), np.uint64(32)
+        parts = (self.lo & low, self.lo >> shift, self.hi & low, self.hi >> shift)
+        total = sum(
+            np.asarray(part.sum(axis=axis, dtype=np.uint64)).astype(object) << (32 * i)
+            for i, part in enumerate(parts)
+        )
+        return int(total) if np.ndim(total) == 0 else total
+
+
+class WeightMatrix:
+    def __init__(self, path, mode="r"):
+        """Open an existing matrix; `mode` "r" maps read-only, "r+" allows appending."""
+        self.path = Path(path)
+        self.mode = mode
+        meta = json.loads((self.path / "meta.json").read_text())
+        self.MAX_STAKE_GROWTH_WEEKS = meta["max_stake_growth_weeks"]
+        self.start_week = meta["start_week"]
+        self.weeks = meta["weeks"]
+        self.capacity = meta["capacity"]
+        self.staker = meta.get("staker")
+        accounts = (self.path / "accounts.txt").read_text().split()
+        self.accounts = accounts[:meta["n_accounts"]]
+        self._index = {a: i for i, a in enumerate(self.accounts)}
+        self._maps = {}
+
+    @classmethod
+    def create(cls, path, max_stake_growth_weeks, start_week, staker=None, capacity=1024):
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        if (path / "meta.json").exists():
+            raise FileExistsError(path / "meta.json")
+        for name in ACCOUNT_COLUMNS + GLOBAL_COLUMNS:
+            for limb in ("lo", "hi"):
+                (path / f"{name}.{limb}").write_bytes(b"")
+        (path / "accounts.txt").write_text("")
+        _write_meta(path, {
+            "max_stake_growth_weeks": max_stake_growth_weeks,
+            "start_week": start_week,
+            "staker": staker,
+            "weeks": 0,
+            "n_accounts": 0,
+            "capacity": capacity,
+        })
+        return cls(path, "r+")
+
+    @property
+    def n_accounts(self):
+        return len(self.accounts)
+
+    @property
+    def end_week(self):
+        """One past the last week stored."""
+        return self.start_week + self.weeks
+
+    def account_index(self, account):
+        return self._index[account]
+
+    def row(self, week):
+        if not self.start_week <= week < self.end_week:
+            raise IndexError(f"week {week} not in [{self.start_week}, {self.end_week})")
+        return week - self.start_week
+
+    # Reading
+
+    def _map(self, name, limb):
+        key = (name, limb)
+        if key not in self._maps:
+            file = self.path / f"{name}.{limb}"
+            width = self.capacity if name in ACCOUNT_COLUMNS else 1
+            if self.weeks == 0:
+                self._maps[key] = np.zeros((0, width), dtype=LIMB)
+            else:
+                self._maps[key] = np.memmap(file, dtype=LIMB, mode="r", shape=(self.weeks, width))
+        return self._maps[key]
+
+    def column(self, name):
+        """
+            `(weeks, n_accounts)` view of an account column, or `(weeks,)` of a global
+            one, as `U128`. Slicing it reads only the pages touched.
+        """
+        if name in ACCOUNT_COLUMNS:
+            return U128(self._map(name, "lo")[:, :self.n_accounts], self._map(name, "hi")[:, :self.n_accounts])
+        if name in GLOBAL_COLUMNS:
+            return U128(self._map(name, "lo")[:, 0], self._map(name, "hi")[:, 0])
+        raise KeyError(name)
+
+    def adjusted_weight(self, weeks=slice(None), accounts=slice(None)):
+        """`weight - weight_persistent` as a `U128`, for the given rows and accounts."""
+        return self.column("weight")[weeks, accounts] - self.column("weight_persistent")[weeks, accounts]
+
+    def adjusted_global_weight(self, weeks=slice(None)):
+        return self.column("global_weight")[weeks] - self.column("global_weight_persistent")[weeks]
+
+    # Writing
+
+    def add_accounts(self, accounts):
+        """Register new accounts, returning the index of each (existing ones keep theirs)."""
+        self._require_writable()
+        new = [a for a in dict.fromkeys(accounts) if a not in self._index]
+        if new:
+            if self.n_accounts + len(new) > self.capacity:
+                capacity = self.capacity
+                while capacity < self.n_accounts + len(new):
+                    capacity *= 2
+                self._resize(capacity)
+            with open(self.path / "accounts.txt", "a") as f:
+                f.write("".join(f"{a}\n" for a in new))
+            for a in new:
+                self._index[a] = len(self.accounts)
+                self.accounts.append(a)
+            self._save_meta()
+        return [self._index[a] for a in accounts]
+
+    def append_week(self, weight, weight_persistent, global_weight, global_weight_persistent, reward_amount):
+        """
+            Append the next week. Account columns are sequences of ints (or a `U128`)
+            indexed like `accounts`; accounts past the end of a column are zero.
+        """
+        self._require_writable()
+        for name, values in (("weight", weight), ("weight_persistent", weight_persistent)):
+            lo, hi = (values.lo, values.hi) if isinstance(values, U128) else split(list(values))
+            if len(lo) > self.n_accounts:
+                raise ValueError(f"{name} has more values than accounts")
+            for limb, data in (("lo", lo), ("hi", hi)):
+                row = np.zeros(self.capacity, dtype=LIMB)
+                row[:len(data)] = data
+                self._append(name, limb, row)
+        for name, value in (
+            ("global_weight", global_weight),
+            ("global_weight_persistent", global_weight_persistent),
+            ("reward_amount", reward_amount),
+        ):
+            lo, hi = split([value])
+            self._append(name, "lo", lo)
+            self._append(name, "hi", hi)
+        self.weeks += 1
+        self._maps.clear()
+        self._save_meta()
+
+    def _append(self, name, limb, data):
+        # Truncate first: a previous append may have stopped before its meta.json update.
+        file = self.path / f"{name}.{limb}"
+        width = self.capacity if name in ACCOUNT_COLUMNS else 1
+        with open(file, "r+b") as f:
+            f.truncate(self.weeks * width * LIMB.itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(np.ascontiguousarray(data, dtype=LIMB).tobytes())
+
+    def _resize(self, capacity):
+        for name in ACCOUNT_COLUMNS:
+            for limb in ("lo", "hi"):
+                old = self._map(name, limb)
+                new = np.zeros((self.weeks, capacity), dtype=LIMB)
+                new[:, :self.capacity] = old
+                self._maps.pop((name, limb))
+                del old
+                tmp = self.path / f"{name}.{limb}.tmp"
+                tmp.write_bytes(new.tobytes())
+                os.replace(tmp, self.path / f"{name}.{limb}")
+        self.capacity = capacity
+        self._save_meta()
+
+    def _save_meta(self):
+        _write_meta(self.path, {
+            "max_stake_growth_weeks": self.MAX_STAKE_GROWTH_WEEKS,
+            "start_week": self.start_week,
+            "staker": self.staker,
+            "weeks": self.weeks,
+            "n_accounts": self.n_accounts,
+            "capacity": self.capacity,
+        })
+
+    def _require_writable(self):
+        if self.mode != "r+":
+            raise PermissionError("matrix opened read-only")
+
+
+def _write_meta(path, meta):
+    tmp = path / "meta.json.tmp"
+    tmp.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp, path / "meta.json")
+
+
+def append_from_models(matrix, staker, distributor, accounts, end_week):
+    """
+        Append weeks up to (excluding) `end_week` using the `ybs.staker` and
+        `ybs.distributor` models, registering `accounts` first.
+    """
+    matrix.add_accounts(accounts)
+    max_weeks = matrix.MAX_STAKE_GROWTH_WEEKS
+    for week in range(matrix.end_week, end_week):
+        matrix.append_week(
+            [staker.get_account_weight_at(a, week) for a in matrix.accounts],
+            [staker.get_account_weekly_to_realize(a, week + max_weeks)[0] for a in matrix.accounts],
+            staker.get_global_weight_at(week),
+            staker.get_global_weekly_to_realize(week + max_weeks)[0],
+            distributor.weekly_reward_amount.get(week, 0),
+        )
@@ -0,0 +1,169 @@
+"""
+    Rebuild account state and weekly weights from staking history, in parallel.
+
+        python -m ybs.replay --db ybs.sqlite --staker 0x... --end-week 120 --processes 8
+
+    Accounts only affect each other through the global series, which is the sum of
+    their contributions, so history is partitioned by account into shards, each shard
+    is replayed through its own `ybs.staker` model in a process pool, and the shard
+    globals are summed.
+
+    Input is the staker's `Staked`/`Unstaked` logs in chain order, e.g. from
+    `ybs.indexer`. A `Staked` whose `weightAdded` exceeds `amount >> 1` came from
+    `stakeAsMaxWeighted`. Checkpoints emit nothing, so an account's `AccountData` is
+    as of its last stake or unstake (a later `checkpointAccount` only moves
+    `lastUpdateWeek` and the bitmap on chain); all weights are unaffected.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ybs.staker import YearnBoostedStaker
+
+STAKE, STAKE_AS_MAX_WEIGHTED, UNSTAKE = "stake", "stake_as_max_weighted", "unstake"
+
+
+def actions_from_indexer(indexer, staker):
+    """`(week, kind, account, amount)` for every stake and unstake of `staker`, in chain order."""
+    rows = []
+    for event in indexer.events("Staked", contract=staker):
+        kind = STAKE if event["weight_added"] == event["amount"] >> 1 else STAKE_AS_MAX_WEIGHTED
+        rows.append((event["block_number"], event["log_index"], event["week"], kind, event["account"], event["amount"]))
+    for event in indexer.events("Unstaked", contract=staker):
+        rows.append((event["block_number"], event["log_index"], event["week"], UNSTAKE, event["account"], event["amount"]))
+    rows.sort()
+    return [row[2:] for row in rows]
+
+
+def shard_of(account, n_shards):
+    return int(account, 16) % n_shards
+
+
+def replay_shard(max_stake_growth_weeks, start_week, end_week, actions):
+    """
+        Replay `actions` (all for this shard's accounts) and return the shard's
+        accounts and global series for weeks `start_week..end_week` inclusive.
+    """
+    model = YearnBoostedStaker(max_stake_growth_weeks)
+    apply = {
+        STAKE: model.stake,
+        STAKE_AS_MAX_WEIGHTED: model.stake_as_max_weighted,
+        UNSTAKE: model.unstake,
+    }
+    for week, kind, account, amount in actions:
+        model.week = week
+        apply[kind](account, amount)
+
+    model.week = end_week
+    weeks = range(start_week, end_week + 1)
+    accounts = {}
+    for account in model.account_data:
+        accounts[account] = (
+            model.get_account_data(account),
+            model.balance_of(account),
+            [model.get_account_weight_at(account, week) for week in weeks],
+        )
+    model.checkpoint_global()
+    return {
+        "accounts": accounts,
+        "global_weights": [model.get_global_weight_at(week) for week in weeks],
+        "global_growth_rate": model.global_growth_rate,
+        "total_supply": model.total_supply,
+    }
+
+
+def _replay_shard(args):
+    return replay_shard(*args)
+
+
+class ReplayResult:
+    def __init__(self, start_week, end_week):
+        self.start_week = start_week
+        self.end_week = end_week
+        self.account_data = {}     # account -> accountData tuple
+        self.balances = {}         # account -> balanceOf
+        self.account_weights = {}  # account -> [weight for start_week..end_week]
+        self.global_weights = [0] * (end_week - start_week + 1)
+        self.global_growth_rate = 0
+        self.total_supply = 0
+
+    def account_weight_at(self, account, week):
+        return self.account_weights[account][week - self.start_week]
+
+    def global_weight_at(self, week):
+        return self.global_weights[week - self.start_week]
+
+    def merge(self, shard):
+        for account, (data, balance, weights) in shard["accounts"].items():
+            self.account_data[account] = data
+            self.balances[account] = balance
+            self.account_weights[account] = weights
+        self.global_weights = [a + b for a, b in zip(self.global_weights, shard["global_weights"])]
+        self.global_growth_rate += shard["global_growth_rate"]
+        self.total_supply += shard["total_supply"]
+
+
+def replay(actions, max_stake_growth_weeks, end_week, start_week=None, processes=None, n_shards=None):
+    """
+        Replay `(week, kind, account, amount)` actions in chain order up to `end_week`
+        (the staker's current week). `processes=1` runs in this process. Returns a
+        `ReplayResult` covering `start_week` (default: the first action's week) onwards.
+    """
+    if start_week is None:
+        start_week = actions[0][0] if actions else end_week
+    if processes == 1:
+        n_shards = 1
+    n_shards = n_shards or processes or _cpu_count()
+
+    shards = [[] for _ in range(n_shards)]
+    for action in actions:
+        shards[shard_of(action[2], n_shards)].append(action)
+    jobs = [(max_stake_growth_weeks, start_week, end_week, shard) for shard in shards if shard]
+
+    result = ReplayResult(start_week, end_week)
+    if processes == 1:
+        for output in map(_replay_shard, jobs):
+            result.merge(output)
+    else:
+        with ProcessPoolExecutor(processes) as executor:
+            for output in executor.map(_replay_shard, jobs):
+                result.merge(output)
+    return result
+
+
+def _cpu_count():
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+
+
+def main():
+    from ybs.abi import MAX_STAKE_GROWTH_WEEKS
+    from ybs.indexer import Indexer
+    from ybs.rpc import RPC
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="ybs.sqlite", help="Database written by ybs.indexer.")
+    parser.add_argument("--staker", required=True)
+    parser.add_argument("--max-weeks", type=int, help="MAX_STAKE_GROWTH_WEEKS (read from --rpc if omitted).")
+    parser.add_argument("--end-week", type=int, required=True)
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--rpc", default="http://127.0.0.1:8545")
+    args = parser.parse_args()
+
+    max_weeks = args.max_weeks
+    if max_weeks is None:
+        result = RPC(args.rpc).call("eth_call", {"to": args.staker, "data": MAX_STAKE_GROWTH_WEEKS}, "latest")
+        max_weeks = int(result, 16)
+
+    indexer = Indexer(None, args.db)
+    actions = actions_from_indexer(indexer, args.staker.lower())
+    started = time.perf_counter()
+    result = replay(actions, max_weeks, args.end_week, processes=args.processes)
+    elapsed = time.perf_counter() - started
+    print(f"Replayed {len(actions):,} actions for {len(result.account_data):,} accounts in {elapsed:.2f}s")
+    print(f"Global weight at week {args.end_week}: {result.global_weight_at(args.end_week)}")
+    print(f"Total supply: {result.total_supply}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+    Minimal JSON-RPC client over urllib, with batching.
+"""
+import itertools
+import json
+import urllib.request
+
+
+class RPCError(Exception):
+    def __init__(self, method, error):
+        self.method = method
+        self.error = error
+        super().__init__(f"{method}: {error.get('message', error)}")
+
+
+class RPC:
+    def __init__(self, url, timeout=300):
+        self.url = url
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+
+    def _post(self, payload):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def call(self, method, *params):
+        response = self._post({"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": list(params)})
+        if "error" in response:
+            raise RPCError(method, response["error"])
+        return response["result"]
+
+    def batch(self, calls):
+        """
+            Send `[(method, params), ...]` as one request and return the results in order.
+            Raises on the first error.
+        """
+        if not calls:
+            return []
+        payload = [
+            {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": list(params)}
+            for method, params in calls
+        ]
+        by_id = {r["id"]: r for r in self._post(payload)}
+        results = []
+        for request in payload:
+            response = by_id[request["id"]]
+            if "error" in response:
+                raise RPCError(request["method"], response["error"])
+            results.append(response["result"])
+        return results
@@ -0,0 +1,225 @@
+"""
+    Vectorized simulation of a YBS deployment over large populations.
+
+    Accounts live in a structured NumPy array and are advanced together one week at a
+    time, which is equivalent to every account being checkpointed weekly: weights are
+    the values the contract's views would return. Events are applied in batches with
+    array operations, so 10^6 accounts over years of weeks is practical.
+
+    Per-account amounts are int64 in units of `unit` wei (default 1e12, allowing
+    balances up to ~9e30 wei). Stake amounts are rounded down to an even number of
+    units, so `amount >> 1` never truncates and results are exact for the rounded
+    amounts. Global totals are kept as Python ints.
+
+    Within a week, events apply in call order. Repeated unstakes by one account in a
+    single batch are merged, which gives the same result as applying them in turn.
+    Unstakes larger than an account's balance are clipped to the balance where the
+    contract would revert.
+"""
+import numpy as np
+
+PRECISION = 10**18  # YBSUtilities.PRECISION
+WEEKS_PER_YEAR = 52
+
+ACCOUNT_DTYPE = np.dtype([
+    ("realized", np.int64),           # realizedStake, in weight units
+    ("pending", np.int64),            # pendingStake, in weight units
+    ("weight", np.int64),             # weight at the current week
+    ("fresh", np.int64),              # weight staked this week (weightPersistent of its realize week)
+    ("max_stake", np.int64),          # amount staked as max weighted this week (accountWeeklyMaxStake)
+    ("last_update_week", np.int32),   # last week the account acted
+])
+
+_HALF = np.int64(2**32)
+
+
+def exact_sum(values):
+    """Sum an int64 array as a Python int, without overflowing."""
+    values = np.asarray(values, dtype=np.int64)
+    hi = values // _HALF
+    lo = values - hi * _HALF
+    return int(hi.sum()) * int(_HALF) + int(lo.sum())
+
+
+class Simulation:
+    def __init__(self, n_accounts, max_stake_growth_weeks, unit=10**12, start_week=0):
+        if not 0 < max_stake_growth_weeks <= 7:
+            raise ValueError("Invalid weeks")
+        self.MAX_STAKE_GROWTH_WEEKS = max_stake_growth_weeks
+        self.unit = unit
+        self.week = start_week
+        self.accounts = np.zeros(n_accounts, dtype=ACCOUNT_DTYPE)
+        # Pending weight per account by realize week, in a ring of MAX + 1 slots.
+        self.buckets = np.zeros((n_accounts, max_stake_growth_weeks + 1), dtype=np.int64)
+
+        self.global_weight = 0
+        self.global_growth_rate = 0
+        self.global_buckets = [0] * (max_stake_growth_weeks + 1)
+        self.global_fresh = 0
+        self.global_max_stake = 0
+        self.total_supply = 0
+        self.reward_amount = 0
+
+        self.series = {key: [] for key in (
+            "week", "global_weight", "adjusted_global_weight", "total_supply",
+            "stake_amount", "reward_amount",
+        )}
+
+    def to_units(self, amounts):
+        """Convert wei amounts (ints or an array) to int64 units, rounding down."""
+        if np.isscalar(amounts):
+            return np.int64(int(amounts) // self.unit)
+        return np.array([int(a) // self.unit for a in amounts], dtype=np.int64)
+
+    def _slot(self, week):
+        return week % (self.MAX_STAKE_GROWTH_WEEKS + 1)
+
+    # Events
+
+    def stake(self, idx, amounts):
+        """Stake `amounts` (units) for accounts `idx`. Returns the weight added, in units."""
+        idx = np.asarray(idx)
+        weights = np.asarray(amounts, dtype=np.int64) // 2
+        accounts = self.accounts
+        slot = self._slot(self.week + self.MAX_STAKE_GROWTH_WEEKS)
+        np.add.at(accounts["pending"], idx, weights)
+        np.add.at(accounts["weight"], idx, weights)
+        np.add.at(accounts["fresh"], idx, weights)
+        np.add.at(self.buckets[:, slot], idx, weights)
+        accounts["last_update_week"][idx] = self.week
+
+        total = exact_sum(weights)
+        self.global_growth_rate += total
+        self.global_weight += total
+        self.global_buckets[slot] += total
+        self.global_fresh += total
+        self.total_supply += 2 * total
+        return weights
+
+    def stake_as_max_weighted(self, idx, amounts):
+        idx = np.asarray(idx)
+        weights = np.asarray(amounts, dtype=np.int64) // 2
+        boosted = weights * (self.MAX_STAKE_GROWTH_WEEKS + 1)
+        accounts = self.accounts
+        np.add.at(accounts["realized"], idx, weights)
+        np.add.at(accounts["weight"], idx, boosted)
+        np.add.at(accounts["max_stake"], idx, 2 * weights)
+        accounts["last_update_week"][idx] = self.week
+
+        total = exact_sum(weights)
+        self.global_weight += total * (self.MAX_STAKE_GROWTH_WEEKS + 1)
+        self.global_max_stake += 2 * total
+        self.total_supply += 2 * total
+        return boosted
+
+    def unstake(self, idx, amounts):
+        """
+            Unstake `amounts` (units), taking from the least weighted pending stake first
+            and then from realized stake. Returns (accounts, amounts unstaked) per account.
+        """
+        max_weeks = self.MAX_STAKE_GROWTH_WEEKS
+        idx, inverse = np.unique(np.asarray(idx), return_inverse=True)
+        needed = np.zeros(len(idx), dtype=np.int64)
+        np.add.at(needed, inverse, np.asarray(amounts, dtype=np.int64) // 2)
+
+        accounts = self.accounts
+        pending, realized = accounts["pending"][idx], accounts["realized"][idx]
+        needed = np.minimum(needed, pending + realized)
+
+        # Column i is weekIndex i: stake realizing in week + MAX - i, weighted i + 1.
+        order = np.array([self._slot(self.week + max_weeks - i) for i in range(max_weeks)])
+        buckets = self.buckets[idx[:, None], order[None, :]]
+        before = np.cumsum(buckets, axis=1) - buckets
+        taken = np.clip(needed[:, None] - before, 0, buckets)
+        from_pending = taken.sum(axis=1)
+        from_realized = needed - from_pending
+        factors = np.arange(1, max_weeks + 1, dtype=np.int64)
+        removed = taken @ factors + from_realized * (max_weeks + 1)
+
+        self.buckets[idx[:, None], order[None, :]] = buckets - taken
+        accounts["pending"][idx] = pending - from_pending
+        accounts["realized"][idx] = realized - from_realized
+        accounts["weight"][idx] -= removed
+        accounts["fresh"][idx] -= taken[:, 0]
+        accounts["last_update_week"][idx] = self.week
+
+        for i, slot in enumerate(order):
+            self.global_buckets[slot] -= exact_sum(taken[:, i])
+        self.global_fresh -= exact_sum(taken[:, 0])
+        self.global_growth_rate -= exact_sum(from_pending)
+        self.global_weight -= exact_sum(removed)
+        self.total_supply -= 2 * exact_sum(needed)
+        return idx, 2 * needed
+
+    def deposit_reward(self, amount):
+        """Deposit `amount` wei of reward token into the current week."""
+        self.reward_amount += int(amount)
+
+    # Time
+
+    def advance(self, weeks=1):
+        """Finalize the current week into `series` and move forward."""
+        for _ in range(weeks):
+            self._record()
+            self.week += 1
+            slot = self._slot(self.week)
+
+            accounts = self.accounts
+            accounts["weight"] += accounts["pending"]
+            realizing = self.buckets[:, slot]
+            accounts["pending"] -= realizing
+            accounts["realized"] += realizing
+            realizing[:] = 0
+            accounts["fresh"] = 0
+            accounts["max_stake"] = 0
+
+            self.global_weight += self.global_growth_rate
+            self.global_growth_rate -= self.global_buckets[slot]
+            self.global_buckets[slot] = 0
+            self.global_fresh = 0
+            self.global_max_stake = 0
+            self.reward_amount = 0
+
+    def _record(self):
+        u = self.unit
+        series = self.series
+        series["week"].append(self.week)
+        series["global_weight"].append(self.global_weight * u)
+        series["adjusted_global_weight"].append((self.global_weight - self.global_fresh) * u if self.global_weight else 0)
+        series["total_supply"].append(self.total_supply * u)
+        series["stake_amount"].append((2 * self.global_fresh) * u + self.global_max_stake * u)
+        series["reward_amount"].append(self.reward_amount)
+
+    # Views, in wei
+
+    def account_weight(self, idx):
+        return self.accounts["weight"][idx].astype(object) * self.unit
+
+    def balance_of(self, idx):
+        a = self.accounts[idx]
+        return 2 * (a["pending"].astype(object) + a["realized"]) * self.unit
+
+    def results(self, stake_token_price=PRECISION, reward_token_price=PRECISION):
+        """
+            Finalized weekly series, with boost and APR as `YBSUtilities` would report
+            them at the end of each week (its "projected" views, 18 decimals):
+
+            - boost: adjustedGlobalWeightAt(week) * 1e18 / totalSupply
+            - apr: weekly rewards annualized against totalSupply, 0 in a week where all
+              supply was staked that week.
+        """
+        out = {key: np.array(values, dtype=object) for key, values in self.series.items()}
+        boost, apr = [], []
+        for weight, supply, staked, rewards in zip(
+            self.series["adjusted_global_weight"], self.series["total_supply"],
+            self.series["stake_amount"], self.series["reward_amount"],
+        ):
+            boost.append(weight * PRECISION // supply if supply and weight else 0)
+            if supply == 0 or rewards == 0 or staked == supply:
+                apr.append(0)
+            else:
+                apr.append(rewards * reward_token_price * PRECISION // (supply * stake_token_price) * WEEKS_PER_YEAR)
+        out["boost"] = np.array(boost, dtype=object)
+        out["apr"] = np.array(apr, dtype=object)
+        out["week"] = out["week"].astype(np.int64)
+        return out
@@ -0,0 +1,433 @@
+"""
+    Reference model of `YearnBoostedStaker`.
+
+    Mirrors the contract's weight accounting operation for operation, including integer
+    truncation and the order in which storage is read and written, so every view
+    matches the contract given the same sequence of actions. Token transfers and
+    access control are not modelled: callers are expected to have checked permissions
+    and balances already. Reverts raise `ModelRevert`. A reverted action may leave
+    checkpoint writes behind, which don't change the result of any view.
+
+    Time is explicit: set `week` (or call `set_time`) before each action to the value
+    `getWeek()` would return on chain.
+"""
+WEEK = 60 * 60 * 24 * 7
+UINT112_MAX = 2**112 - 1
+
+
+class ModelRevert(Exception):
+    pass
+
+
+class AccountData:
+    __slots__ = ("realized_stake", "pending_stake", "last_update_week", "update_weeks_bitmap")
+
+    def __init__(self, realized_stake=0, pending_stake=0, last_update_week=0, update_weeks_bitmap=0):
+        self.realized_stake = realized_stake
+        self.pending_stake = pending_stake
+        self.last_update_week = last_update_week
+        self.update_weeks_bitmap = update_weeks_bitmap
+
+    def copy(self):
+        return AccountData(self.realized_stake, self.pending_stake, self.last_update_week, self.update_weeks_bitmap)
+
+    def as_tuple(self):
+        """Same field order as the `accountData` getter."""
+        return (self.realized_stake, self.pending_stake, self.last_update_week, self.update_weeks_bitmap)
+
+
+class ToRealize:
+    __slots__ = ("weight_persistent", "weight")
+
+    def __init__(self, weight_persistent=0, weight=0):
+        self.weight_persistent = weight_persistent
+        self.weight = weight
+
+    def as_tuple(self):
+        return (self.weight_persistent, self.weight)
+
+
+_EMPTY_ACCOUNT = AccountData()
+_EMPTY_TO_REALIZE = ToRealize()
+
+
+def _sub(a, b):
+    if b > a:
+        raise ModelRevert("underflow")
+    return a - b
+
+
+class YearnBoostedStaker:
+    __slots__ = (
+        "MAX_STAKE_GROWTH_WEEKS", "MAX_WEEK_BIT", "START_TIME", "week",
+        "account_data", "account_weekly_weights", "account_weekly_to_realize", "account_weekly_max_stake",
+        "global_growth_rate", "global_last_update_week", "global_weekly_weights",
+        "global_weekly_to_realize", "global_weekly_max_stake", "total_supply",
+    )
+
+    def __init__(self, max_stake_growth_weeks, start_time=0, week=0):
+        if not 0 < max_stake_growth_weeks <= 7:
+            raise ModelRevert("Invalid weeks")
+        self.MAX_STAKE_GROWTH_WEEKS = max_stake_growth_weeks
+        self.MAX_WEEK_BIT = 1 << max_stake_growth_weeks
+        self.START_TIME = start_time
+        self.week = week
+
+        self.account_data = {}              # account -> AccountData
+        self.account_weekly_weights = {}    # account -> {week: weight}
+        self.account_weekly_to_realize = {} # account -> {week: ToRealize}
+        self.account_weekly_max_stake = {}  # account -> {week: amount}
+
+        self.global_growth_rate = 0
+        self.global_last_update_week = 0
+        self.global_weekly_weights = {}     # week -> weight
+        self.global_weekly_to_realize = {}  # week -> ToRealize
+        self.global_weekly_max_stake = {}   # week -> amount
+        self.total_supply = 0
+
+    @classmethod
+    def from_chain(cls, staker):
+        """A fresh model with the same config and current week as a deployed staker."""
+        return cls(staker.MAX_STAKE_GROWTH_WEEKS(), staker.START_TIME(), staker.getWeek())
+
+    def set_time(self, timestamp):
+        self.week = (timestamp - self.START_TIME) // WEEK
+
+    def get_week(self):
+        return self.week
+
+    # Mutations
+
+    def stake(self, account, amount):
+        if not 1 < amount < UINT112_MAX:
+            raise ModelRevert("invalid amount")
+
+        system_week = self.week
+        acct, account_weight = self._checkpoint_account(account, system_week)
+        global_weight = self._checkpoint_global(system_week) & UINT112_MAX
+
+        weight = amount >> 1
+        amount = weight << 1
+
+        acct.pending_stake += weight
+        self.global_growth_rate += weight
+
+        realize_week = system_week + self.MAX_STAKE_GROWTH_WEEKS
+        to_realize = self.account_weekly_to_realize.setdefault(account, {})
+        r = to_realize.get(realize_week)
+        if r is None:
+            r = to_realize[realize_week] = ToRealize()
+        r.weight += weight
+        r.weight_persistent += weight
+
+        r = self.global_weekly_to_realize.get(realize_week)
+        if r is None:
+            r = self.global_weekly_to_realize[realize_week] = ToRealize()
+        r.weight += weight
+        r.weight_persistent += weight
+
+        self.account_weekly_weights.setdefault(account, {})[system_week] = account_weight + weight
+        self.global_weekly_weights[system_week] = global_weight + weight
+
+        acct.update_weeks_bitmap |= 1
+        self.account_data[account] = acct
+        self.total_supply += amount
+        return amount
+
+    stake_for = stake
+
+    def stake_as_max_weighted(self, account, amount):
+        if not 1 < amount < UINT112_MAX:
+            raise ModelRevert("invalid amount")
+
+        system_week = self.week
+        acct, account_weight = self._checkpoint_account(account, system_week)
+        global_weight = self._checkpoint_global(system_week) & UINT112_MAX
+
+        weight = amount >> 1
+        amount = weight << 1
+        acct.realized_stake += weight
+        weight = weight * (self.MAX_STAKE_GROWTH_WEEKS + 1)
+
+        max_stake = self.account_weekly_max_stake.setdefault(account, {})
+        max_stake[system_week] = max_stake.get(system_week, 0) + amount
+        self.global_weekly_max_stake[system_week] = self.global_weekly_max_stake.get(system_week, 0) + amount
+
+        self.account_weekly_weights.setdefault(account, {})[system_week] = account_weight + weight
+        self.global_weekly_weights[system_week] = global_weight + weight
+
+        self.account_data[account] = acct
+        self.total_supply += amount
+        return amount
+
+    def unstake(self, account, amount):
+        if not 1 < amount < UINT112_MAX:
+            raise ModelRevert("invalid amount")
+        system_week = self.week
+
+        acct, _ = self._checkpoint_account(account, system_week)
+        self._checkpoint_global(system_week)
+
+        bitmap = acct.update_weeks_bitmap
+        weight_to_remove = 0
+
+        amount_needed = amount >> 1
+        amount = amount_needed << 1
+        if amount_needed > acct.pending_stake + acct.realized_stake:
+            # Would underflow `realizedStake` below; checked here so nothing is written.
+            raise ModelRevert("underflow")
+
+        if bitmap > 0:
+            max_weeks = self.MAX_STAKE_GROWTH_WEEKS
+            account_to_realize = self.account_weekly_to_realize.get(account, {})
+            for week_index in range(max_weeks):
+                # Least weighted first: bit 0 is this week's stake.
+                mask = 1 << week_index
+                if bitmap & mask != mask:
+                    continue
+                week_to_check = system_week + max_weeks - week_index
+                r = account_to_realize.get(week_to_check, _EMPTY_TO_REALIZE)
+                g = self.global_weekly_to_realize.get(week_to_check, _EMPTY_TO_REALIZE)
+                pending = r.weight
+                if amount_needed > pending:
+                    weight_to_remove += pending * (week_index + 1)
+                    g = self._to_realize_for_write(week_to_check, g)
+                    if r is not _EMPTY_TO_REALIZE:
+                        r.weight = 0
+                    g.weight = _sub(g.weight, pending)
+                    if week_index == 0:
+                        if r is not _EMPTY_TO_REALIZE:
+                            r.weight_persistent = 0
+                        g.weight_persistent = _sub(g.weight_persistent, pending)
+                    bitmap ^= mask
+                    amount_needed -= pending
+                else:
+                    weight_to_remove += amount_needed * (week_index + 1)
+                    g = self._to_realize_for_write(week_to_check, g)
+                    r.weight -= amount_needed
+                    g.weight = _sub(g.weight, amount_needed)
+                    if week_index == 0:
+                        r.weight_persistent = _sub(r.weight_persistent, amount_needed)
+                        g.weight_persistent = _sub(g.weight_persistent, amount_needed)
+                    if amount_needed == pending:
+                        bitmap ^= mask
+                    amount_needed = 0
+                    break
+            acct.update_weeks_bitmap = bitmap
+
+        pending_removed = (amount >> 1) - amount_needed
+        if amount_needed > 0:
+            weight_to_remove += amount_needed * (1 + self.MAX_STAKE_GROWTH_WEEKS)
+            acct.realized_stake = _sub(acct.realized_stake, amount_needed)
+            acct.pending_stake = 0
+        else:
+            acct.pending_stake = _sub(acct.pending_stake, pending_removed)
+
+        self.account_data[account] = acct
+
+        self.global_growth_rate = _sub(self.global_growth_rate, pending_removed)
+        self.global_weekly_weights[system_week] = _sub(self.global_weekly_weights.get(system_week, 0), weight_to_remove)
+        weights = self.account_weekly_weights.setdefault(account, {})
+        weights[system_week] = _sub(weights.get(system_week, 0), weight_to_remove)
+
+        self.total_supply = _sub(self.total_supply, amount)
+        return amount
+
+    unstake_for = unstake
+
+    def checkpoint_account(self, account):
+        acct, weight = self._checkpoint_account(account, self.week)
+        self.account_data[account] = acct
+        return acct.as_tuple(), weight
+
+    def checkpoint_account_with_limit(self, account, week):
+        week = min(week, self.week)
+        acct, weight = self._checkpoint_account(account, week)
+        self.account_data[account] = acct
+        return acct.as_tuple(), weight
+
+    def checkpoint_global(self):
+        return self._checkpoint_global(self.week)
+
+    def _to_realize_for_write(self, week, r):
+        if r is _EMPTY_TO_REALIZE:
+            r = self.global_weekly_to_realize[week] = ToRealize()
+        return r
+
+    def _checkpoint_account(self, account, system_week):
+        """
+            Returns a copy of the account's data synced to `system_week`, like the
+            contract's memory struct. Only weekly weights are written here.
+        """
+        acct = self.account_data.get(account, _EMPTY_ACCOUNT).copy()
+        last_update_week = acct.last_update_week
+        weights = self.account_weekly_weights.get(account)
+
+        if system_week == last_update_week:
+            return acct, weights.get(last_update_week, 0) if weights else 0
+
+        if system_week < last_update_week:
+            raise ModelRevert("specified week is older than last update.")
+
+        if weights is None:
+            weights = self.account_weekly_weights[account] = {}
+        pending = acct.pending_stake
+        realized = acct.realized_stake
+
+        if pending == 0:
+            weight = 0
+            if realized != 0:
+                weight = weights.get(last_update_week, 0)
+                for week in range(last_update_week + 1, system_week + 1):
+                    weights[week] = weight
+            acct.last_update_week = system_week
+            self.account_data[account] = acct.copy()
+            return acct, weight
+
+        weight = weights.get(last_update_week, 0)
+        bitmap = acct.update_weeks_bitmap
+        target_sync_week = min(system_week, last_update_week + self.MAX_STAKE_GROWTH_WEEKS)
+        to_realize = self.account_weekly_to_realize.get(account, {})
+
+        while last_update_week < target_sync_week:
+            last_update_week += 1
+            weight += pending
+            weights[last_update_week] = weight
+
+            bitmap = (bitmap << 1) & 0xFF
+            if bitmap & self.MAX_WEEK_BIT == self.MAX_WEEK_BIT:
+                r = to_realize.get(last_update_week, _EMPTY_TO_REALIZE).weight
+                pending = _sub(pending, r)
+                realized += r
+                if pending == 0:
+                    break
+
+        while last_update_week < system_week:
+            last_update_week += 1
+            weights[last_update_week] = weight
+
+        return AccountData(realized, pending, system_week, bitmap), weight
+
+    def _checkpoint_global(self, system_week):
+        last_update_week = self.global_last_update_week
+        rate = self.global_growth_rate
+        weight = self.global_weekly_weights.get(last_update_week, 0)
+
+        if weight == 0:
+            self.global_last_update_week = system_week
+            return 0
+
+        if last_update_week == system_week:
+            return weight
+
+        weekly_weights = self.global_weekly_weights
+        to_realize = self.global_weekly_to_realize
+        while last_update_week < system_week:
+            last_update_week += 1
+            weight += rate
+            weekly_weights[last_update_week] = weight
+            rate = _sub(rate, to_realize.get(last_update_week, _EMPTY_TO_REALIZE).weight)
+
+        self.global_growth_rate = rate
+        self.global_last_update_week = system_week
+        return weight
+
+    # Views
+
+    def balance_of(self, account):
+        acct = self.account_data.get(account, _EMPTY_ACCOUNT)
+        return 2 * (acct.pending_stake + acct.realized_stake)
+
+    def get_account_data(self, account):
+        return self.account_data.get(account, _EMPTY_ACCOUNT).as_tuple()
+
+    def get_account_weekly_to_realize(self, account, week):
+        return self.account_weekly_to_realize.get(account, {}).get(week, _EMPTY_TO_REALIZE).as_tuple()
+
+    def get_global_weekly_to_realize(self, week):
+        return self.global_weekly_to_realize.get(week, _EMPTY_TO_REALIZE).as_tuple()
+
+    def get_account_weight(self, account):
+        return self.get_account_weight_at(account, self.week)
+
+    def get_account_weight_at(self, account, week):
+        if week > self.week:
+            return 0
+        acct = self.account_data.get(account, _EMPTY_ACCOUNT)
+        last_update_week = acct.last_update_week
+        weights = self.account_weekly_weights.get(account, {})
+
+        if last_update_week >= week:
+            return weights.get(week, 0)
+
+        weight = weights.get(last_update_week, 0)
+        pending = acct.pending_stake
+        if pending == 0:
+            return weight
+
+        bitmap = acct.update_weeks_bitmap
+        to_realize = self.account_weekly_to_realize.get(account, {})
+        while last_update_week < week:
+            last_update_week += 1
+            weight += pending
+            bitmap = (bitmap << 1) & 0xFF
+            if bitmap & self.MAX_WEEK_BIT == self.MAX_WEEK_BIT:
+                pending = _sub(pending, to_realize.get(last_update_week, _EMPTY_TO_REALIZE).weight)
+                if pending == 0:
+                    break
+        return weight
+
+    def project_account_weights(self, account, n_weeks):
+        acct = self.account_data.get(account, _EMPTY_ACCOUNT)
+        week = acct.last_update_week
+        weight = self.account_weekly_weights.get(account, {}).get(week, 0)
+        pending = acct.pending_stake
+        bitmap = acct.update_weeks_bitmap
+        to_realize = self.account_weekly_to_realize.get(account, {})
+
+        weights = []
+        for i in range(n_weeks):
+            while week < self.week + i and pending > 0:
+                week += 1
+                weight += pending
+                bitmap = (bitmap << 1) & 0xFF
+                if bitmap & self.MAX_WEEK_BIT == self.MAX_WEEK_BIT:
+                    pending = _sub(pending, to_realize.get(week, _EMPTY_TO_REALIZE).weight)
+            weights.append(weight)
+        return weights
+
+    def get_global_weight(self):
+        return self.get_global_weight_at(self.week)
+
+    def get_global_weight_at(self, week):
+        if week > self.week:
+            return 0
+        last_update_week = self.global_last_update_week
+        rate = self.global_growth_rate
+
+        if week <= last_update_week:
+            return self.global_weekly_weights.get(week, 0)
+
+        weight = self.global_weekly_weights.get(last_update_week, 0)
+        if rate == 0:
+            return weight
+
+        while last_update_week < week:
+            last_update_week += 1
+            weight += rate
+            rate = _sub(rate, self.global_weekly_to_realize.get(last_update_week, _EMPTY_TO_REALIZE).weight)
+        return weight
+
+    def project_global_weights(self, n_weeks):
+        week = self.global_last_update_week
+        rate = self.global_growth_rate
+        weight = self.global_weekly_weights.get(week, 0)
+
+        weights = []
+        for i in range(n_weeks):
+            while week < self.week + i and rate > 0:
+                week += 1
+                weight += rate
+                rate = _sub(rate, self.global_weekly_to_realize.get(week, _EMPTY_TO_REALIZE).weight)
+            weights.append(weight)
+        return weights
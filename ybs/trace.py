@@ -0,0 +1,338 @@
+"""
+    Gas attribution for a mined transaction, from `debug_traceTransaction` struct logs.
+
+    Every opcode's gas is charged to a stack of frames: the contract being executed,
+    the internal functions entered on the way there, and for SLOAD/SSTORE the storage
+    variable touched. Functions are recovered from the solc source map (jumps marked
+    `i` enter a function, `o` leave it) and storage variables from the storage layout,
+    using the keccak preimages seen in the trace to name mapping slots. Clones are
+    attributed to their implementation, with storage read in the clone's context.
+
+    `Profile.folded()` gives the collapsed-stack format read by flamegraph.pl,
+    inferno and speedscope.
+"""
+import bisect
+from collections import Counter
+from dataclasses import dataclass, field
+
+from ybs.layout import StorageLayout
+
+CALL_OPS = {"CALL", "CALLCODE", "DELEGATECALL", "STATICCALL", "CREATE", "CREATE2"}
+STORAGE_OPS = {"SLOAD", "SSTORE"}
+HASH_OPS = {"SHA3", "KECCAK256"}
+ACCOUNT_OPS = {"BALANCE", "EXTCODESIZE", "EXTCODECOPY", "EXTCODEHASH"}
+
+
+def parse_source_map(srcmap):
+    """
+        Decompress a solc source map into one (start, length, file, jump) per instruction.
+        Empty fields repeat the previous entry's value.
+    """
+    entries = []
+    last = [-1, -1, -1, "-"]
+    for item in srcmap.split(";"):
+        fields = item.split(":")
+        for i in range(4):
+            if i < len(fields) and fields[i] != "":
+                last[i] = fields[i] if i == 3 else int(fields[i])
+        entries.append(tuple(last))
+    return entries
+
+
+def instruction_indexes(code):
+    """Map each opcode's pc to its instruction index, skipping PUSH data."""
+    indexes = {}
+    pc = index = 0
+    while pc < len(code):
+        indexes[pc] = index
+        op = code[pc]
+        pc += 1 + (op - 0x5F if 0x60 <= op <= 0x7F else 0)
+        index += 1
+    return indexes
+
+
+class SourceFunctions:
+    """Innermost function or modifier containing a source range, by file id."""
+
+    def __init__(self, asts):
+        self.ranges = {}
+        for ast in asts:
+            self._walk(ast, None)
+        for ranges in self.ranges.values():
+            ranges.sort()
+        self.starts = {f: [r[0] for r in ranges] for f, ranges in self.ranges.items()}
+
+    def _walk(self, node, contract):
+        if isinstance(node, list):
+            for child in node:
+                self._walk(child, contract)
+            return
+        if not isinstance(node, dict):
+            return
+        node_type = node.get("nodeType")
+        if node_type == "ContractDefinition":
+            contract = node["name"]
+        elif node_type in ("FunctionDefinition", "ModifierDefinition"):
+            start, length, file = (int(x) for x in node["src"].split(":"))
+            name = node.get("name") or node.get("kind", "function")
+            label = f"{contract}.{name}" if contract else name
+            self.ranges.setdefault(file, []).append((start, start + length, label))
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                self._walk(value, contract)
+
+    def find(self, start, length, file):
+        ranges = self.ranges.get(file)
+        if not ranges or start < 0:
+            return None
+        # Function ranges nest, so the containing range with the latest start is innermost.
+        for i in range(bisect.bisect_right(self.starts[file], start) - 1, -1, -1):
+            lo, hi, label = ranges[i]
+            if start + length <= hi:
+                return label
+        return None
+
+
+@dataclass
+class CompiledContract:
+    name: str
+    code: bytes
+    source_map: list
+    layout: StorageLayout
+    immutables: list = field(default_factory=list)  # [(start, length)]
+    functions: SourceFunctions = None
+
+    def __post_init__(self):
+        self.indexes = instruction_indexes(self.code)
+
+    def matches(self, code):
+        if len(code) != len(self.code):
+            return False
+        if not self.immutables:
+            return code == self.code
+        masked = bytearray(code)
+        for start, length in self.immutables:
+            masked[start:start + length] = self.code[start:start + length]
+        return bytes(masked) == self.code
+
+    def location(self, pc):
+        index = self.indexes.get(pc)
+        if index is None or index >= len(self.source_map):
+            return None
+        return self.source_map[index]
+
+
+def load_solc_output(output):
+    """
+        Build `CompiledContract`s from solc standard-json output compiled with
+        `evm.deployedBytecode` and `storageLayout` selected for every contract, and the
+        AST for every source.
+    """
+    functions = SourceFunctions([s["ast"] for s in output["sources"].values() if "ast" in s])
+    contracts = []
+    for source in output["contracts"].values():
+        for name, data in source.items():
+            deployed = data["evm"]["deployedBytecode"]
+            code = bytes.fromhex(deployed["object"])
+            if not code:
+                continue
+            immutables = [
+                (ref["start"], ref["length"])
+                for refs in deployed.get("immutableReferences", {}).values()
+                for ref in refs
+            ]
+            contracts.append(CompiledContract(
+                name,
+                code,
+                parse_source_map(deployed.get("sourceMap", "")),
+                StorageLayout(data.get("storageLayout", {})),
+                immutables,
+                functions,
+            ))
+    return contracts
+
+
+@dataclass
+class Frame:
+    label: str
+    contract: CompiledContract = None
+    storage_address: str = None
+    jumps: list = field(default_factory=list)
+    call_site: str = None
+
+    def path(self, leaf=None):
+        path = [self.label] + self.jumps
+        if leaf and (not self.jumps or self.jumps[-1] != leaf):
+            path.append(leaf)
+        return path
+
+
+class Profile:
+    def __init__(self):
+        self.stacks = Counter()         # folded stack -> gas
+        self.functions = Counter()      # innermost function -> self gas
+        self.storage = Counter()        # (contract, variable, op) -> gas
+        self.storage_counts = Counter() # (contract, variable, op) -> count
+        self.gas_used = 0
+
+    def add(self, path, gas, function=None):
+        self.stacks[";".join(path)] += gas
+        self.functions[function or path[-1]] += gas
+
+    def folded(self):
+        return "\n".join(f"{stack} {gas}" for stack, gas in sorted(self.stacks.items()) if gas > 0)
+
+
+def _int(value):
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def _memory(step):
+    memory = step.get("memory") or ""
+    if isinstance(memory, list):
+        memory = "".join(word[2:] if word.startswith("0x") else word for word in memory)
+    elif memory.startswith("0x"):
+        memory = memory[2:]
+    return bytes.fromhex(memory)
+
+
+def _address(value):
+    return "0x" + format(_int(value), "040x")
+
+
+def step_costs(steps):
+    """
+        Gas charged to each step. For calls this is only the caller's share (access,
+        value transfer, memory expansion); gas used by the callee is charged to the
+        callee's own steps.
+    """
+    costs = [step["gasCost"] for step in steps]
+    open_calls = []
+    for i, step in enumerate(steps):
+        while open_calls and step["depth"] <= steps[open_calls[-1]]["depth"]:
+            call = open_calls.pop()
+            last = steps[i - 1]
+            child_used = steps[call + 1]["gas"] - (last["gas"] - last["gasCost"])
+            costs[call] = steps[call]["gas"] - step["gas"] - child_used
+        if step["op"] in CALL_OPS:
+            nxt = steps[i + 1] if i + 1 < len(steps) else None
+            if nxt is not None and nxt["depth"] == step["depth"] + 1:
+                open_calls.append(i)
+            elif nxt is not None:
+                costs[i] = step["gas"] - nxt["gas"]
+    return costs
+
+
+def profile_trace(steps, to, gas_used, get_code, contracts):
+    """
+        Attribute the gas of struct log `steps` for a transaction sent to `to`.
+        `get_code(address)` returns runtime code bytes; it is called once per address.
+    """
+    code_cache = {}
+
+    def contract_at(address):
+        if address not in code_cache:
+            code = get_code(address)
+            code_cache[address] = next((c for c in contracts if c.matches(code)), None)
+        return code_cache[address]
+
+    def new_frame(code_address, storage_address):
+        contract = contract_at(code_address)
+        label = contract.name if contract else code_address[:10]
+        return Frame(label, contract, storage_address)
+
+    def function_at(contract, pc):
+        location = contract.location(pc) if contract else None
+        return contract.functions.find(*location[:3]) if location and contract.functions else None
+
+    profile = Profile()
+    profile.gas_used = gas_used
+    preimages = {}
+    frames = [new_frame(to, to)] if to else [Frame("create")]
+    costs = step_costs(steps)
+
+    for i, step in enumerate(steps):
+        while len(frames) > step["depth"]:
+            frames.pop()
+        frame = frames[-1]
+        op = step["op"]
+        stack = step.get("stack") or []
+        leaf = function_at(frame.contract, step["pc"])
+        path = [p for f in frames[:-1] for p in f.path(f.call_site)] + frame.path(leaf)
+        function = path[-1]
+
+        if op in STORAGE_OPS and stack:
+            layout = frame.contract.layout if frame.contract else StorageLayout.empty()
+            name = layout.name(_int(stack[-1]), preimages)
+            key = (frame.label, name.variable, op)
+            profile.storage[key] += costs[i]
+            profile.storage_counts[key] += 1
+            path = path + [f"{op} {name.variable}"]
+        profile.add(path, costs[i], function)
+
+        nxt = steps[i + 1] if i + 1 < len(steps) else None
+        if op in HASH_OPS and nxt is not None and nxt["depth"] == step["depth"]:
+            offset, size = _int(stack[-1]), _int(stack[-2])
+            preimages[_int(nxt["stack"][-1])] = _memory(step)[offset:offset + size]
+        elif op == "JUMP" and frame.contract and nxt is not None:
+            location = frame.contract.location(step["pc"])
+            jump = location[3] if location else "-"
+            if jump == "i":
+                target = function_at(frame.contract, nxt["pc"])
+                if target:
+                    frame.jumps.append(target)
+            elif jump == "o" and frame.jumps:
+                frame.jumps.pop()
+        elif op in CALL_OPS and nxt is not None and nxt["depth"] == step["depth"] + 1:
+            frame.call_site = leaf
+            if op.startswith("CREATE"):
+                frames.append(Frame("create"))
+            else:
+                target = _address(stack[-2])
+                storage = frame.storage_address if op in ("DELEGATECALL", "CALLCODE") else target
+                frames.append(new_frame(target, storage))
+
+    if steps:
+        last = steps[-1]
+        executed = steps[0]["gas"] - (last["gas"] - last["gasCost"])
+        profile.add(["[intrinsic and refunds]"], gas_used - executed)
+    return profile
+
+
+def storage_accesses(steps, to):
+    """
+        `{address: slots}` for struct log `steps` of a transaction sent to `to`: every
+        slot read or written, under the address whose storage it is, and every
+        account called or inspected.
+    """
+    touched = {to: set()}
+    frames = [to]
+    for i, step in enumerate(steps):
+        while len(frames) > step["depth"]:
+            frames.pop()
+        op = step["op"]
+        stack = step.get("stack") or []
+        if op in STORAGE_OPS and stack:
+            touched[frames[-1]].add(_int(stack[-1]))
+        elif op in ACCOUNT_OPS and stack:
+            touched.setdefault(_address(stack[-1]), set())
+        elif op in CALL_OPS and not op.startswith("CREATE"):
+            target = _address(stack[-2])
+            touched.setdefault(target, set())
+            nxt = steps[i + 1] if i + 1 < len(steps) else None
+            if nxt is not None and nxt["depth"] == step["depth"] + 1:
+                frames.append(frames[-1] if op in ("DELEGATECALL", "CALLCODE") else target)
+    return touched
+
+
+def trace_transaction(rpc, tx_hash, contracts):
+    tx = rpc.call("eth_getTransactionByHash", tx_hash)
+    receipt = rpc.call("eth_getTransactionReceipt", tx_hash)
+    trace = rpc.call("debug_traceTransaction", tx_hash, {"enableMemory": True, "disableStorage": True})
+    block = tx["blockNumber"]
+
+    def get_code(address):
+        return bytes.fromhex(rpc.call("eth_getCode", address, block)[2:])
+
+    to = tx["to"].lower() if tx.get("to") else None
+    return profile_trace(trace["structLogs"], to, _int(receipt["gasUsed"]), get_code, contracts)